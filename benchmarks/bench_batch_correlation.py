@@ -0,0 +1,74 @@
+"""Benchmark: positional vs. identifier-based batch correlation.
+
+Measures the client-side cost of pairing batch responses with their
+sub-requests by JSON-RPC "id" compared to the previous positional pairing.
+No network is involved; responses are synthesized and shuffled.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_batch_correlation.py [batch_size]
+"""
+
+import json
+import random
+import sys
+import timeit
+
+from idoit_api_client import API, Constants
+
+
+def _positional(responses):
+    """Pairs responses the way API.batch_request did before"""
+    results = []
+    for response in responses:
+        if not isinstance(response, dict):
+            raise Exception("Response is not a dictionary")
+        results.append(response["result"])
+    return results
+
+
+def main(size=10000, repeat=20):
+    api = API(
+        {
+            Constants.URL: "http://127.0.0.1/src/jsonrpc.php",
+            Constants.KEY: "benchmark",
+        }
+    )
+
+    data = [
+        {
+            "version": "2.0",
+            "method": "cmdb.category.read",
+            "params": {"objID": index, "category": "C__CATG__GLOBAL"},
+            "id": index + 1,
+        }
+        for index in range(size)
+    ]
+    responses = [
+        {"jsonrpc": "2.0", "result": [{"id": str(request["id"])}], "id": request["id"]}
+        for request in data
+    ]
+    shuffled = list(responses)
+    random.Random(0).shuffle(shuffled)
+
+    positional = min(
+        timeit.repeat(lambda: _positional(responses), number=1, repeat=repeat)
+    )
+    correlated = min(
+        timeit.repeat(
+            lambda: api._correlate_responses(data, shuffled), number=1, repeat=repeat
+        )
+    )
+
+    body = json.dumps(shuffled)
+    decoding = min(timeit.repeat(lambda: json.loads(body), number=1, repeat=repeat))
+
+    print(f"batch size:            {size}")
+    print(f"positional pairing:    {positional * 1000:8.2f} ms")
+    print(f"correlation by id:     {correlated * 1000:8.2f} ms")
+    print(f"decoding the response: {decoding * 1000:8.2f} ms (for comparison)")
+    print(f"overhead per request:  {(correlated - positional) / size * 1e9:8.1f} ns")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,66 @@
+"""Benchmark: fresh session per request vs. pooled connection.
+
+Starts the stand-in JSON-RPC server on localhost and measures how many
+requests per second the client achieves when it opens a new session for
+every call (the behaviour before the connection pool was introduced) and
+when it re-uses the pooled session of the API instance.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_connection_pool.py [number_of_requests]
+"""
+
+import json
+import sys
+import time
+
+import requests
+
+from idoit_api_client import API, Constants
+from idoit_api_client.standin import StandInDataset, StandInServer
+
+
+def _fresh_session_execute(api, data):
+    """Sends a request the way API._execute did before pooling."""
+    session = requests.Session()
+    session.verify = False
+    response = session.post(
+        api._config[Constants.URL],
+        data=json.dumps(data),
+        headers=api._options["CURLOPT_HTTPHEADER"],
+    )
+    session.close()
+    return response.json()
+
+
+def _measure(api, amount):
+    start = time.perf_counter()
+    for _ in range(amount):
+        api.request("cmdb.category.read", {"objID": 1, "category": "C__CATG__GLOBAL"})
+    return amount / (time.perf_counter() - start)
+
+
+def main(amount=2000):
+    server = StandInServer(StandInDataset().populate(1, 1, 1))
+    config = {Constants.URL: server.serve(), Constants.KEY: "benchmark"}
+
+    try:
+        api = API(dict(config))
+        api._execute = lambda data={}: _fresh_session_execute(api, data)
+        before = _measure(api, amount)
+
+        api = API(dict(config))
+        api.connect()
+        after = _measure(api, amount)
+        api.disconnect()
+    finally:
+        server.shutdown()
+
+    print(f"requests:                {amount}")
+    print(f"fresh session per call:  {before:10.1f} req/s")
+    print(f"pooled connection:       {after:10.1f} req/s")
+    print(f"speed-up:                {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
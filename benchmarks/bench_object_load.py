@@ -0,0 +1,144 @@
+"""Benchmark: client CPU time of CMDBObject.load() for a large object.
+
+The transport answers from a recorded object with many categories without any
+serialization, so only the work of the client is measured. The former
+implementation, which searched the categories for every result, is kept here
+for comparison.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_object_load.py [categories] [rounds]
+"""
+
+import copy
+import sys
+import time
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategory import CMDBCategory
+from idoit_api_client.cmdbcategoryinfo import (
+    VIRTUAL_CATEGORY_CONSTANTS,
+    CMDBCategoryInfo,
+)
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
+
+OBJECT_ID = 1000
+OBJECT_TYPE = 5
+
+
+def _record(categories):
+    virtual = sorted(VIRTUAL_CATEGORY_CONSTANTS)
+    constants = [f"C__CATG__BENCH_{index}" for index in range(categories)]
+    # Mix virtual categories in like i-doit does:
+    for index, constant in enumerate(virtual):
+        constants.insert(index * 7 % len(constants), constant)
+    assigned = {
+        "catg": [
+            {"id": str(index), "const": constant, "title": constant}
+            for index, constant in enumerate(constants)
+        ],
+        "cats": [],
+        "custom": [],
+    }
+    entries = {
+        constant: [
+            {"id": str(entry), "objID": str(OBJECT_ID), "title": f"{constant} {entry}"}
+            for entry in range(3)
+        ]
+        for constant in constants
+    }
+    return (
+        {"id": OBJECT_ID, "title": "Large", "objecttype": OBJECT_TYPE},
+        assigned,
+        entries,
+    )
+
+
+def _use_api(categories):
+    object, assigned, entries = _record(categories)
+    api = API(
+        {
+            Constants.URL: "http://127.0.0.1/src/jsonrpc.php",
+            Constants.KEY: "benchmark",
+        }
+    )
+
+    def respond(request):
+        method = request["method"]
+        if method == "cmdb.object.read":
+            result = object
+        elif method == "cmdb.object_type_categories.read":
+            result = assigned
+        else:
+            result = entries[request["params"]["category"]]
+        return {"jsonrpc": "2.0", "result": result, "id": request["id"]}
+
+    def execute(data={}):
+        if isinstance(data, list):
+            return [respond(request) for request in data]
+        return respond(data)
+
+    api._execute = execute
+    return api
+
+
+def _load_by_search(api, object_id):
+    """Former implementation: one linear search per category result"""
+    object = CMDBObject(api).read(object_id)
+    object = {
+        **object,
+        **copy.deepcopy(CMDBObjectTypeCategories(api).read_by_id(object["objecttype"])),
+    }
+    blacklisted_category_constants = CMDBCategoryInfo(
+        api
+    ).get_virtual_category_constants()
+
+    for category_type in ["catg", "cats", "custom"]:
+        category_constants = [
+            category["const"]
+            for category in object[category_type]
+            if category["const"] not in blacklisted_category_constants
+        ]
+
+        if len(category_constants) == 0:
+            continue
+
+        category_entries = CMDBCategory(api).batch_read([object_id], category_constants)
+
+        for i in range(len(category_entries)):
+            for category in object[category_type]:
+                if category["const"] == category_constants[i]:
+                    category["entries"] = category_entries[i]
+                    break
+
+    return object
+
+
+def _measure(function, rounds):
+    start = time.process_time()
+    for _ in range(rounds):
+        function()
+    return (time.process_time() - start) / rounds
+
+
+def main(categories=2000, rounds=5):
+    api = _use_api(categories)
+    cmdb_object = CMDBObject(api)
+
+    assert cmdb_object.load(OBJECT_ID) == _load_by_search(api, OBJECT_ID)
+
+    by_search = _measure(lambda: _load_by_search(api, OBJECT_ID), rounds)
+    by_index = _measure(lambda: cmdb_object.load(OBJECT_ID), rounds)
+
+    print(f"categories:           {categories}")
+    print(f"load() by search:     {by_search * 1000:8.1f} ms CPU")
+    print(f"load() by index:      {by_index * 1000:8.1f} ms CPU")
+    print(f"speed-up:             {by_search / by_index:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
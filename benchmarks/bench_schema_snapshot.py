@@ -0,0 +1,115 @@
+"""Benchmark: cold start with and without a schema snapshot.
+
+Compares CMDBCategoryInfo.read_all() against the API with loading a schema
+snapshot file and answering read_all() from it. The API is simulated by a
+transport which encodes and decodes every request as JSON and waits for a
+configurable round-trip time.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_schema_snapshot.py [rtt_in_ms]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.schemasnapshot import SchemaSnapshot
+
+TYPES = 100
+CATEGORIES = 300
+ATTRIBUTES = 20
+
+
+def _schema():
+    categories = [f"C__CATG__BENCH_{index}" for index in range(CATEGORIES)]
+    object_types = [
+        {"id": str(index), "const": f"C__OBJTYPE__BENCH_{index}", "title": str(index)}
+        for index in range(1, TYPES + 1)
+    ]
+    assignments = {
+        object_type["id"]: {
+            "catg": [
+                {
+                    "id": str(index),
+                    "const": categories[index],
+                    "title": categories[index],
+                }
+                for index in range(int(object_type["id"]) % 7, CATEGORIES, 3)
+            ]
+        }
+        for object_type in object_types
+    }
+    info = {
+        "attribute_{}".format(index): {
+            "title": f"Attribute {index}",
+            "info": {"primary_field": False, "type": "text", "backward": False},
+            "data": {"type": "text", "readonly": False, "index": False},
+            "ui": {"type": "text", "params": {"p_nMaxLen": 255}, "default": None},
+        }
+        for index in range(ATTRIBUTES)
+    }
+    return object_types, assignments, info
+
+
+def _use_api(rtt):
+    object_types, assignments, info = _schema()
+    api = API(
+        {
+            Constants.URL: "http://127.0.0.1/src/jsonrpc.php",
+            Constants.KEY: "benchmark",
+        }
+    )
+
+    def respond(request):
+        method = request["method"]
+        if method == "cmdb.object_types.read":
+            result = object_types
+        elif method == "cmdb.object_type_categories.read":
+            result = assignments[str(request["params"]["type"])]
+        else:
+            result = info
+        return {"jsonrpc": "2.0", "result": result, "id": request["id"]}
+
+    def execute(data={}):
+        data = json.loads(json.dumps(data))
+        if isinstance(data, list):
+            body = json.dumps([respond(request) for request in data])
+        else:
+            body = json.dumps(respond(data))
+        time.sleep(rtt)
+        return json.loads(body)
+
+    api._execute = execute
+    return api
+
+
+def main(rtt_ms=30):
+    rtt = rtt_ms / 1000
+    path = os.path.join(tempfile.mkdtemp(), "schema.json")
+
+    api = _use_api(rtt)
+    start = time.perf_counter()
+    categories = CMDBCategoryInfo(api).read_all()
+    from_api = time.perf_counter() - start
+
+    SchemaSnapshot.export(_use_api(0), path)
+
+    api = _use_api(rtt)
+    start = time.perf_counter()
+    api.set_schema_snapshot(SchemaSnapshot.load(path))
+    assert CMDBCategoryInfo(api).read_all() == categories
+    from_snapshot = time.perf_counter() - start
+
+    print(f"categories:           {len(categories)}")
+    print(f"snapshot size:        {os.path.getsize(path) / 1024:8.1f} KiB")
+    print(f"read_all() from API:  {from_api * 1000:8.1f} ms (rtt {rtt_ms} ms)")
+    print(f"load snapshot:        {from_snapshot * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,319 @@
+"""Benchmark suite: request, batch_request, load and bulk paths.
+
+Runs every scenario against the stand-in server (idoit_api_client.standin),
+in-process by default or over HTTP on localhost with --http, and records per
+scenario:
+
+* wall time per round (minimum, median and maximum)
+* client CPU time per round: CPU time of the process minus the time spent
+  inside the stand-in server
+* peak memory allocated by Python during one round (tracemalloc)
+* maximum resident set size of the process after the scenario
+
+Results are written as JSON. With --compare, the medians are compared to an
+earlier result file and the script exits with status 1 if a scenario became
+slower than the threshold allows.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/run_suite.py [--output results.json]
+        [--compare baseline.json] [--threshold 1.25] [--rounds 5] [--http]
+        [--quick] [--only NAME]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+import idoit_api_client
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategory import CMDBCategory
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.standin import StandInDataset, StandInServer
+
+FORMAT_VERSION = 1
+
+
+def _single_request(api, amount=100):
+    def run():
+        for object_id in range(1, amount + 1):
+            api.request("cmdb.object.read", {"id": object_id})
+
+    return run, {"requests": amount}
+
+
+def _batch_request(api, size, objects):
+    requests = [
+        {"method": "cmdb.object.read", "params": {"id": index % objects + 1}}
+        for index in range(size)
+    ]
+
+    def run():
+        # batch_request() adds the API key to the given parameters:
+        api.batch_request([dict(request) for request in requests])
+
+    return run, {"requests": size}
+
+
+def _load(api, objects):
+    def run():
+        for object_id in range(1, objects + 1):
+            CMDBObject(api).load(object_id)
+
+    return run, {"objects": objects}
+
+
+def _read_all(api):
+    def run():
+        CMDBCategoryInfo(api).read_all()
+
+    return run, {}
+
+
+def _batch_read(api, objects, categories):
+    object_ids = list(range(1, objects + 1))
+    constants = [f"C__CATG__STAND_IN_{index}" for index in range(1, categories + 1)]
+
+    def run():
+        CMDBCategory(api).batch_read(object_ids, constants)
+
+    return run, {"requests": objects * categories}
+
+
+def get_scenarios(quick=False):
+    """Lists the scenarios
+
+    :param quick: Leave out the largest sizes
+
+    :return: List of tuples of name, arguments of StandInDataset.populate() and
+        a callable which gets the API and returns the code to measure with
+        additional information"""
+    batch_sizes = (10, 100, 1000) if quick else (10, 100, 1000, 10000)
+    widths = (50, 200) if quick else (50, 200, 1000)
+    read_scales = (10, 100) if quick else (10, 100, 1000)
+
+    scenarios = [("request", (100, 1, 5), _single_request)]
+
+    for size in batch_sizes:
+        scenarios.append(
+            (
+                f"batch_request[{size}]",
+                (100, 1, 1),
+                lambda api, size=size: _batch_request(api, size, 100),
+            )
+        )
+
+    for width in widths:
+        scenarios.append(
+            (
+                f"load[{width} categories]",
+                (10, 1, width),
+                lambda api: _load(api, 10),
+            )
+        )
+
+    scenarios.append(("category_info.read_all", (10, 20, 50), _read_all))
+
+    for objects in read_scales:
+        scenarios.append(
+            (
+                f"batch_read[{objects}x10]",
+                (objects, 1, 10),
+                lambda api, objects=objects: _batch_read(api, objects, 10),
+            )
+        )
+
+    return scenarios
+
+
+def measure(populate, scenario, rounds, http=False):
+    """Runs a scenario
+
+    :return: Results of the scenario"""
+    server = StandInServer(StandInDataset().populate(*populate))
+    server_time = _time_server(server)
+    config = {Constants.URL: "http://127.0.0.1/src/jsonrpc.php", Constants.KEY: "b"}
+
+    if http:
+        config[Constants.URL] = server.serve()
+
+    api = API(config)
+
+    if http:
+        api.connect()
+    else:
+        server.attach(api)
+
+    try:
+        run, info = scenario(api)
+        run()  # Warm up
+
+        walls = []
+        cpus = []
+
+        for _ in range(rounds):
+            server_time[0] = 0
+            cpu = time.process_time()
+            wall = time.perf_counter()
+            run()
+            walls.append(time.perf_counter() - wall)
+            cpus.append(max(time.process_time() - cpu - server_time[0], 0))
+
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        if http:
+            api.disconnect()
+            server.shutdown()
+
+    result = {
+        "rounds": rounds,
+        "wall_seconds": {
+            "min": min(walls),
+            "median": statistics.median(walls),
+            "max": max(walls),
+        },
+        "client_cpu_seconds": {
+            "min": min(cpus),
+            "median": statistics.median(cpus),
+            "max": max(cpus),
+        },
+        "peak_traced_bytes": peak,
+        "max_rss_kilobytes": _max_rss(),
+        "server_stats": server.get_stats(),
+    }
+    result.update(info)
+
+    if "requests" in info:
+        result["requests_per_second"] = (
+            info["requests"] / result["wall_seconds"]["median"]
+        )
+
+    return result
+
+
+def _time_server(server):
+    """Sums up the time spent in the server, which runs in this process"""
+    total = [0]
+    lock = threading.Lock()
+    handle = server.handle
+
+    def timed_handle(payload):
+        start = time.perf_counter()
+
+        try:
+            return handle(payload)
+        finally:
+            with lock:
+                total[0] += time.perf_counter() - start
+
+    server.handle = timed_handle
+
+    return total
+
+
+def _max_rss():
+    if resource is None:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def compare(results, baseline, threshold):
+    """Compares median wall times with an earlier run
+
+    :return: List of names of scenarios which became slower than the threshold"""
+    regressions = []
+
+    if baseline.get("transport") != results["transport"]:
+        print(
+            "Warning: comparing {} with {} results".format(
+                results["transport"], baseline.get("transport")
+            )
+        )
+
+    for name, result in results["results"].items():
+        if name not in baseline.get("results", {}):
+            continue
+
+        before = baseline["results"][name]["wall_seconds"]["median"]
+        after = result["wall_seconds"]["median"]
+        ratio = after / before if before > 0 else float("inf")
+        flag = ""
+
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+
+        print(
+            f"{name:32} {before * 1000:10.2f} ms {after * 1000:10.2f} ms "
+            f"{ratio:6.2f}x{flag}"
+        )
+
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--http", action="store_true", help="Use HTTP on localhost")
+    parser.add_argument("--quick", action="store_true", help="Skip large sizes")
+    parser.add_argument("--only", help="Run scenarios containing this text only")
+    arguments = parser.parse_args(arguments)
+
+    results = {
+        "format": FORMAT_VERSION,
+        "client_version": idoit_api_client.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "transport": "http" if arguments.http else "in-process",
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "results": {},
+    }
+
+    for name, populate, scenario in get_scenarios(arguments.quick):
+        if arguments.only is not None and arguments.only not in name:
+            continue
+
+        result = measure(populate, scenario, arguments.rounds, arguments.http)
+        results["results"][name] = result
+        print(
+            f"{name:32} {result['wall_seconds']['median'] * 1000:10.2f} ms "
+            f"cpu {result['client_cpu_seconds']['median'] * 1000:10.2f} ms "
+            f"peak {result['peak_traced_bytes'] / 1024:10.1f} KiB"
+        )
+
+    with open(arguments.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+
+    print(f"Results written to {arguments.output}")
+
+    if arguments.compare is not None:
+        with open(arguments.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+        if len(compare(results, baseline, arguments.threshold)) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,28 @@ __version__ = "0.1.0"
 
 
 from multiprocessing.sharedctypes import Value
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
-from requests import Request as ReqRequest, Session
+from requests.adapters import HTTPAdapter
+import contextvars
 import json
+import time
+
+from idoit_api_client.coalescer import Coalescer
+from idoit_api_client.metadatacache import MetadataCache
+from idoit_api_client.metrics import MetricsRegistry
+from idoit_api_client.schemasnapshot import SchemaSnapshot
+from idoit_api_client.singleflight import SingleFlight, is_read_only
+from idoit_api_client.tracing import (
+    SPAN_KIND_CLIENT,
+    STATUS_CODE_ERROR,
+    FileExporter,
+    Tracer,
+    get_current_span,
+    get_request_attributes,
+    traced,
+)
 
 """Constants"""
 
@@ -87,6 +106,116 @@ class Constants:
     Configuration: Disable security-related cURL options
     """
     BYPASS_SECURE_CONNECTION = "bypassSecureConnection"
+    """
+    Configuration: Maximum number of pooled connections to the API host
+    """
+    POOL_SIZE = "poolSize"
+    """
+    Default size of the connection pool
+    """
+    POOL_SIZE_DEFAULT = 10
+    """
+    Configuration: Keep connections alive between requests?
+    """
+    KEEP_ALIVE = "keepAlive"
+    """
+    Configuration: How often to retry a request which failed to connect
+    """
+    MAX_RETRIES = "maxRetries"
+    """
+    Default number of connection retries
+    """
+    MAX_RETRIES_DEFAULT = 0
+    """
+    Configuration: Maximum number of concurrent requests of AsyncAPI
+    """
+    MAX_IN_FLIGHT = "maxInFlight"
+    """
+    Configuration: Maximum number of sub-requests sent in one batch
+    """
+    BATCH_MAX_REQUESTS = "batchMaxRequests"
+    """
+    Default maximum number of sub-requests in one batch
+    """
+    BATCH_MAX_REQUESTS_DEFAULT = 1000
+    """
+    Configuration: Maximum size of one encoded batch in bytes
+    """
+    BATCH_MAX_BYTES = "batchMaxBytes"
+    """
+    Default maximum size of one encoded batch (stays below PHP's default
+    post_max_size of 8 MB)
+    """
+    BATCH_MAX_BYTES_DEFAULT = 4 * 1024 * 1024
+    """
+    Configuration: Number of batch chunks sent in parallel
+    """
+    BATCH_WORKERS = "batchWorkers"
+    """
+    Error code for a sub-request which got no response in a batch
+    """
+    ERROR_MISSING_RESPONSE = -32001
+    """
+    Error code for a sub-request which got more than one response in a batch
+    """
+    ERROR_DUPLICATE_RESPONSE = -32002
+    """
+    Error code for a sub-request whose batch chunk failed as a whole
+    """
+    ERROR_FAILED_CHUNK = -32003
+    """
+    Configuration: Merge requests sent within this many milliseconds into
+    one batch request (disabled if not set)
+    """
+    COALESCE_WINDOW = "coalesceWindow"
+    """
+    Configuration: Send merged requests as soon as this many are queued
+    """
+    COALESCE_MAX_REQUESTS = "coalesceMaxRequests"
+    """
+    Default number of requests which are merged at most
+    """
+    COALESCE_MAX_REQUESTS_DEFAULT = 100
+    """
+    Configuration: Let identical concurrent read requests share one call?
+    """
+    SINGLE_FLIGHT = "singleFlight"
+    """
+    Configuration: Metadata cache settings
+    """
+    METADATA_CACHE = "metadataCache"
+    """
+    Configuration: Activate metadata cache?
+    """
+    METADATA_CACHE_ACTIVE = "active"
+    """
+    Configuration: Time to live of cached metadata in seconds
+    """
+    METADATA_CACHE_TTL = "ttl"
+    """
+    Default time to live of cached metadata (one day)
+    """
+    METADATA_CACHE_TTL_DEFAULT = 86400
+    """
+    Configuration: Directory to persist cached metadata to
+    """
+    METADATA_CACHE_PATH = "path"
+    """
+    Configuration: Path to a schema snapshot file
+    """
+    SCHEMA_SNAPSHOT = "schemaSnapshot"
+    """
+    Configuration: Path to a local mirror to answer cmdb.objects.read from
+    """
+    LOCAL_MIRROR = "localMirror"
+    """
+    Configuration: Record latency and payload sizes of all calls?
+    """
+    METRICS = "metrics"
+    """
+    Configuration: Append spans of all calls to this file (OTLP/JSON)
+    """
+    TRACE_FILE = "traceFile"
 
     CURLPROTO_HTTP = 1
     CURLPROTO_HTTPS = 2
@@ -134,13 +263,86 @@ class API:
     """Composer Information about this project"""
     _composer = {}
 
+    """Merges requests into batch requests if enabled"""
+    _coalescer = None
+
+    """Shares identical concurrent read requests if enabled"""
+    _single_flight = None
+
+    """Caches metadata if enabled"""
+    _metadata_cache = None
+
+    """Schema snapshot if one is used"""
+    _schema_snapshot = None
+
+    """Answers cmdb.objects.read from a local mirror if enabled"""
+    _query_engine = None
+
+    """Records metrics of all calls if enabled"""
+    _metrics = None
+
+    """Records spans of all calls if enabled"""
+    _tracer = None
+
+    """Middlewares around every call, outermost first"""
+    _middlewares = ()
+
+    """Middlewares composed with _execute(), None without middlewares"""
+    _pipeline = None
+
     def __init__(self, config):
         """Constructor"""
         self._config = config
+        self._id_lock = threading.Lock()
         self._test_config()
         self._set_composer_options()
         self._set_curl_options()
 
+        if Constants.COALESCE_WINDOW in self._config:
+            self._coalescer = Coalescer(
+                self,
+                self._config[Constants.COALESCE_WINDOW],
+                self._config[Constants.COALESCE_MAX_REQUESTS],
+            )
+
+        if self._config[Constants.SINGLE_FLIGHT]:
+            self._single_flight = SingleFlight()
+
+        if self._config[Constants.METRICS]:
+            self._metrics = MetricsRegistry()
+
+        if Constants.TRACE_FILE in self._config:
+            self._tracer = Tracer(
+                FileExporter(self._config[Constants.TRACE_FILE])
+            )
+
+        settings = self._config.get(Constants.METADATA_CACHE)
+
+        if settings is not None and settings[Constants.METADATA_CACHE_ACTIVE]:
+            self._metadata_cache = MetadataCache(
+                self._config[Constants.URL],
+                self._config.get(Constants.LANGUAGE),
+                settings.get(
+                    Constants.METADATA_CACHE_TTL,
+                    Constants.METADATA_CACHE_TTL_DEFAULT,
+                ),
+                settings.get(Constants.METADATA_CACHE_PATH),
+            )
+
+        if Constants.SCHEMA_SNAPSHOT in self._config:
+            self.set_schema_snapshot(
+                SchemaSnapshot.load(self._config[Constants.SCHEMA_SNAPSHOT])
+            )
+
+        if Constants.LOCAL_MIRROR in self._config:
+            # Imported here because these modules import this package:
+            from idoit_api_client.mirror import Mirror
+            from idoit_api_client.query import QueryEngine
+
+            self._query_engine = QueryEngine(
+                Mirror(self, self._config[Constants.LOCAL_MIRROR]), self
+            )
+
     def _set_curl_options(self):
         """Sets cURL options"""
         self._options = {
@@ -148,7 +350,7 @@ class API:
             # Follow (only) 301s and 302s:
             "CURLOPT_FOLLOWLOCATION": True,
             "CURLOPT_POSTREDIR": (1 | 2),
-            "CURLOPT_FRESH_CONNECT": True,
+            "CURLOPT_FRESH_CONNECT": not self._config[Constants.KEEP_ALIVE],
             "CURLOPT_HEADER": True,
             "CURLINFO_HEADER_OUT": True,
             "CURLOPT_CUSTOMREQUEST": "POST",
@@ -277,7 +479,7 @@ class API:
         for header, value in headers:
             self._options[Constants.CURLOPT_HTTPHEADER][header] = value
 
-        return self._execute(data)
+        return self._call(data)
 
     def _get_last_info(self):
         """Returns the last request information
@@ -451,14 +653,125 @@ class API:
         else:
             self._config[Constants.BYPASS_SECURE_CONNECTION] = False
 
+        """Connection pool"""
+        if Constants.POOL_SIZE in self._config:
+            self._check_positive_int(Constants.POOL_SIZE)
+        else:
+            self._config[Constants.POOL_SIZE] = Constants.POOL_SIZE_DEFAULT
+
+        if Constants.KEEP_ALIVE in self._config:
+            if not isinstance(self._config[Constants.KEEP_ALIVE], bool):
+                raise Exception("Keep-alive setting must be a boolean.")
+        else:
+            self._config[Constants.KEEP_ALIVE] = True
+
+        if Constants.MAX_RETRIES in self._config:
+            value = self._config[Constants.MAX_RETRIES]
+
+            if type(value) is not int or value < 0:
+                raise Exception(
+                    f'Configuration setting "{Constants.MAX_RETRIES}" must be a non-negative integer.'
+                )
+        else:
+            self._config[Constants.MAX_RETRIES] = Constants.MAX_RETRIES_DEFAULT
+
+        if Constants.MAX_IN_FLIGHT in self._config:
+            self._check_positive_int(Constants.MAX_IN_FLIGHT)
+
+        """Batch chunking"""
+        defaults = {
+            Constants.BATCH_MAX_REQUESTS: Constants.BATCH_MAX_REQUESTS_DEFAULT,
+            Constants.BATCH_MAX_BYTES: Constants.BATCH_MAX_BYTES_DEFAULT,
+            Constants.BATCH_WORKERS: 1,
+        }
+
+        for setting, default in defaults.items():
+            if setting in self._config:
+                self._check_positive_int(setting)
+            else:
+                self._config[setting] = default
+
+        """Single-flight deduplication"""
+        if Constants.SINGLE_FLIGHT in self._config:
+            if not isinstance(self._config[Constants.SINGLE_FLIGHT], bool):
+                raise Exception("Single-flight setting must be a boolean.")
+        else:
+            self._config[Constants.SINGLE_FLIGHT] = False
+
+        """Metrics"""
+        if Constants.METRICS in self._config:
+            if not isinstance(self._config[Constants.METRICS], bool):
+                raise Exception("Metrics setting must be a boolean.")
+        else:
+            self._config[Constants.METRICS] = False
+
+        """Tracing"""
+        if Constants.TRACE_FILE in self._config:
+            self._check_string(Constants.TRACE_FILE)
+
+        """Metadata cache"""
+        if Constants.METADATA_CACHE in self._config:
+            settings = self._config[Constants.METADATA_CACHE]
+
+            if not isinstance(settings, dict):
+                raise Exception("Metadata cache settings must be an object.")
+
+            if not isinstance(
+                settings.get(Constants.METADATA_CACHE_ACTIVE), bool
+            ):
+                raise Exception(
+                    "Metadata cache active setting must be a boolean."
+                )
+
+            if Constants.METADATA_CACHE_TTL in settings:
+                ttl = settings[Constants.METADATA_CACHE_TTL]
+
+                if type(ttl) not in (int, float) or ttl <= 0:
+                    raise Exception(
+                        "Metadata cache TTL must be a positive number."
+                    )
+
+            if settings.get(Constants.METADATA_CACHE_PATH) is not None:
+                self._check_string(
+                    Constants.METADATA_CACHE_PATH, Constants.METADATA_CACHE
+                )
+
+        """Schema snapshot"""
+        if Constants.SCHEMA_SNAPSHOT in self._config:
+            self._check_string(Constants.SCHEMA_SNAPSHOT)
+
+        """Local mirror"""
+        if Constants.LOCAL_MIRROR in self._config:
+            self._check_string(Constants.LOCAL_MIRROR)
+
+        """Request coalescing"""
+        if Constants.COALESCE_WINDOW in self._config:
+            self._check_positive_int(Constants.COALESCE_WINDOW)
+
+        if Constants.COALESCE_MAX_REQUESTS in self._config:
+            self._check_positive_int(Constants.COALESCE_MAX_REQUESTS)
+        else:
+            self._config[
+                Constants.COALESCE_MAX_REQUESTS
+            ] = Constants.COALESCE_MAX_REQUESTS_DEFAULT
+
         return True
 
+    def _check_positive_int(self, key):
+        """Checks if a key is set in configuration and a positive integer"""
+        value = self._config[key]
+
+        if type(value) is not int or value < 1:
+            raise Exception(
+                f'Configuration setting "{key}" must be a positive integer.'
+            )
+
     def _check_string(self, key, sub_key=None):
         """Check if a key is set in configuration and a string"""
         value = None
 
         if sub_key is not None:
-            sub_key = self._config[sub_key][key]
+            value = self._config[sub_key][key]
         else:
             value = self._config[key]
 
@@ -470,7 +783,7 @@ class API:
         value = None
 
         if sub_key is not None:
-            sub_key = self._config[sub_key][key]
+            value = self._config[sub_key][key]
         else:
             value = self._config[key]
 
@@ -487,6 +800,7 @@ class API:
         """Is client logged-in to API?"""
         return self._session is not None
 
+    @traced("API.login")
     def login(self):
         """Login to API"""
         if self.is_logged_in():
@@ -505,6 +819,7 @@ class API:
 
         self._session = response["session-id"]
 
+    @traced("API.logout")
     def logout(self):
         """Logout from API"""
         if not self.is_logged_in():
@@ -516,48 +831,448 @@ class API:
 
     def _gen_id(self):
         """Generate JSON-RPC request identifier"""
-        self._id += 1
-        return self._id
+        with self._id_lock:
+            self._id += 1
+            return self._id
 
     def count_requests(self):
         """How many requests were already send?"""
         return self._id
 
+    @traced("API.request", get_request_attributes)
     def request(self, method, params={}):
         """Sends request to API
 
+        If request coalescing is enabled the request is merged with other
+        requests sent within the configured window. If single-flight is
+        enabled, identical read requests which run at the same time share
+        one call and its result. If the metadata cache is enabled, requests
+        for object types, their categories and category information are
+        answered from the cache when possible. If a local mirror is used and
+        has been synced, cmdb.objects.read is answered by its query engine.
+
         Args:
             method: JSON-RPC method
             params: Optional parameters
 
         Returns:
             Result of request"""
+        if (
+            self._query_engine is not None
+            and method == "cmdb.objects.read"
+            and self._query_engine.is_ready()
+        ):
+            return self._query_engine.request(params)
+
+        cache = self._metadata_cache
+
+        if cache is not None and cache.is_cacheable(method):
+            key = cache.key(method, params)
+            hit, result = cache.get(key)
+
+            if hit:
+                return result
+
+            result = self._deduplicated_request(method, params)
+            cache.set(key, result)
+
+            return result
+
+        return self._deduplicated_request(method, params)
+
+    def _deduplicated_request(self, method, params):
+        """Sends request to API, sharing identical concurrent reads"""
+        if self._single_flight is not None and is_read_only(method):
+            return self._single_flight.do(
+                self._single_flight.key(method, params),
+                self._request,
+                method,
+                params,
+            )
+
+        return self._request(method, params)
+
+    def _request(self, method, params):
+        """Sends request to API without single-flight deduplication"""
+        if self._coalescer is not None and method not in (
+            "idoit.login",
+            "idoit.logout",
+        ):
+            return self._coalescer.submit(method, params).result()
+
         data = {
             "version": "2.0",
             "method": method,
-            "params": params,
+            "params": self._add_default_params(dict(params)),
             "id": self._gen_id(),
         }
 
-        data["params"]["apikey"] = self._config[Constants.KEY]
+        response = self._call(data)
+        self._evaluate_response(response)
+
+        return response["result"]
+
+    def _add_default_params(self, params):
+        """Adds the API key and the configured language to parameters
+
+        A language given by the caller is kept.
+
+        Args:
+            params: Parameters, changed in place
+
+        Returns:
+            The same parameters"""
+        params["apikey"] = self._config[Constants.KEY]
 
         if Constants.LANGUAGE in self._config:
-            if Constants.LANGUAGE not in data["params"]:
-                data["params"]["language"] = self._config[Constants.LANGUAGE]
+            if Constants.LANGUAGE not in params:
+                params["language"] = self._config[Constants.LANGUAGE]
 
-        response = self._execute(data)
-        self._evaluate_response(response)
+        return params
 
-        return response["result"]
+    def submit(self, method, params={}):
+        """Sends request to API and returns a future
+
+        With request coalescing enabled the future resolves once the batch
+        which contains the request has been answered. Otherwise the request
+        is sent immediately.
+
+        Args:
+            method: JSON-RPC method
+            params: Optional parameters
+
+        Returns:
+            Future: Resolves to the result of request"""
+        if self._coalescer is not None:
+            return self._coalescer.submit(method, params)
+
+        future = Future()
+
+        try:
+            future.set_result(self.request(method, params))
+        except Exception as error:
+            future.set_exception(error)
+
+        return future
+
+    def flush(self):
+        """Sends requests queued by request coalescing now
+
+        Also writes pending changes of the metadata cache to its file and
+        spans buffered by the exporter of the tracer."""
+        if self._coalescer is not None:
+            self._coalescer.flush()
+
+        if self._metadata_cache is not None:
+            self._metadata_cache.flush()
+
+        if self._tracer is not None:
+            self._tracer.flush()
+
+    def get_schema_snapshot(self):
+        """Returns the schema snapshot
+
+        Returns:
+            SchemaSnapshot: Snapshot or None if none is used"""
+        return self._schema_snapshot
+
+    def set_schema_snapshot(self, snapshot):
+        """Answers schema requests from a snapshot
+
+        Args:
+            snapshot (SchemaSnapshot): Snapshot or None to stop using one
+
+        Raises:
+            Exception: Snapshot was exported with another URL or language"""
+        if snapshot is not None:
+            snapshot.check_api(self)
+
+        self._schema_snapshot = snapshot
+
+    def get_query_engine(self):
+        """Returns the query engine of the local mirror
+
+        Returns:
+            QueryEngine: Engine or None if no local mirror is used"""
+        return self._query_engine
+
+    def set_query_engine(self, query_engine):
+        """Answers cmdb.objects.read from a local mirror
+
+        Args:
+            query_engine (QueryEngine): Engine or None to ask the API again"""
+        self._query_engine = query_engine
+
+    def add_middleware(self, middleware, index=None):
+        """Adds a middleware around every call sent to the API
 
-    def batch_request(self, requests):
+        A middleware is a callable middleware(data, call_next). It gets the
+        outgoing JSON-RPC envelope, a dict or a list of dicts for batch
+        requests, and returns the decoded response. It passes the envelope on
+        with call_next(data), possibly changed, or answers by itself without
+        calling call_next. Wrapping call_next lets a middleware time the rest
+        of the chain. The first middleware is the outermost one.
+
+        Args:
+            middleware (callable): Middleware
+            index (int): (Optional) position in the chain; last by default"""
+        if not callable(middleware):
+            raise Exception("Middleware must be callable")
+
+        middlewares = list(self._middlewares)
+
+        if index is None:
+            middlewares.append(middleware)
+        else:
+            middlewares.insert(index, middleware)
+
+        self._set_middlewares(middlewares)
+
+    def remove_middleware(self, middleware):
+        """Removes a middleware
+
+        Args:
+            middleware (callable): Middleware added before"""
+        if middleware not in self._middlewares:
+            raise Exception("Middleware not found")
+
+        middlewares = list(self._middlewares)
+        middlewares.remove(middleware)
+        self._set_middlewares(middlewares)
+
+    def get_middlewares(self):
+        """Returns the middlewares, outermost first
+
+        Returns:
+            list: Middlewares"""
+        return list(self._middlewares)
+
+    def _set_middlewares(self, middlewares):
+        """Composes the middlewares once, so calls only walk the chain"""
+
+        def call_next(data):
+            # Looked up on every call, so _execute() may be replaced:
+            return self._execute(data)
+
+        for middleware in reversed(middlewares):
+            call_next = _chain(middleware, call_next)
+
+        self._middlewares = tuple(middlewares)
+        self._pipeline = call_next if len(middlewares) > 0 else None
+
+    def _call(self, data):
+        """Sends a call through the middlewares to _execute()
+
+        With a tracer, every call gets a span of its own."""
+        tracer = self._tracer
+
+        if tracer is None:
+            return self._dispatch(data)
+
+        if isinstance(data, list):
+            attributes = {"rpc.batch_size": len(data)}
+        else:
+            attributes = get_request_attributes(
+                data.get("method"), data.get("params")
+            )
+
+        with tracer.span("jsonrpc.call", attributes, SPAN_KIND_CLIENT):
+            return self._dispatch(data)
+
+    def _dispatch(self, data):
+        """Passes a call to the middlewares or to _execute()"""
+        pipeline = self._pipeline
+
+        if pipeline is None:
+            return self._execute(data)
+
+        return pipeline(data)
+
+    def get_metrics(self):
+        """Returns the metrics registry
+
+        Returns:
+            MetricsRegistry: Registry or None if metrics are not recorded"""
+        return self._metrics
+
+    def set_metrics(self, metrics):
+        """Records metrics of all calls, e.g. in a registry shared by clients
+
+        Args:
+            metrics (MetricsRegistry): Registry or None to stop recording"""
+        self._metrics = metrics
+
+    def get_tracer(self):
+        """Returns the tracer
+
+        Returns:
+            Tracer: Tracer or None if calls are not traced"""
+        return self._tracer
+
+    def set_tracer(self, tracer):
+        """Records spans of requests, calls and composite operations
+
+        Args:
+            tracer (Tracer): Tracer or None to stop tracing"""
+        self._tracer = tracer
+
+    def _record_call(
+        self,
+        data,
+        response,
+        request_bytes,
+        response_bytes,
+        serialize_seconds,
+        transport_seconds,
+        parse_seconds,
+    ):
+        """Passes sizes and timings of a call to metrics and tracing
+
+        See MetricsRegistry.record_call() for the arguments."""
+        if self._metrics is not None:
+            self._metrics.record_call(
+                data,
+                response,
+                request_bytes,
+                response_bytes,
+                serialize_seconds,
+                transport_seconds,
+                parse_seconds,
+            )
+
+        span = get_current_span() if self._tracer is not None else None
+
+        if span is not None:
+            span.set_attributes(
+                {
+                    "http.request.body.size": request_bytes,
+                    "http.response.body.size": response_bytes,
+                    "rpc.serialize_seconds": serialize_seconds,
+                    "rpc.transport_seconds": transport_seconds,
+                    "rpc.parse_seconds": parse_seconds,
+                }
+            )
+
+            if isinstance(response, list):
+                errors = [
+                    item
+                    for item in response
+                    if isinstance(item, dict) and item.get("error") is not None
+                ]
+                span.set_attribute("rpc.errors", len(errors))
+
+                if len(errors) > 0:
+                    span.set_status(
+                        STATUS_CODE_ERROR,
+                        f"{len(errors)} of {len(data)} sub-requests failed",
+                    )
+            elif (
+                isinstance(response, dict)
+                and response.get("error") is not None
+            ):
+                error = response["error"]
+
+                if isinstance(error, dict):
+                    error = error.get("message", error)
+
+                span.set_status(STATUS_CODE_ERROR, str(error))
+
+    def get_metadata_cache(self):
+        """Returns the metadata cache
+
+        Returns:
+            MetadataCache: Cache or None if it is not enabled"""
+        return self._metadata_cache
+
+    @traced(
+        "API.batch_request",
+        lambda requests, partial=False: {
+            "rpc.batch_size": len(requests),
+            "rpc.methods": sorted(
+                {str(request.get("method")) for request in requests}
+            ),
+            "rpc.partial": partial,
+        },
+    )
+    def batch_request(self, requests, partial=False):
         """Sends batch request to API
 
+        By default the first failed sub-request raises an exception. With
+        partial=True every sub-request gets its own item instead:
+
+            {
+                "id": JSON-RPC request identifier,
+                "method": JSON-RPC method,
+                "params": parameters of the request (same object),
+                "result": result or None,
+                "error": error or None,
+                "code": error code or None,
+            }
+
+        Use failed_requests() to retry only the sub-requests which failed.
+
+        If the metadata cache is enabled, cached sub-requests are not sent.
+
         Args:
             requests: List of requests
+            partial: Return one result/error item per sub-request
 
         Returns:
             Result of request"""
+        cache = self._metadata_cache
+
+        if cache is None:
+            return self._batch_request(requests, partial)
+
+        results = [None] * len(requests)
+        misses = []
+
+        for index, request in enumerate(requests):
+            method = request.get("method")
+
+            if method is None or not cache.is_cacheable(method):
+                misses.append((index, None))
+                continue
+
+            key = cache.key(method, request.get("params", {}))
+            hit, result = cache.get(key)
+
+            if not hit:
+                misses.append((index, key))
+            elif partial:
+                results[index] = {
+                    "id": None,
+                    "method": method,
+                    "params": request.get("params", {}),
+                    "result": result,
+                    "error": None,
+                    "code": None,
+                }
+            else:
+                results[index] = result
+
+        if len(misses) == 0:
+            return results
+
+        fetched = self._batch_request(
+            [requests[index] for index, key in misses], partial
+        )
+
+        for (index, key), result in zip(misses, fetched):
+            results[index] = result
+
+            if key is None:
+                continue
+
+            if not partial:
+                cache.set(key, result)
+            elif result["error"] is None:
+                cache.set(key, result["result"])
+
+        return results
+
+    def _batch_request(self, requests, partial):
+        """Sends batch request to API without looking into the cache"""
         data = []
 
         for request in requests:
@@ -569,10 +1284,7 @@ class API:
             if "params" in request:
                 params = request["params"]
 
-            params["apikey"] = self._config[Constants.KEY]
-
-            if Constants.LANGUAGE in self._config:
-                params["language"] = self._config[Constants.LANGUAGE]
+            self._add_default_params(params)
 
             data.append(
                 {
@@ -583,42 +1295,260 @@ class API:
                 }
             )
 
-        responses = self._execute(data)
+        chunks = self._chunk_batch(data)
+        responses = []
+
+        for chunk, chunk_responses in zip(
+            chunks, self._execute_chunks(chunks, capture_errors=partial)
+        ):
+            if not partial:
+                responses += self._correlate_responses(chunk, chunk_responses)
+                continue
+
+            try:
+                if isinstance(chunk_responses, Exception):
+                    raise chunk_responses
+
+                responses += self._correlate_responses(chunk, chunk_responses)
+            except Exception as error:
+                responses += [
+                    {
+                        "id": sub_request["id"],
+                        "error": {
+                            "code": Constants.ERROR_FAILED_CHUNK,
+                            "message": str(error),
+                        },
+                    }
+                    for sub_request in chunk
+                ]
+
+        if partial:
+            return [
+                self._to_batch_item(sub_request, response)
+                for sub_request, response in zip(data, responses)
+            ]
+
+        problems = [
+            response["error"]["message"]
+            for response in responses
+            if response.get("error") is not None
+            and response["error"].get("code")
+            in (
+                Constants.ERROR_MISSING_RESPONSE,
+                Constants.ERROR_DUPLICATE_RESPONSE,
+            )
+        ]
+
+        if len(problems) > 0:
+            raise Exception(
+                "Invalid batch response: {}".format("; ".join(problems))
+            )
 
         results = []
 
         for response in responses:
-            if not isinstance(response, dict):
-                raise Exception("Response is not a dictionary")
             self._evaluate_response(response)
             results.append(response["result"])
 
         return results
 
-    def _execute(self, data={}):
-        """Sends request to API with headers and receives response"""
+    def _to_batch_item(self, sub_request, response):
+        """Builds the result/error item of a sub-request
+
+        Args:
+            sub_request (dict): JSON-RPC sub-request
+            response (dict): Correlated response
+
+        Returns:
+            dict: Item, see batch_request()"""
+        error = response.get("error")
+        code = None
+
+        if error is not None and isinstance(error, dict):
+            code = error.get("code")
+
+        return {
+            "id": sub_request["id"],
+            "method": sub_request["method"],
+            "params": sub_request["params"],
+            "result": response.get("result") if error is None else None,
+            "error": error,
+            "code": code,
+        }
+
+    def failed_requests(self, items):
+        """Returns the requests of failed items of a partial batch request
+
+        Args:
+            items (list): Items returned by batch_request(partial=True)
+
+        Returns:
+            list: Requests which may be passed to batch_request() again"""
+        return [
+            {"method": item["method"], "params": item["params"]}
+            for item in items
+            if item["error"] is not None
+        ]
+
+    def _correlate_responses(self, data, responses):
+        """Pairs batch responses with their sub-requests by identifier
+
+        JSON-RPC allows the server to answer a batch in any order. Responses
+        are indexed by their "id" and returned in the order of the
+        sub-requests. A sub-request without a response or with more than
+        one response gets an error response instead.
+
+        Args:
+            data (list): JSON-RPC sub-requests
+            responses (list): Responses from server
+
+        Returns:
+            list: One response per sub-request in the same order
+
+        Raises:
+            Exception: If responses are invalid"""
+        if not isinstance(responses, list):
+            if isinstance(responses, dict) and responses.get("error"):
+                raise Exception("Server error: {}".format(responses["error"]))
+            raise Exception("Invalid response: batch must be a list.")
+
+        indexed = {}
+        duplicates = set()
+
+        for response in responses:
+            if not isinstance(response, dict):
+                raise Exception("Response is not a dictionary")
+
+            response_id = response.get("id")
+
+            if response_id is None and response.get("error") is not None:
+                raise Exception("Server error: {}".format(response["error"]))
+
+            if response_id in indexed:
+                duplicates.add(response_id)
+
+            indexed[response_id] = response
+
+        ordered = []
+
+        for request in data:
+            request_id = request["id"]
+            response = indexed.get(request_id)
+
+            if response is None:
+                response = {
+                    "id": request_id,
+                    "error": {
+                        "code": Constants.ERROR_MISSING_RESPONSE,
+                        "message": "No response for sub-request {} ({})".format(
+                            request_id, request["method"]
+                        ),
+                    },
+                }
+            elif request_id in duplicates:
+                response = {
+                    "id": request_id,
+                    "error": {
+                        "code": Constants.ERROR_DUPLICATE_RESPONSE,
+                        "message": "Duplicate responses for sub-request {} ({})".format(
+                            request_id, request["method"]
+                        ),
+                    },
+                }
+
+            ordered.append(response)
+
+        return ordered
+
+    def _chunk_batch(self, data):
+        """Splits a batch into chunks
+
+        Each chunk holds at most "batchMaxRequests" sub-requests and is at
+        most "batchMaxBytes" long when encoded. A single sub-request which
+        exceeds the size limit is sent on its own.
+
+        Args:
+            data (list): JSON-RPC sub-requests
+
+        Returns:
+            list: List of chunks"""
+        max_requests = self._config[Constants.BATCH_MAX_REQUESTS]
+        max_bytes = self._config[Constants.BATCH_MAX_BYTES]
+
+        chunks = []
+        chunk = []
+        # Enclosing brackets:
+        size = 2
+
+        for item in data:
+            # Encoded sub-request plus separator:
+            item_size = len(json.dumps(item).encode("utf-8")) + 2
+
+            if len(chunk) > 0 and (
+                len(chunk) >= max_requests or size + item_size > max_bytes
+            ):
+                chunks.append(chunk)
+                chunk = []
+                size = 2
+
+            chunk.append(item)
+            size += item_size
+
+        if len(chunk) > 0:
+            chunks.append(chunk)
+
+        return chunks
+
+    def _execute_chunks(self, chunks, capture_errors=False):
+        """Sends batch chunks, in parallel if "batchWorkers" allows it
+
+        Args:
+            chunks (list): List of chunks
+            capture_errors (bool): Return the exception of a failed chunk
+                instead of raising it
+
+        Returns:
+            list: Responses per chunk in the same order as the chunks"""
+        workers = min(self._config[Constants.BATCH_WORKERS], len(chunks))
+
+        def execute_capturing(chunk):
+            try:
+                return self._call(chunk)
+            except Exception as error:
+                return error
+
+        execute = execute_capturing if capture_errors else self._call
+
+        if workers <= 1:
+            return [execute(chunk) for chunk in chunks]
+
         if not self.is_connected():
             self.connect()
 
-        self._last_request_content = data
+        # Chunks run in the context of the caller, so their spans stay nested:
+        contexts = [contextvars.copy_context() for chunk in chunks]
 
-        data_as_string = json.dumps(data)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda context, chunk: context.run(execute, chunk),
+                    contexts,
+                    chunks,
+                )
+            )
 
-        options = self._options
+    def _execute(self, data={}):
+        """Sends request to API with headers and receives response
 
-        options["CURLOPT_POSTFIELDS"] = data_as_string
+        The request is sent through the connection pool of the current
+        session, so consecutive requests re-use open connections."""
+        if not self.is_connected():
+            self.connect()
 
-        options["CURLOPT_HTTPHEADER"]["X-RPC-Auth-Username"] = self._config[
-            Constants.USERNAME
-        ]
-        options["CURLOPT_HTTPHEADER"]["X-RPC-Auth-Password"] = self._config[
-            Constants.PASSWORD
-        ]
+        headers = dict(self._options["CURLOPT_HTTPHEADER"])
 
         # if self._session is not None:
-        #    options["CURLOPT_HTTPHEADER"] = {
-        #        "X-Auth-Token": self._session
-        #    }
+        #    headers["X-Auth-Token"] = self._session
         if (
             Constants.USERNAME in self._config
             and isinstance(self._config[Constants.USERNAME], str)
@@ -627,30 +1557,67 @@ class API:
             and isinstance(self._config[Constants.PASSWORD], str)
             and self._config[Constants.PASSWORD] != ""
         ):
-            options["CURLOPT_HTTPHEADER"][
-                "X-RPC-Auth-Username"
-            ] = self._config[Constants.USERNAME]
-            options["CURLOPT_HTTPHEADER"][
-                "X-RPC-Auth-Password"
-            ] = self._config[Constants.PASSWORD]
+            headers["X-RPC-Auth-Username"] = self._config[Constants.USERNAME]
+            headers["X-RPC-Auth-Password"] = self._config[Constants.PASSWORD]
+
+        if not self._config[Constants.KEEP_ALIVE]:
+            headers["Connection"] = "close"
+
+        def send(data_as_string):
+            resp = self._resource.post(
+                self._config[Constants.URL],
+                data=data_as_string,
+                headers=headers,
+                timeout=(self._options["CURLOPT_CONNECTTIMEOUT"], None),
+            )
+            self._last_response_headers = resp.headers
 
-        # curl_setopt_array(self._resource, options)
+            return resp.content
 
-        headers = options["CURLOPT_HTTPHEADER"]
-        payload = options["CURLOPT_POSTFIELDS"]
+        return self._timed_call(data, send)
 
-        # Be sure not to verify SSL certificates
-        s = Session()
-        s.verify = False
-        req = ReqRequest(
-            "POST", self._config[Constants.URL], data=payload, headers=headers
-        )
-        prepped = s.prepare_request(req)
-        resp = s.send(prepped, verify=False)
+    def _timed_call(self, data, send):
+        """Encodes a call, sends it and decodes the response
+
+        Sizes and timings are passed to _record_call(), also if sending
+        fails or the response is no valid JSON, e.g. an HTML error page of
+        a proxy. Such calls count as failed.
+
+        Args:
+            data: JSON-RPC request or list of requests
+            send: Callable which gets the encoded request and returns the
+                encoded response
 
-        resp_body_object = resp.json()
+        Returns:
+            Decoded response"""
+        self._last_request_content = data
+
+        start = time.perf_counter()
+        data_as_string = json.dumps(data)
+        serialized = time.perf_counter()
+        received = None
+        response_body = b""
+        response = None
+
+        try:
+            response_body = send(data_as_string)
+            received = time.perf_counter()
+            response = json.loads(response_body)
+        finally:
+            finished = time.perf_counter()
+            self._record_call(
+                data,
+                response,
+                len(data_as_string),
+                len(response_body),
+                serialized - start,
+                (finished if received is None else received) - serialized,
+                0 if received is None else finished - received,
+            )
 
-        return resp_body_object
+        self._last_response = response
+
+        return response
 
     def is_connected(self):
         """Is client connected to API?"""
@@ -659,16 +1626,32 @@ class API:
         return False
 
     def connect(self):
-        """Connect to API"""
+        """Connect to API
+
+        Opens a session with a connection pool which is shared by all
+        requests of this instance until disconnect() is called."""
         self._resource = requests.Session()
 
         if self._resource is None:
             raise Exception("Failed to initialize cURL")
 
+        # Be sure not to verify SSL certificates
+        self._resource.verify = False
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self._config[Constants.POOL_SIZE],
+            max_retries=self._config[Constants.MAX_RETRIES],
+            pool_block=True,
+        )
+        self._resource.mount("http://", adapter)
+        self._resource.mount("https://", adapter)
+
     def disconnect(self):
         if self.is_connected() is False:
             raise Exception("Not connected")
 
+        self._resource.close()
         self._resource = None
 
     def __del__(self):
@@ -678,6 +1661,8 @@ class API:
                 self.logout()
             if self.is_connected():
                 self.disconnect()
+            if self._metadata_cache is not None:
+                self._metadata_cache.close()
         except:
             """Do nothing because this is a destructor."""
             pass
@@ -759,3 +1744,12 @@ class Request:
         self, result, ignore_deprecated=False
     ):
         self.require_success_without_identifier(result, ignore_deprecated)
+
+
+def _chain(middleware, call_next):
+    """Binds a middleware to the rest of the chain"""
+
+    def call(data):
+        return middleware(data, call_next)
+
+    return call
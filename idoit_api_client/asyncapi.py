@@ -0,0 +1,167 @@
+"""Asynchronous i-doit API client."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategory import CMDBCategory
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.cmdbobjects import CMDBObjects
+
+
+class AsyncAPI:
+    """Asynchronous API client
+
+    Wraps a blocking API instance and shares its connection pool. Calls are
+    handed to a thread pool which is as large as the number of requests
+    allowed in flight, and a semaphore keeps further coroutines waiting, so
+    thousands of requests may be gathered without opening more sockets than
+    the pool holds."""
+
+    def __init__(self, config):
+        """Constructor
+
+        :param config: Configuration, see API; "maxInFlight" limits
+            concurrent requests and defaults to the connection pool size"""
+        self.api = API(config)
+        self._max_in_flight = config.get(
+            Constants.MAX_IN_FLIGHT, config[Constants.POOL_SIZE]
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self._max_in_flight)
+        self._semaphore = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_semaphore(self):
+        """Returns the semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_in_flight)
+            self._loop = loop
+
+        return self._semaphore
+
+    async def run(self, function, *args, **kwargs):
+        """Runs a blocking function in the thread pool
+
+        Waits until one of the in-flight slots is free.
+
+        :param function: Callable which uses the wrapped API instance
+
+        :return: Return value of the callable"""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(function, *args, **kwargs)
+            )
+
+    def is_connected(self):
+        """Is client connected to API?"""
+        return self.api.is_connected()
+
+    def is_logged_in(self):
+        """Is client logged-in to API?"""
+        return self.api.is_logged_in()
+
+    def connect(self):
+        """Connect to API"""
+        self.api.connect()
+
+    async def login(self):
+        """Login to API"""
+        await self.run(self.api.login)
+
+    async def logout(self):
+        """Logout from API"""
+        await self.run(self.api.logout)
+
+    async def request(self, method, params=None):
+        """Sends request to API
+
+        :param method: JSON-RPC method
+        :param params: Optional parameters
+
+        :return: Result of request"""
+        return await self.run(self.api.request, method, dict(params or {}))
+
+    async def batch_request(self, requests, partial=False):
+        """Sends batch request to API
+
+        :param requests: List of requests
+        :param partial: Return one result/error item per sub-request
+
+        :return: Result of request"""
+        return await self.run(self.api.batch_request, requests, partial)
+
+    async def close(self):
+        """Logout if needed, close the connection pool and the thread pool"""
+        if self.api.is_logged_in():
+            await self.logout()
+
+        if self.api.is_connected():
+            self.api.disconnect()
+
+        self._executor.shutdown(wait=True)
+
+
+class AsyncRequest:
+    """Asynchronous counterpart of a request class
+
+    Every public method of the wrapped request class is available as a
+    coroutine function with the same signature."""
+
+    """Wrapped request class"""
+    _request_class = None
+
+    def __init__(self, api):
+        """Initialize the request object.
+
+        :param api: The asynchronous API object
+        :type api: AsyncAPI
+        """
+        self._api = api
+        self._request = self._request_class(api.api)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._request, name)
+
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def method(*args, **kwargs):
+            return await self._api.run(attribute, *args, **kwargs)
+
+        return method
+
+
+class AsyncCMDBObject(AsyncRequest):
+    """Asynchronous requests for API namespace 'cmdb.object'"""
+
+    _request_class = CMDBObject
+
+
+class AsyncCMDBObjects(AsyncRequest):
+    """Asynchronous requests for API namespace 'cmdb.objects'"""
+
+    _request_class = CMDBObjects
+
+
+class AsyncCMDBCategory(AsyncRequest):
+    """Asynchronous requests for API namespace 'cmdb.category'"""
+
+    _request_class = CMDBCategory
+
+
+class AsyncCMDBCategoryInfo(AsyncRequest):
+    """Asynchronous requests for API namespace 'cmdb.category_info'"""
+
+    _request_class = CMDBCategoryInfo
@@ -1,13 +1,20 @@
 """Console script for idoit_api_client."""
+import json
 import sys
 import click
 
 from idoit_api_client import Constants, API
+from idoit_api_client.exporter import FORMATS, Exporter
+from idoit_api_client.importer import Importer, read_rows
 
 
-@click.command()
-def main(args=None):
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(context, args=None):
     """Console script for idoit_api_client."""
+    if context.invoked_subcommand is not None:
+        return 0
+
     click.echo(
         "Replace this message by putting your code into " "idoit_api_client.cli.main"
     )
@@ -35,5 +42,124 @@ def main(args=None):
     return 0
 
 
+def connection_options(function):
+    """Adds the options to connect to an i-doit instance"""
+    options = [
+        click.option("--url", envvar="IDOIT_URL", required=True, help="API URL"),
+        click.option("--key", envvar="IDOIT_KEY", required=True, help="API key"),
+        click.option("--username", envvar="IDOIT_USERNAME", help="User name"),
+        click.option("--password", envvar="IDOIT_PASSWORD", help="Password"),
+    ]
+
+    for option in reversed(options):
+        function = option(function)
+
+    return function
+
+
+def use_api(url, key, username=None, password=None):
+    """Builds an API instance from connection options"""
+    config = {Constants.URL: url, Constants.KEY: key}
+
+    if username is not None:
+        config[Constants.USERNAME] = username
+        config[Constants.PASSWORD] = password
+
+    api = API(config)
+    api.connect()
+
+    return api
+
+
+@main.command(name="import")
+@connection_options
+@click.option(
+    "--mapping",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file mapping columns to object and category attributes",
+)
+@click.option(
+    "--format",
+    type=click.Choice(["csv", "jsonl"]),
+    help="File format, derived from the file extension by default",
+)
+@click.option("--chunk-size", default=500, show_default=True, help="Rows per batch")
+@click.option(
+    "--workers", default=1, show_default=True, help="Batches sent at the same time"
+)
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+def import_command(
+    url, key, username, password, mapping, format, chunk_size, workers, file
+):
+    """Import objects and category entries from a CSV or JSONL file."""
+    with open(mapping, encoding="utf-8") as handle:
+        mapping = json.load(handle)
+
+    importer = Importer(
+        use_api(url, key, username, password), mapping, chunk_size, workers
+    )
+
+    def progress(summary):
+        click.echo(
+            "{rows} rows, {objects} objects, {entries} entries, {failed} failed".format(
+                **summary
+            ),
+            err=True,
+        )
+
+    def on_error(number, row, error):
+        click.echo(f"Row {number}: {error}", err=True)
+
+    summary = importer.run(read_rows(file, format), progress, on_error)
+    click.echo(json.dumps(summary))
+
+    if summary["failed"] > 0:
+        sys.exit(1)
+
+
+@main.command(name="export")
+@connection_options
+@click.option(
+    "--format",
+    type=click.Choice(FORMATS),
+    help="File format, derived from the file extension by default",
+)
+@click.option("--type", "object_type", help="Only export objects of this type")
+@click.option(
+    "--category",
+    "categories",
+    multiple=True,
+    help="Export entries of this category; 'all' for all assigned categories",
+)
+@click.option("--page-size", default=500, show_default=True, help="Objects per request")
+@click.argument("file", type=click.Path(dir_okay=False, writable=True))
+def export_command(
+    url, key, username, password, format, object_type, categories, page_size, file
+):
+    """Export objects and category entries to a JSONL, CSV or Parquet file."""
+    filter = {}
+
+    if object_type is not None:
+        filter["type"] = object_type
+
+    if len(categories) == 0:
+        categories = None
+    elif "all" in categories:
+        categories = True
+    else:
+        categories = list(categories)
+
+    exporter = Exporter(
+        use_api(url, key, username, password), filter, categories, page_size
+    )
+
+    def progress(count):
+        click.echo(f"{count} objects", err=True)
+
+    count = exporter.export(file, format, progress)
+    click.echo(json.dumps({"objects": count}))
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
@@ -1,6 +1,8 @@
 """Requests for API namespace 'cmdb.category'"""
 
 from idoit_api_client import Request
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
 
 
 class CMDBCategory(Request):
@@ -325,5 +327,213 @@ class CMDBCategory(Request):
 
         return self
 
+    def batch_apply(self, entries):
+        """Save only the attributes which differ from the current category entries.
+
+        Current entries are read with one batch request per category, compared field
+        by field and only changed attributes are sent with one batch request of
+        cmdb.category.save. Entries without changes are not sent at all. Entries
+        without identifier in multi-valued categories are created; their objects and
+        object types are read to find out which categories are multi-valued. Entries
+        with an unknown identifier fail.
+
+        :param entries List of entries as associative arrays with the keys 'object'
+            (object identifier), 'category' (category constant), 'data' (attributes
+            as key-value pairs) and optionally 'entry' (entry identifier of an
+            existing entry in a multi-valued category)
+
+        :return Associative array with lists of 'changed', 'unchanged' and 'failed'
+            entries; changed and failed entries hold the sent attributes in 'data',
+            failed entries an 'error' message"""
+        object_ids = {}
+
+        for entry in entries:
+            object_ids.setdefault(entry["category"], []).append(entry["object"])
+
+        current = {}
+
+        for category_const, category_object_ids in object_ids.items():
+            category_object_ids = list(dict.fromkeys(category_object_ids))
+            results = self.batch_read(category_object_ids, [category_const])
+
+            for object_id, result in zip(category_object_ids, results):
+                current[(object_id, category_const)] = result
+
+        multi_value = self._get_multi_value_categories(
+            [entry["object"] for entry in entries if entry.get("entry") is None]
+        )
+        summary = {"changed": [], "unchanged": [], "failed": []}
+        requests = []
+        changed = []
+
+        for entry in entries:
+            if entry.get("entry") is None and (
+                (int(entry["object"]), entry["category"]) in multi_value
+            ):
+                existing = None
+            else:
+                try:
+                    existing = self._find_entry(
+                        current[(entry["object"], entry["category"])],
+                        entry.get("entry"),
+                    )
+                except Exception as error:
+                    summary["failed"].append({**entry, "error": str(error)})
+                    continue
+
+            attributes = self.diff(existing, entry["data"])
+
+            if len(attributes) == 0:
+                summary["unchanged"].append(entry)
+                continue
+
+            params = {
+                "object": entry["object"],
+                "category": entry["category"],
+                "data": attributes,
+            }
+
+            if existing is not None and "id" in existing:
+                params["entry"] = int(existing["id"])
+
+            requests.append({"method": "cmdb.category.save", "params": params})
+            changed.append({**entry, "data": attributes})
+
+        if len(requests) == 0:
+            return summary
+
+        for entry, item in zip(
+            changed, self._api.batch_request(requests, partial=True)
+        ):
+            if item["error"] is not None:
+                error = item["error"]
+
+                if isinstance(error, dict):
+                    error = error.get("message", error)
+
+                summary["failed"].append({**entry, "error": str(error)})
+            elif not isinstance(item["result"], dict) or not item["result"].get(
+                "success"
+            ):
+                summary["failed"].append({**entry, "error": "Bad result"})
+            else:
+                summary["changed"].append(entry)
+
+        return summary
+
+    def diff(self, entry, attributes):
+        """Compare attributes with a category entry.
+
+        Values are compared like i-doit returns them: numbers as strings, dialog
+        and object fields as associative arrays which match their identifier,
+        title or constant, and multi-value fields as lists.
+
+        :param entry Category entry as read or None if there is none
+        :param attributes Attributes as key-value pairs
+
+        :return Attributes which differ as key-value pairs"""
+        if entry is None:
+            return dict(attributes)
+
+        return {
+            attribute: value
+            for attribute, value in attributes.items()
+            if attribute not in entry or not _is_same_value(entry[attribute], value)
+        }
+
+    def _get_multi_value_categories(self, object_ids):
+        """Find the multi-valued categories assigned to objects
+
+        :param object_ids List of object identifiers
+
+        :return set Tuples of object identifier and category constant"""
+        object_ids = list(dict.fromkeys(int(object_id) for object_id in object_ids))
+
+        if len(object_ids) == 0:
+            return set()
+
+        object_types = {
+            int(object["id"]): int(object["type"])
+            for object in CMDBObjects(self._api).read_by_ids(object_ids, False)
+        }
+        object_type_ids = list(dict.fromkeys(object_types.values()))
+        assigned = dict(
+            zip(
+                object_type_ids,
+                CMDBObjectTypeCategories(self._api).batch_read_by_id(object_type_ids),
+            )
+        )
+        multi_value = set()
+
+        for object_id, object_type_id in object_types.items():
+            for categories in assigned[object_type_id].values():
+                if not isinstance(categories, list):
+                    continue
+
+                for category in categories:
+                    if str(category.get("multi_value")) == "1":
+                        multi_value.add((object_id, category["const"]))
+
+        return multi_value
+
+    def _find_entry(self, entries, entry_id):
+        """Find the entry to compare with: the one with the given identifier or the
+        first one for single-value categories"""
+        if entry_id is None:
+            return entries[0] if len(entries) > 0 else None
+
+        for entry in entries:
+            if "id" in entry and int(entry["id"]) == int(entry_id):
+                return entry
+
+        raise Exception(f'No entry with identifier "{entry_id}" found')
+
     def clear(self):
         raise ("Not implemented")
+
+
+def _is_same_value(current, value):
+    """Compare a value read from i-doit with a value to save"""
+    if current in (None, "", []) or value in (None, "", []):
+        return current in (None, "", []) and value in (None, "", [])
+
+    if isinstance(current, list):
+        if not isinstance(value, list):
+            value = [value]
+
+        if len(current) != len(value):
+            return False
+
+        # Compare regardless of order, every item may only match once:
+        remaining = list(current)
+
+        for other in value:
+            for index, item in enumerate(remaining):
+                if _is_same_value(item, other):
+                    del remaining[index]
+                    break
+            else:
+                return False
+
+        return True
+
+    if isinstance(current, dict):
+        if isinstance(value, dict):
+            return all(
+                key in current and _is_same_value(current[key], other)
+                for key, other in value.items()
+            )
+
+        return str(value) in {
+            str(current[key])
+            for key in ("id", "title", "const")
+            if current.get(key) is not None
+        }
+
+    if str(current) == str(value):
+        return True
+
+    try:
+        return float(current) == float(value)
+    except (TypeError, ValueError):
+        return False
@@ -1,6 +1,43 @@
 from idoit_api_client import Request
 from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
 from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+from idoit_api_client.tracing import traced
+
+"""Constants of virtual categories which have no attributes to call"""
+VIRTUAL_CATEGORY_CONSTANTS = frozenset(
+    [
+        "C__CATG__CABLING",
+        "C__CATG__CABLE_CONNECTION",
+        "C__CATG__CLUSTER_SHARED_STORAGE",
+        "C__CATG__CLUSTER_VITALITY",
+        "C__CATG__CLUSTER_SHARED_VIRTUAL_SWITCH",
+        "C__CATG__DATABASE_FOLDER",
+        "C__CATG__FLOORPLAN",
+        "C__CATG__JDISC_DISCOVERY",
+        "C__CATG__LIVESTATUS",
+        "C__CATG__MULTIEDIT",
+        "C__CATG__NDO",
+        "C__CATG__NET_ZONE",
+        "C__CATG__NET_ZONE_SCOPES",
+        "C__CATG__OBJECT_VITALITY",
+        "C__CATG__RACK_VIEW",
+        "C__CATG__SANPOOL",
+        "C__CATG__STACK_MEMBERSHIP",
+        "C__CATG__STACK_PORT_OVERVIEW",
+        "C__CATG__STORAGE",
+        "C__CATG__VIRTUAL_AUTH",
+        "C__CATG__VIRTUAL_RELOCATE_CI",
+        "C__CATG__VIRTUAL_SUPERNET",
+        "C__CATG__VIRTUAL_TICKETS",
+        "C__CATG__VRRP_VIEW",
+        "C__CATS__BASIC_AUTH",
+        "C__CATS__CHASSIS_CABLING",
+        "C__CATS__PDU_OVERVIEW",
+        "C__CMDB__OBJTYPE__CONDUIT",
+        "C__CATS__PERSON_GROUP_NAGIOS",
+        "C__CATS__PERSON_NAGIOS",
+    ]
+)
 
 
 class CMDBCategoryInfo(Request):
@@ -13,6 +50,11 @@ class CMDBCategoryInfo(Request):
 
         :return: Result set
         """
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and snapshot.has_category_info(category_const):
+            return snapshot.category_info(category_const)
+
         return self._api.request("cmdb.category_info", {"category": category_const})
 
     def batch_read(self, categories):
@@ -22,6 +64,13 @@ class CMDBCategoryInfo(Request):
 
         :return: Indexed array of associative arrays
         """
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and all(
+            snapshot.has_category_info(category) for category in categories
+        ):
+            return [snapshot.category_info(category) for category in categories]
+
         requests = []
 
         for category in categories:
@@ -31,6 +80,7 @@ class CMDBCategoryInfo(Request):
 
         return self._api.batch_request(requests)
 
+    @traced("CMDBCategoryInfo.read_all")
     def read_all(self):
         """Try to fetch information about all available categories.
 
@@ -38,18 +88,48 @@ class CMDBCategoryInfo(Request):
             * custom categories
             * Categories which are not assigned to any object types
 
-        Notice: This method causes 3 api calls.
+        Notice: This method causes 3 api calls unless a schema snapshot is used.
 
         :return: Indexed array of associative arrays
         """
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None:
+            return snapshot.category_info_all()
+
         cmdb_object_types = CMDBObjectTypes(self._api)
         cmdb_object_type_categories = CMDBObjectTypeCategories(self._api)
-        category_consts = []
         object_types = cmdb_object_types.read()
         object_type_ids = [object_type["id"] for object_type in object_types]
         object_type_categories_batch = cmdb_object_type_categories.batch_read_by_id(
             object_type_ids
         )
+
+        clean_category_constants = self.get_category_constants(
+            object_type_categories_batch
+        )
+
+        # for clean_category_constant in clean_category_constants:
+        #    category_clean = self.batch_read([clean_category_constant])
+        #    print("hi")
+
+        categories = self.batch_read(clean_category_constants)
+
+        combined_array = dict(zip(clean_category_constants, categories))
+
+        if not isinstance(combined_array, dict):
+            raise Exception("Unable to restructure result")
+
+        return combined_array
+
+    def get_category_constants(self, object_type_categories_batch):
+        """Collect constants of global and specific categories which are not virtual.
+
+        :param object_type_categories_batch: Assigned categories of object types
+
+        :return: Sorted list of category constants
+        """
+        category_consts = []
         cat_types = ["catg", "cats"]
 
         for object_type_categories in object_type_categories_batch:
@@ -63,32 +143,14 @@ class CMDBCategoryInfo(Request):
 
         category_consts = list(set(category_consts))
 
-        blacklisted_category_consts = self.get_virtual_category_constants()
-        clean_category_constants = []
-
-        skipped_categories = []
-
-        for category_constant in category_consts:
-            if category_constant not in blacklisted_category_consts:
-                clean_category_constants.append(category_constant)
-            else:
-                skipped_categories.append(category_constant)
-
+        clean_category_constants = [
+            category_constant
+            for category_constant in category_consts
+            if category_constant not in VIRTUAL_CATEGORY_CONSTANTS
+        ]
         clean_category_constants.sort()
-        skipped_categories.sort()
-
-        # for clean_category_constant in clean_category_constants:
-        #    category_clean = self.batch_read([clean_category_constant])
-        #    print("hi")
-
-        categories = self.batch_read(clean_category_constants)
 
-        combined_array = dict(zip(clean_category_constants, categories))
-
-        if not isinstance(combined_array, dict):
-            raise Exception("Unable to restructure result")
-
-        return combined_array
+        return clean_category_constants
 
     def get_virtual_category_constants(self):
         """Get list of constants for virtual categories
@@ -96,35 +158,4 @@ class CMDBCategoryInfo(Request):
         "Virtual" means these categories have no attributes to call.
 
         :return array Array of strings"""
-        return [
-            "C__CATG__CABLING",
-            "C__CATG__CABLE_CONNECTION",
-            "C__CATG__CLUSTER_SHARED_STORAGE",
-            "C__CATG__CLUSTER_VITALITY",
-            "C__CATG__CLUSTER_SHARED_VIRTUAL_SWITCH",
-            "C__CATG__DATABASE_FOLDER",
-            "C__CATG__FLOORPLAN",
-            "C__CATG__JDISC_DISCOVERY",
-            "C__CATG__LIVESTATUS",
-            "C__CATG__MULTIEDIT",
-            "C__CATG__NDO",
-            "C__CATG__NET_ZONE",
-            "C__CATG__NET_ZONE_SCOPES",
-            "C__CATG__OBJECT_VITALITY",
-            "C__CATG__RACK_VIEW",
-            "C__CATG__SANPOOL",
-            "C__CATG__STACK_MEMBERSHIP",
-            "C__CATG__STACK_PORT_OVERVIEW",
-            "C__CATG__STORAGE",
-            "C__CATG__VIRTUAL_AUTH",
-            "C__CATG__VIRTUAL_RELOCATE_CI",
-            "C__CATG__VIRTUAL_SUPERNET",
-            "C__CATG__VIRTUAL_TICKETS",
-            "C__CATG__VRRP_VIEW",
-            "C__CATS__BASIC_AUTH",
-            "C__CATS__CHASSIS_CABLING",
-            "C__CATS__PDU_OVERVIEW",
-            "C__CMDB__OBJTYPE__CONDUIT",
-            "C__CATS__PERSON_GROUP_NAGIOS",
-            "C__CATS__PERSON_NAGIOS",
-        ]
+        return sorted(VIRTUAL_CATEGORY_CONSTANTS)
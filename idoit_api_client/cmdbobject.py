@@ -1,9 +1,13 @@
 """CMDBObject class for i-doit API client."""
+
+import copy
+
 from idoit_api_client import Request
 from idoit_api_client.cmdbcategory import CMDBCategory
-from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbcategoryinfo import VIRTUAL_CATEGORY_CONSTANTS
 from idoit_api_client.cmdbobjects import CMDBObjects
 from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
+from idoit_api_client.tracing import traced
 
 
 class CMDBObject(Request):
@@ -162,6 +166,7 @@ class CMDBObject(Request):
         """
         result = self._api.request("cmdb.object.recycle", {"object": object_id})
 
+    @traced("CMDBObject.load", lambda object_id: {"idoit.object.id": object_id})
     def load(self, object_id):
         """Load all data about object
 
@@ -181,60 +186,133 @@ class CMDBObject(Request):
 
         object = {
             **object,
-            **cmdb_object_type_categories.read_by_id(object["objecttype"]),
+            **copy.deepcopy(
+                cmdb_object_type_categories.read_by_id(object["objecttype"])
+            ),
         }
 
-        cmdb_category = CMDBCategory(self._api)
+        categories = self._prepare_categories(object)
+
+        if len(categories) > 0:
+            cmdb_category = CMDBCategory(self._api)
+            category_entries = cmdb_category.batch_read(
+                [object_id], [category["const"] for category in categories]
+            )
+
+            for category, entries in zip(categories, category_entries):
+                category["entries"] = entries
 
-        category_types = ["catg", "cats", "custom"]
+        return object
+
+    @traced(
+        "CMDBObject.load_many",
+        lambda object_ids: {"idoit.object.ids": list(object_ids)},
+    )
+    def load_many(self, object_ids):
+        """Load all data about several objects at once
+
+        Needs three batch requests regardless of the number of objects: one for the
+        objects, one for the categories assigned to their object types and one for all
+        category entries. Large batches are split into chunks by the API client.
+
+        :param object_ids: List of object identifiers
+
+        :return: Object identifiers as keys and the same structure as load() as values
+        """
+        if not isinstance(object_ids, list):
+            raise Exception("Object IDs must be a list")
 
-        cmdb_category_info = CMDBCategoryInfo(self._api)  # TODO: Port CMDBCategoryInfo
-        blacklisted_category_constants = (
-            cmdb_category_info.get_virtual_category_constants()
+        object_ids = list(dict.fromkeys(object_ids))
+
+        if len(object_ids) == 0:
+            return {}
+
+        objects = self._api.batch_request(
+            [
+                {"method": "cmdb.object.read", "params": {"id": object_id}}
+                for object_id in object_ids
+            ]
         )
 
-        for category_type in category_types:
-            if category_type not in object:
-                continue
+        for object_id, object in zip(object_ids, objects):
+            if not object:
+                raise Exception(f"Object {object_id} not found")
 
-            category_constants = []
+            if "objecttype" not in object:
+                raise Exception(f"Object {object_id} has no type")
 
-            i = 0
-            for object_category_type in object[category_type]:
-                if "const" not in object_category_type:
-                    raise Exception(
-                        "Information about categories is broken. Constant is missing."
-                    )
-                category_constant = object[category_type][i]["const"]
+        object_types = list(dict.fromkeys(object["objecttype"] for object in objects))
+        cmdb_object_type_categories = CMDBObjectTypeCategories(self._api)
+        assigned_categories = dict(
+            zip(
+                object_types,
+                cmdb_object_type_categories.batch_read_by_id(object_types),
+            )
+        )
 
-                if category_constant in blacklisted_category_constants:
-                    continue
+        loaded = {}
+        requests = []
+        targets = []
 
-                object[category_type][i]["entries"] = []
+        for object_id, object in zip(object_ids, objects):
+            object = {
+                **object,
+                **copy.deepcopy(assigned_categories[object["objecttype"]]),
+            }
+            loaded[object_id] = object
 
-                category_constants.append(category_constant)
-                i += 1
+            for category in self._prepare_categories(object):
+                requests.append(
+                    {
+                        "method": "cmdb.category.read",
+                        "params": {
+                            "objID": object_id,
+                            "category": category["const"],
+                            "status": 2,
+                        },
+                    }
+                )
+                targets.append(category)
 
-            category_entries = cmdb_category.batch_read([object_id], category_constants)
+        for category, entries in zip(targets, self._api.batch_request(requests)):
+            category["entries"] = entries
 
-            i = 0
-            for category_entry in category_entries:
-                index = -1
-                entries = []
+        return loaded
 
-                ii = 0
-                for category in object[category_type]:
-                    if category["const"] == category_constants[i]:
-                        index = ii
-                        entries = category_entries[i]
-                        break
-                    ii = ii + 1
+    def _prepare_categories(self, object):
+        """Collect the categories of a loaded object whose entries are read
 
-                object[category_type][index]["entries"] = entries
-                i = i + 1
+        Virtual categories are skipped. Every other category gets an empty list of
+        entries which is replaced by the entries read afterwards.
 
-        return object
+        :param object: Object merged with the categories assigned to its type
+
+        :return: List of categories in the order of their category types
+        """
+        categories = []
+
+        for category_type in ["catg", "cats", "custom"]:
+            for category in object.get(category_type, []):
+                if "const" not in category:
+                    raise Exception(
+                        "Information about categories is broken. Constant is missing."
+                    )
 
+                if category["const"] in VIRTUAL_CATEGORY_CONSTANTS:
+                    continue
+
+                category["entries"] = []
+                categories.append(category)
+
+        return categories
+
+    @traced(
+        "CMDBObject.upsert",
+        lambda type, title, attributes={}: {
+            "idoit.object.type": type,
+            "idoit.object.title": title,
+        },
+    )
     def upsert(self, type, title, attributes={}):
         """Create new object or fetch existing one based on its title and type.
 
@@ -258,3 +336,113 @@ class CMDBObject(Request):
         else:
             number_of_objects = len(result)
             raise Exception(f"Found {number_of_objects} objects")
+
+    @traced(
+        "CMDBObject.upsert_many",
+        lambda objects: {
+            "idoit.objects": len(objects) if isinstance(objects, list) else 0
+        },
+    )
+    def upsert_many(self, objects):
+        """Create new objects or fetch existing ones based on their titles and types.
+
+        Existing objects are looked up with one batch request of filtered reads,
+        missing objects are created with another one. Objects listed more than once
+        are only created once. An object which cannot be created does not stop the
+        others from being created.
+
+        :param objects: List of tuples of object type identifier or constant, object
+            title and (optional) additional common attributes, see upsert()
+
+        :return: Object identifiers ('ids') in the order of the given objects,
+            objects found several times ('ambiguous') with their type, title and
+            object identifiers, and objects which could not be created ('failed')
+            with their type, title and error; the identifier of an ambiguous or
+            failed object is None
+        """
+        if not isinstance(objects, list):
+            raise Exception("Objects must be a list")
+
+        keys = []
+        attributes = {}
+
+        for object in objects:
+            if not isinstance(object, (list, tuple)) or len(object) not in (2, 3):
+                raise Exception(
+                    "Each object must be a tuple of type, title and attributes"
+                )
+
+            key = (object[0], object[1])
+            keys.append(key)
+
+            if key not in attributes:
+                attributes[key] = object[2] if len(object) == 3 else {}
+
+        unique_keys = list(attributes)
+
+        if len(unique_keys) == 0:
+            return {"ids": [], "ambiguous": [], "failed": []}
+
+        results = self._api.batch_request(
+            [
+                {
+                    "method": "cmdb.objects.read",
+                    "params": {"filter": {"title": title, "type": type}},
+                }
+                for type, title in unique_keys
+            ]
+        )
+
+        object_ids = {}
+        ambiguous = []
+        missing_keys = []
+
+        for key, result in zip(unique_keys, results):
+            if len(result) == 0:
+                missing_keys.append(key)
+            elif len(result) == 1:
+                if result[0] is None or result[0]["id"] is None:
+                    raise Exception("Bad result")
+                object_ids[key] = int(result[0]["id"])
+            else:
+                object_ids[key] = None
+                ambiguous.append(
+                    {
+                        "type": key[0],
+                        "title": key[1],
+                        "ids": [int(object["id"]) for object in result],
+                    }
+                )
+
+        failed = []
+
+        if len(missing_keys) > 0:
+            items = self._api.batch_request(
+                [
+                    {
+                        "method": "cmdb.object.create",
+                        "params": {**attributes[key], "type": key[0], "title": key[1]},
+                    }
+                    for key in missing_keys
+                ],
+                partial=True,
+            )
+
+            for key, item in zip(missing_keys, items):
+                object_ids[key] = None
+                error = item["error"]
+
+                if error is None:
+                    try:
+                        object_ids[key] = int(item["result"]["id"])
+                    except (KeyError, TypeError, ValueError):
+                        error = f"Bad result: {item['result']!r}"
+
+                if error is not None:
+                    failed.append({"type": key[0], "title": key[1], "error": error})
+
+        return {
+            "ids": [object_ids[key] for key in keys],
+            "ambiguous": ambiguous,
+            "failed": failed,
+        }
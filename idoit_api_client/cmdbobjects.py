@@ -1,5 +1,7 @@
 """Requests for API namespace 'cmdb.objects'."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 from idoit_api_client import Request
 
 
@@ -7,6 +9,9 @@ class CMDBObjects(Request):
     SORT_ASCENDING = "asc"
     SORT_DESCENDING = "desc"
 
+    """Maximum number of identifiers in one 'ids' filter of iter_objects_by_id()"""
+    MAX_ID_WINDOW = 5000
+
     def create(self, objects):
         """Create one or more objects
 
@@ -75,6 +80,142 @@ class CMDBObjects(Request):
 
         return self._api.request("cmdb.objects.read", params)
 
+    def iter_objects(
+        self,
+        filter={},
+        page_size=1000,
+        categories=None,
+        order_by="isys_obj__id",
+        sort=SORT_ASCENDING,
+    ):
+        """Iterate over objects page by page.
+
+        While the caller consumes one page the next page is already fetched in the
+        background, so at most two pages are held in memory.
+
+        :param dict filter (Optional) Filter, see read()
+        :param int page_size Number of objects per request
+        :param bool|array categories Also fetch category entries, see read()
+        :param str order_by Order result set, see read(); defaults to the object identifier
+            which keeps pages stable
+        :param str sort Sort ascending ('asc') or descending ('desc')
+
+        :return generator Objects as associative arrays"""
+        if not isinstance(page_size, int) or page_size < 1:
+            raise Exception("Page size must be a positive integer")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            page = executor.submit(
+                self.read, filter, page_size, offset, order_by, sort, categories
+            )
+
+            while page is not None:
+                objects = page.result()
+
+                if len(objects) < page_size:
+                    page = None
+                else:
+                    offset += page_size
+                    page = executor.submit(
+                        self.read, filter, page_size, offset, order_by, sort, categories
+                    )
+
+                for object in objects:
+                    yield object
+
+    def iter_objects_by_id(
+        self, filter={}, page_size=1000, categories=None, after_id=0
+    ):
+        """Iterate over objects ordered by their identifiers using keyset pagination.
+
+        Instead of skipping an offset, every request seeks past the last identifier seen by
+        asking for a window of identifiers with the 'ids' filter. The window grows while
+        identifiers are sparse, up to MAX_ID_WINDOW identifiers per request. Objects
+        created during the scan are picked up at the end, and no object is skipped or
+        returned twice.
+
+        To resume an interrupted scan pass the identifier of the last processed object as
+        after_id.
+
+        :param dict filter (Optional) Filter, see read()
+        :param int page_size Maximum number of objects per request
+        :param bool|array categories Also fetch category entries, see read()
+        :param int after_id Only return objects with a higher identifier
+
+        :return generator Objects as associative arrays"""
+        if not isinstance(page_size, int) or page_size < 1:
+            raise Exception("Page size must be a positive integer")
+
+        if "ids" in filter:
+            object_ids = sorted(
+                {
+                    int(object_id)
+                    for object_id in filter["ids"]
+                    if int(object_id) > after_id
+                }
+            )
+
+            for index in range(0, len(object_ids), page_size):
+                page = self.read(
+                    {**filter, "ids": object_ids[index : index + page_size]},
+                    None,
+                    None,
+                    "isys_obj__id",
+                    self.SORT_ASCENDING,
+                    categories,
+                )
+
+                for object in sorted(page, key=lambda object: int(object["id"])):
+                    yield object
+
+            return
+
+        last_id = after_id
+        window = min(page_size, self.MAX_ID_WINDOW)
+        max_id = self._read_max_id(filter)
+
+        while last_id < max_id:
+            window_end = min(last_id + window, max_id)
+            page = self.read(
+                {**filter, "ids": list(range(last_id + 1, window_end + 1))},
+                page_size,
+                None,
+                "isys_obj__id",
+                self.SORT_ASCENDING,
+                categories,
+            )
+            page = sorted(page, key=lambda object: int(object["id"]))
+
+            for object in page:
+                yield object
+
+            if len(page) >= page_size:
+                # Window holds more objects, continue after the last one:
+                last_id = int(page[-1]["id"])
+            else:
+                last_id = window_end
+
+                if len(page) < page_size // 2:
+                    window = min(window * 2, self.MAX_ID_WINDOW)
+
+            if last_id >= max_id:
+                # Pick up objects created during the scan:
+                max_id = self._read_max_id(filter)
+
+    def _read_max_id(self, filter):
+        """Fetch the highest object identifier matching a filter.
+
+        :param dict filter Filter, see read()
+
+        :return int Object identifier or 0 if no object matches"""
+        result = self.read(filter, 1, None, "isys_obj__id", self.SORT_DESCENDING, False)
+
+        if len(result) == 0:
+            return 0
+
+        return int(result[0]["id"])
+
     def read_by_ids(self, object_ids, categories=None):
         """Fetch objects by their identifiers.
 
@@ -12,6 +12,11 @@ class CMDBObjectTypeCategories(Request):
         :param object_type_id: Object type identifier
 
         :return: Array"""
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and snapshot.has_object_type(object_type_id):
+            return snapshot.object_type_categories(object_type_id)
+
         return self._api.request(
             "cmdb.object_type_categories.read", {"type": object_type_id}
         )
@@ -22,6 +27,11 @@ class CMDBObjectTypeCategories(Request):
         :param object_type_constant: Object type constant
 
         :return: Array"""
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and snapshot.has_object_type(object_type_constant):
+            return snapshot.object_type_categories(object_type_constant)
+
         return self._api.request(
             "cmdb.object_type_categories.read", {"type": object_type_constant}
         )
@@ -32,6 +42,16 @@ class CMDBObjectTypeCategories(Request):
         :param object_type_ids: List of object types identifiers as integers
 
         :return: Array"""
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and all(
+            snapshot.has_object_type(object_type) for object_type in object_type_ids
+        ):
+            return [
+                snapshot.object_type_categories(object_type)
+                for object_type in object_type_ids
+            ]
+
         requests = []
 
         for object_type_id in object_type_ids:
@@ -49,6 +69,16 @@ class CMDBObjectTypeCategories(Request):
         :param object_type_consts: List of object types constants as strings
 
         :return: Array"""
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None and all(
+            snapshot.has_object_type(object_type) for object_type in object_type_consts
+        ):
+            return [
+                snapshot.object_type_categories(object_type)
+                for object_type in object_type_consts
+            ]
+
         requests = []
 
         for object_type_const in object_type_consts:
@@ -11,6 +11,11 @@ class CMDBObjectTypes(Request):
 
         :return: Array of object types
         """
+        snapshot = self._api.get_schema_snapshot()
+
+        if snapshot is not None:
+            return snapshot.object_types()
+
         return self._api.request("cmdb.object_types.read")
 
     def read_one(self, object_type):
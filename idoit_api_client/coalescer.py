@@ -0,0 +1,91 @@
+"""Merges single requests into batch requests."""
+
+import threading
+from concurrent.futures import Future
+
+
+class Coalescer:
+    """Request coalescer
+
+    Requests submitted within a short window are queued and sent together
+    as one batch request. The queue is sent when the window has passed
+    since the first queued request or when it holds the maximum number of
+    requests, whichever comes first. Every request gets its own future."""
+
+    def __init__(self, api, window, max_requests):
+        """Constructor
+
+        :param api: API instance which sends the batch requests
+        :param window: Window in milliseconds
+        :param max_requests: Send queue when it holds this many requests"""
+        self._api = api
+        self._window = window / 1000
+        self._max_requests = max_requests
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def submit(self, method, params={}):
+        """Queues a request
+
+        :param method: JSON-RPC method
+        :param params: Optional parameters
+
+        :return: Future which resolves to the result of the request"""
+        future = Future()
+        pending = None
+
+        with self._lock:
+            self._pending.append(
+                ({"method": method, "params": dict(params)}, future)
+            )
+
+            if len(self._pending) >= self._max_requests:
+                pending = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if pending is not None:
+            self._send(pending)
+
+        return future
+
+    def flush(self):
+        """Sends all queued requests now"""
+        with self._lock:
+            pending = self._take()
+
+        if len(pending) > 0:
+            self._send(pending)
+
+    def _take(self):
+        """Empties the queue; lock must be held"""
+        pending = self._pending
+        self._pending = []
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        return pending
+
+    def _send(self, pending):
+        """Sends queued requests as one batch and resolves their futures"""
+        try:
+            items = self._api.batch_request(
+                [request for request, future in pending], partial=True
+            )
+        except Exception as error:
+            for request, future in pending:
+                future.set_exception(error)
+            return
+
+        for (request, future), item in zip(pending, items):
+            if item["error"] is not None:
+                future.set_exception(
+                    Exception("Server error: {}".format(item["error"]))
+                )
+            else:
+                future.set_result(item["result"])
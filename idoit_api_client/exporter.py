@@ -0,0 +1,226 @@
+"""Streaming export of objects and category entries to JSONL, CSV and Parquet."""
+
+import csv
+import json
+
+from idoit_api_client.cmdbcategoryinfo import VIRTUAL_CATEGORY_CONSTANTS
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
+
+"""Formats which may be written"""
+FORMATS = ("jsonl", "csv", "parquet")
+
+"""Columns of common object information in CSV and Parquet files"""
+OBJECT_COLUMNS = (
+    "id",
+    "title",
+    "sysid",
+    "type",
+    "type_title",
+    "type_group_title",
+    "status",
+    "cmdb_status",
+    "cmdb_status_title",
+    "created",
+    "updated",
+)
+
+
+class Exporter:
+    """Exporter
+
+    Reads objects page by page ordered by their identifiers and, for every page,
+    their category entries with one batch request. Each page is written before the
+    next one is read, so memory depends on the page size only.
+
+    JSONL files hold one object per line with category constants as keys and
+    entries as values in 'categories'. CSV and Parquet files hold one row per
+    object: the columns of OBJECT_COLUMNS and one column per requested category
+    with its entries encoded as JSON, or a single 'categories' column if all
+    categories are exported. Writing Parquet files needs pyarrow."""
+
+    def __init__(self, api, filter={}, categories=None, page_size=500):
+        """Constructor
+
+        :param api: API instance
+        :param filter: (Optional) filter, see CMDBObjects.read()
+        :param categories: (Optional) list of category constants, True for all
+            categories assigned to the object types or None for none
+        :param page_size: Number of objects per page"""
+        if not isinstance(page_size, int) or page_size < 1:
+            raise Exception("Page size must be a positive integer")
+
+        if categories is not None and categories is not True:
+            if not isinstance(categories, list):
+                raise Exception("Categories must be a list, True or None")
+
+        self._api = api
+        self._filter = filter
+        self._categories = categories
+        self._page_size = page_size
+        self._assigned_categories = {}
+
+    def iter_pages(self):
+        """Iterates over pages of objects including their category entries
+
+        :return: generator Lists of objects"""
+        page = []
+
+        for object in CMDBObjects(self._api).iter_objects_by_id(
+            self._filter, self._page_size, False
+        ):
+            page.append(object)
+
+            if len(page) >= self._page_size:
+                yield self._add_categories(page)
+                page = []
+
+        if len(page) > 0:
+            yield self._add_categories(page)
+
+    def export(self, path, format=None, progress=None):
+        """Writes all objects to a file
+
+        :param path: File path
+        :param format: 'jsonl', 'csv' or 'parquet'; derived from the file
+            extension by default
+        :param progress: (Optional) callable which gets the number of written
+            objects after every page
+
+        :return: Number of written objects"""
+        if format is None:
+            format = path.rsplit(".", 1)[-1].lower()
+
+        if format not in FORMATS:
+            raise Exception(f"Unsupported format {format}")
+
+        write = getattr(self, f"_write_{format}")
+
+        return write(path, progress)
+
+    def _write_jsonl(self, path, progress):
+        count = 0
+
+        with open(path, "w", encoding="utf-8") as handle:
+            for page in self.iter_pages():
+                handle.writelines(
+                    json.dumps(object, separators=(",", ":")) + "\n" for object in page
+                )
+                count += len(page)
+
+                if progress is not None:
+                    progress(count)
+
+        return count
+
+    def _write_csv(self, path, progress):
+        count = 0
+
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, self._columns(), extrasaction="ignore")
+            writer.writeheader()
+
+            for page in self.iter_pages():
+                writer.writerows(self._to_row(object) for object in page)
+                count += len(page)
+
+                if progress is not None:
+                    progress(count)
+
+        return count
+
+    def _write_parquet(self, path, progress):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception("Writing Parquet files needs pyarrow: pip install pyarrow")
+
+        schema = pyarrow.schema(
+            [(column, pyarrow.string()) for column in self._columns()]
+        )
+        count = 0
+
+        with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+            for page in self.iter_pages():
+                rows = [self._to_row(object) for object in page]
+                writer.write_table(pyarrow.Table.from_pylist(rows, schema))
+                count += len(page)
+
+                if progress is not None:
+                    progress(count)
+
+        return count
+
+    def _columns(self):
+        """Columns of CSV and Parquet files"""
+        if self._categories is None:
+            return list(OBJECT_COLUMNS)
+
+        if self._categories is True:
+            return list(OBJECT_COLUMNS) + ["categories"]
+
+        return list(OBJECT_COLUMNS) + self._categories
+
+    def _to_row(self, object):
+        """Flattens an object to a row of strings"""
+        row = {
+            column: None if object.get(column) is None else str(object[column])
+            for column in OBJECT_COLUMNS
+        }
+
+        if self._categories is True:
+            row["categories"] = json.dumps(object["categories"])
+        elif self._categories is not None:
+            for category in self._categories:
+                row[category] = json.dumps(object["categories"].get(category, []))
+
+        return row
+
+    def _add_categories(self, page):
+        """Reads the category entries of a page with one batch request"""
+        if self._categories is None:
+            return page
+
+        requests = []
+        targets = []
+
+        for object in page:
+            object["categories"] = {}
+
+            for category in self._get_categories(object["type"]):
+                requests.append(
+                    {
+                        "method": "cmdb.category.read",
+                        "params": {
+                            "objID": int(object["id"]),
+                            "category": category,
+                            "status": 2,
+                        },
+                    }
+                )
+                targets.append((object, category))
+
+        if len(requests) > 0:
+            for (object, category), entries in zip(
+                targets, self._api.batch_request(requests)
+            ):
+                object["categories"][category] = entries
+
+        return page
+
+    def _get_categories(self, object_type):
+        """Category constants to read for an object type"""
+        if self._categories is not True:
+            return self._categories
+
+        if object_type not in self._assigned_categories:
+            assigned = CMDBObjectTypeCategories(self._api).read_by_id(object_type)
+            self._assigned_categories[object_type] = [
+                category["const"]
+                for category_type in ("catg", "cats", "custom")
+                for category in assigned.get(category_type, [])
+                if category["const"] not in VIRTUAL_CATEGORY_CONSTANTS
+            ]
+
+        return self._assigned_categories[object_type]
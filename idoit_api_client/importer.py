@@ -0,0 +1,249 @@
+"""Bulk import of objects and category entries from CSV and JSONL files."""
+
+import csv
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_rows(path, format=None):
+    """Streams rows from a file
+
+    :param path: File path
+    :param format: 'csv' or 'jsonl'; derived from the file extension by default
+
+    :return: generator Rows as dicts"""
+    if format is None:
+        format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+    if format not in ("csv", "jsonl"):
+        raise Exception(f"Unsupported format {format}")
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        if format == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Importer:
+    """Import pipeline
+
+    Maps rows to objects and category entries and pushes them to the API in
+    chunks: one batch request of cmdb.object.create per chunk, followed by one
+    batch request of cmdb.category.save for the category entries of the created
+    objects. Chunks are sent by parallel workers; only a few chunks are held in
+    memory at a time, so rows may come from a file of any size.
+
+    A mapping names the columns of a row::
+
+        {
+            "type": "C__OBJTYPE__SERVER",
+            "type_column": "type",
+            "title": "hostname",
+            "attributes": {"purpose": "purpose"},
+            "categories": {
+                "C__CATG__IP": {"hostname": "hostname", "ipv4_address": "ip"}
+            }
+        }
+
+    'type' is used for all rows, 'type_column' (optional) takes the type from a
+    column instead. 'attributes' are common attributes of cmdb.object.create,
+    'categories' map category attributes to columns. Empty values are left out and
+    categories without any value are not saved."""
+
+    def __init__(self, api, mapping, chunk_size=500, workers=1):
+        """Constructor
+
+        :param api: API instance
+        :param mapping: Mapping of columns, see above
+        :param chunk_size: Number of rows per batch request
+        :param workers: Number of chunks sent at the same time"""
+        if "title" not in mapping:
+            raise Exception("Mapping needs a title column")
+
+        if "type" not in mapping and "type_column" not in mapping:
+            raise Exception("Mapping needs an object type or a type column")
+
+        for value, name in ((chunk_size, "Chunk size"), (workers, "Workers")):
+            if not isinstance(value, int) or value < 1:
+                raise Exception(f"{name} must be a positive integer")
+
+        self._api = api
+        self._mapping = mapping
+        self._chunk_size = chunk_size
+        self._workers = workers
+
+    def run(self, rows, progress=None, on_error=None):
+        """Imports rows
+
+        :param rows: Iterable of rows as dicts, e.g. read_rows()
+        :param progress: (Optional) callable which gets the summary after every
+            chunk
+        :param on_error: (Optional) callable which gets the row number (starting
+            at 1), the row and the error of every failed row or category entry
+
+        :return: Numbers of read 'rows', created 'objects', saved 'entries' and
+            'failed' rows or entries"""
+        summary = {"rows": 0, "objects": 0, "entries": 0, "failed": 0}
+        pending = deque()
+
+        def collect(future):
+            for key, value in future.result().items():
+                if key == "errors":
+                    summary["failed"] += len(value)
+
+                    if on_error is not None:
+                        for error in sorted(value, key=lambda error: error[0]):
+                            on_error(*error)
+                else:
+                    summary[key] += value
+
+            if progress is not None:
+                progress(dict(summary))
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for chunk in self._chunks(rows):
+                if len(pending) >= self._workers * 2:
+                    collect(pending.popleft())
+
+                pending.append(executor.submit(self._import_chunk, chunk))
+
+            while len(pending) > 0:
+                collect(pending.popleft())
+
+        return summary
+
+    def _chunks(self, rows):
+        """Groups rows with their row numbers into chunks"""
+        chunk = []
+
+        for number, row in enumerate(rows, 1):
+            chunk.append((number, row))
+
+            if len(chunk) >= self._chunk_size:
+                yield chunk
+                chunk = []
+
+        if len(chunk) > 0:
+            yield chunk
+
+    def _import_chunk(self, chunk):
+        """Creates the objects of a chunk and saves their category entries
+
+        :return: Counts and errors of the chunk"""
+        counts = {"rows": len(chunk), "objects": 0, "entries": 0, "errors": []}
+        creates = []
+        created_rows = []
+
+        for number, row in chunk:
+            try:
+                creates.append(
+                    {"method": "cmdb.object.create", "params": self._map_object(row)}
+                )
+                created_rows.append((number, row))
+            except Exception as error:
+                counts["errors"].append((number, row, str(error)))
+
+        if len(creates) == 0:
+            return counts
+
+        saves = []
+        saved_rows = []
+
+        for (number, row), item in zip(
+            created_rows, self._api.batch_request(creates, partial=True)
+        ):
+            if item["error"] is not None:
+                counts["errors"].append((number, row, _message(item["error"])))
+                continue
+
+            try:
+                object_id = int(item["result"]["id"])
+            except (KeyError, TypeError, ValueError):
+                counts["errors"].append(
+                    (number, row, f"Bad result: {item['result']!r}")
+                )
+                continue
+
+            counts["objects"] += 1
+
+            for category, attributes in self._map_categories(row):
+                saves.append(
+                    {
+                        "method": "cmdb.category.save",
+                        "params": {
+                            "object": object_id,
+                            "category": category,
+                            "data": attributes,
+                        },
+                    }
+                )
+                saved_rows.append((number, row))
+
+        if len(saves) == 0:
+            return counts
+
+        for (number, row), item in zip(
+            saved_rows, self._api.batch_request(saves, partial=True)
+        ):
+            if item["error"] is not None:
+                counts["errors"].append((number, row, _message(item["error"])))
+            else:
+                counts["entries"] += 1
+
+        return counts
+
+    def _map_object(self, row):
+        """Builds the parameters of cmdb.object.create for a row"""
+        title = row.get(self._mapping["title"])
+
+        if title in (None, ""):
+            raise Exception("Title is missing")
+
+        type = self._mapping.get("type")
+
+        if "type_column" in self._mapping and row.get(
+            self._mapping["type_column"]
+        ) not in (None, ""):
+            type = row[self._mapping["type_column"]]
+
+        if type in (None, ""):
+            raise Exception("Object type is missing")
+
+        params = _map_attributes(row, self._mapping.get("attributes", {}))
+        params["type"] = type
+        params["title"] = title
+
+        return params
+
+    def _map_categories(self, row):
+        """Builds category constants and attributes for a row
+
+        :return: List of tuples of category constant and attributes"""
+        categories = []
+
+        for category, attributes in self._mapping.get("categories", {}).items():
+            attributes = _map_attributes(row, attributes)
+
+            if len(attributes) > 0:
+                categories.append((category, attributes))
+
+        return categories
+
+
+def _map_attributes(row, columns):
+    return {
+        attribute: row[column]
+        for attribute, column in columns.items()
+        if row.get(column) not in (None, "")
+    }
+
+
+def _message(error):
+    if isinstance(error, dict):
+        return error.get("message", str(error))
+
+    return str(error)
@@ -0,0 +1,204 @@
+"""Cache for metadata about object types and categories."""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+from idoit_api_client.singleflight import request_key
+
+"""Methods whose results are cached"""
+CACHED_METHODS = (
+    "cmdb.object_types.read",
+    "cmdb.object_types",
+    "cmdb.object_type_categories.read",
+    "cmdb.category_info",
+)
+
+
+class MetadataCache:
+    """Metadata cache
+
+    Keeps results of requests for object types, categories assigned to
+    object types and category information. Entries expire after a time to
+    live. Optionally the cache is persisted to a file in a directory; the
+    file name is derived from the API URL and the language, so several
+    i-doit instances may share one directory. Changes are written to the
+    file a few seconds after they happen, collected into one write, and on
+    flush() or close().
+
+    Results are copied when they are stored and when they are looked up, so
+    callers may change them without changing the cache."""
+
+    """Version of the file format"""
+    VERSION = 1
+
+    def __init__(self, url, language=None, ttl=86400, path=None, save_delay=5):
+        """Constructor
+
+        :param url: API URL
+        :param language: Language of the API client
+        :param ttl: Time to live of entries in seconds
+        :param path: (Optional) directory to persist the cache to
+        :param save_delay: Seconds to wait after a change before the file is
+            written"""
+        self._url = url
+        self._language = language
+        self._ttl = ttl
+        self._save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries = {}
+        self._file = None
+        self._changed = False
+        self._timer = None
+
+        if path is not None:
+            name = hashlib.sha256(f"{url}|{language}".encode("utf-8")).hexdigest()
+            self._file = os.path.join(path, f"idoit-metadata-{name[:16]}.json")
+            self._load()
+
+    def is_cacheable(self, method):
+        """Is the result of a method cached?
+
+        :param method: JSON-RPC method
+
+        :return: bool"""
+        return method in CACHED_METHODS
+
+    def key(self, method, params):
+        """Builds the key of a request
+
+        :param method: JSON-RPC method
+        :param params: Parameters; the API key is ignored
+
+        :return: Key as string, see request_key()"""
+        return request_key(method, params)
+
+    def get(self, key):
+        """Looks up an entry
+
+        :param key: Key, see key()
+
+        :return: Tuple of a hit flag and the cached result"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return False, None
+
+            if entry[0] < time.time():
+                del self._entries[key]
+                return False, None
+
+        return True, copy.deepcopy(entry[1])
+
+    def set(self, key, result):
+        """Stores an entry
+
+        :param key: Key, see key()
+        :param result: Result of the request"""
+        result = copy.deepcopy(result)
+
+        with self._lock:
+            self._entries[key] = (time.time() + self._ttl, result)
+
+        self._schedule_save()
+
+    def invalidate(self, method=None):
+        """Removes entries
+
+        :param method: (Optional) only remove entries of this method"""
+        with self._lock:
+            if method is None:
+                self._entries = {}
+            else:
+                self._entries = {
+                    key: entry
+                    for key, entry in self._entries.items()
+                    if not key.startswith(method + "{")
+                }
+
+        self._schedule_save()
+
+    def flush(self):
+        """Writes pending changes to the file now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            changed = self._changed
+
+        if changed:
+            self.save()
+
+    def close(self):
+        """Writes pending changes to the file, see flush()"""
+        self.flush()
+
+    def save(self):
+        """Writes the cache to its file, if it has one"""
+        if self._file is None:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                content = {
+                    "version": self.VERSION,
+                    "url": self._url,
+                    "language": self._language,
+                    "entries": dict(self._entries),
+                }
+                self._changed = False
+
+            temporary_file = f"{self._file}.{os.getpid()}.tmp"
+
+            with open(temporary_file, "w", encoding="utf-8") as handle:
+                json.dump(content, handle, separators=(",", ":"))
+
+            os.replace(temporary_file, self._file)
+
+    def _schedule_save(self):
+        """Writes the file after the save delay unless a write is pending"""
+        if self._file is None:
+            return
+
+        with self._lock:
+            self._changed = True
+
+            if self._timer is not None:
+                return
+
+            self._timer = threading.Timer(self._save_delay, self._save_later)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_later(self):
+        with self._lock:
+            self._timer = None
+
+        self.save()
+
+    def _load(self):
+        """Reads the cache from its file, if it exists"""
+        if not os.path.isfile(self._file):
+            return
+
+        try:
+            with open(self._file, encoding="utf-8") as handle:
+                content = json.load(handle)
+        except ValueError:
+            return
+
+        if content.get("version") != self.VERSION:
+            return
+
+        now = time.time()
+        self._entries = {
+            key: (entry[0], entry[1])
+            for key, entry in content["entries"].items()
+            if entry[0] >= now
+        }
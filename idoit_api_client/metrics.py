@@ -0,0 +1,362 @@
+"""Metrics of the calls sent to the API."""
+
+import bisect
+import threading
+
+"""Upper bounds of the latency buckets in seconds"""
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+"""Upper bounds of the batch size buckets in sub-requests"""
+BATCH_SIZE_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+"""Quantiles reported for histograms"""
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Histogram
+
+    Counts observations in buckets with fixed upper bounds, so memory does not
+    grow with the number of observations. Quantiles are interpolated linearly
+    within their bucket, like Prometheus does, and kept between the smallest and
+    the largest observation."""
+
+    def __init__(self, buckets):
+        """Constructor
+
+        :param buckets: Ascending upper bounds of the buckets"""
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0
+        self._min = None
+        self._max = None
+
+    def observe(self, value):
+        """Adds an observation"""
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+
+        if self._min is None or value < self._min:
+            self._min = value
+
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def quantile(self, quantile):
+        """Estimates a quantile
+
+        :param quantile: Quantile between 0 and 1
+
+        :return: Estimated value or None without observations"""
+        if self._count == 0:
+            return None
+
+        rank = quantile * self._count
+        cumulative = 0
+        value = self._max
+
+        for index, count in enumerate(self._counts):
+            if count > 0 and cumulative + count >= rank:
+                if index < len(self._buckets):
+                    lower = self._buckets[index - 1] if index > 0 else 0
+                    upper = self._buckets[index]
+                    value = lower + (upper - lower) * (rank - cumulative) / count
+
+                break
+
+            cumulative += count
+
+        return min(max(value, self._min), self._max)
+
+    def to_dict(self):
+        """Exports count, sum and quantiles
+
+        :return: dict"""
+        result = {"count": self._count, "sum": self._sum}
+
+        for quantile in QUANTILES:
+            result[f"p{int(quantile * 100)}"] = self.quantile(quantile)
+
+        return result
+
+    def get_buckets(self):
+        """Returns cumulative counts per upper bound, ending with '+Inf'
+
+        :return: List of tuples of upper bound and count"""
+        buckets = []
+        cumulative = 0
+
+        for bound, count in zip(self._buckets + ("+Inf",), self._counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+
+        return buckets
+
+    def get_count(self):
+        return self._count
+
+    def get_sum(self):
+        return self._sum
+
+
+class _CallMetrics:
+    """Metrics of calls sent to the API"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.serialize_seconds = 0
+        self.transport_seconds = 0
+        self.parse_seconds = 0
+
+    def add(
+        self,
+        request_bytes,
+        response_bytes,
+        serialize_seconds,
+        transport_seconds,
+        parse_seconds,
+    ):
+        self.latency.observe(serialize_seconds + transport_seconds + parse_seconds)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.serialize_seconds += serialize_seconds
+        self.transport_seconds += transport_seconds
+        self.parse_seconds += parse_seconds
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency": self.latency.to_dict(),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "serialize_seconds": self.serialize_seconds,
+            "transport_seconds": self.transport_seconds,
+            "parse_seconds": self.parse_seconds,
+        }
+
+
+class MetricsRegistry:
+    """Metrics registry
+
+    Records every call sent to the API, split into the time to serialize the
+    request, the time on the wire including the time the server needs
+    (transport), and the time to parse the response. Together with the sizes of
+    request and response this shows whether slowness comes from i-doit and the
+    network or from handling JSON in the client.
+
+    Single requests are recorded per JSON-RPC method. Batch requests are
+    recorded as batches, with a histogram of their sizes; their sub-requests
+    count towards the request and error counts of their methods."""
+
+    def __init__(self):
+        """Constructor"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drops all recorded metrics"""
+        with self._lock:
+            self._methods = {}
+            self._batches = _CallMetrics()
+            self._batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+
+    def record_call(
+        self,
+        data,
+        response,
+        request_bytes,
+        response_bytes,
+        serialize_seconds,
+        transport_seconds,
+        parse_seconds,
+    ):
+        """Records a call
+
+        :param data: JSON-RPC request or list of requests
+        :param response: Decoded response or None if the call failed
+        :param request_bytes: Size of the encoded request
+        :param response_bytes: Size of the encoded response
+        :param serialize_seconds: Time to encode the request
+        :param transport_seconds: Time from sending the request until the
+            response arrived
+        :param parse_seconds: Time to decode the response"""
+        timings = (
+            request_bytes,
+            response_bytes,
+            serialize_seconds,
+            transport_seconds,
+            parse_seconds,
+        )
+
+        with self._lock:
+            if not isinstance(data, list):
+                metrics = self._get_method(data.get("method"))
+                metrics.count += 1
+                metrics.errors += 0 if _is_success(response) else 1
+                metrics.add(*timings)
+                return
+
+            failed = _failed_ids(data, response)
+            self._batches.count += 1
+            self._batches.errors += len(failed)
+            self._batches.add(*timings)
+            self._batch_sizes.observe(len(data))
+
+            for request in data:
+                metrics = self._get_method(request.get("method"))
+                metrics.count += 1
+
+                if request.get("id") in failed:
+                    metrics.errors += 1
+
+    def to_dict(self):
+        """Exports all metrics
+
+        'methods' holds the metrics of single requests and the request and error
+        counts of batched sub-requests per method, 'batches' the metrics of batch
+        requests including their 'size'.
+
+        :return: dict"""
+        with self._lock:
+            batches = self._batches.to_dict()
+            batches["size"] = self._batch_sizes.to_dict()
+
+            return {
+                "methods": {
+                    method: metrics.to_dict()
+                    for method, metrics in sorted(self._methods.items())
+                },
+                "batches": batches,
+            }
+
+    def to_prometheus(self, prefix="idoit_api_client"):
+        """Exports all metrics in the Prometheus text format
+
+        :param prefix: Prefix of the metric names
+
+        :return: str"""
+        lines = []
+
+        with self._lock:
+            methods = sorted(self._methods.items())
+            sources = [({"method": method}, metrics) for method, metrics in methods]
+            # Methods which were only sent in batches have no calls of their own:
+            called = [
+                (labels, metrics)
+                for labels, metrics in sources
+                if metrics.latency.get_count() > 0
+            ]
+            batch_source = [({}, self._batches)]
+
+            for name, help, attribute, targets in (
+                ("requests_total", "Requests per method", "count", sources),
+                ("request_errors_total", "Failed requests", "errors", sources),
+                ("batches_total", "Batch requests", "count", batch_source),
+                ("batch_errors_total", "Failed sub-requests", "errors", batch_source),
+            ):
+                _write_family(lines, f"{prefix}_{name}", help, "counter")
+
+                for labels, metrics in targets:
+                    _write_sample(
+                        lines, f"{prefix}_{name}", labels, getattr(metrics, attribute)
+                    )
+
+            for kind, targets in (("request", called), ("batch", batch_source)):
+                name = f"{prefix}_{kind}_duration_seconds"
+                _write_family(lines, name, f"Latency of {kind} calls", "histogram")
+
+                for labels, metrics in targets:
+                    _write_histogram(lines, name, labels, metrics.latency)
+
+                for attribute, help in (
+                    ("request_bytes", "Size of encoded requests"),
+                    ("response_bytes", "Size of encoded responses"),
+                    ("serialize_seconds", "Time to encode requests"),
+                    ("transport_seconds", "Time until responses arrived"),
+                    ("parse_seconds", "Time to decode responses"),
+                ):
+                    name = f"{prefix}_{kind}_{attribute}_total"
+                    _write_family(lines, name, f"{help} of {kind} calls", "counter")
+
+                    for labels, metrics in targets:
+                        _write_sample(lines, name, labels, getattr(metrics, attribute))
+
+            name = f"{prefix}_batch_size"
+            _write_family(lines, name, "Sub-requests per batch", "histogram")
+            _write_histogram(lines, name, {}, self._batch_sizes)
+
+        return "\n".join(lines) + "\n"
+
+    def _get_method(self, method):
+        if method not in self._methods:
+            self._methods[method] = _CallMetrics()
+
+        return self._methods[method]
+
+
+def _is_success(response):
+    return isinstance(response, dict) and response.get("error") is None
+
+
+def _failed_ids(data, response):
+    """Identifiers of the sub-requests of a batch which failed"""
+    if not isinstance(response, list):
+        return {request.get("id") for request in data}
+
+    succeeded = {item.get("id") for item in response if _is_success(item)}
+
+    return {request.get("id") for request in data} - succeeded
+
+
+def _write_family(lines, name, help, type):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {type}")
+
+
+def _write_sample(lines, name, labels, value):
+    if len(labels) > 0:
+        name += (
+            "{"
+            + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            + "}"
+        )
+
+    lines.append(f"{name} {value}")
+
+
+def _write_histogram(lines, name, labels, histogram):
+    for bound, count in histogram.get_buckets():
+        _write_sample(lines, f"{name}_bucket", {**labels, "le": str(bound)}, count)
+
+    _write_sample(lines, f"{name}_sum", labels, histogram.get_sum())
+    _write_sample(lines, f"{name}_count", labels, histogram.get_count())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
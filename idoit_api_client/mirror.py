@@ -0,0 +1,412 @@
+"""Local SQLite mirror of objects and category entries."""
+
+import json
+import sqlite3
+import threading
+import time
+
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.query import bypass
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    type INTEGER,
+    type_title TEXT,
+    title TEXT,
+    sysid TEXT,
+    status INTEGER,
+    cmdb_status INTEGER,
+    created TEXT,
+    updated TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS category_entries (
+    object_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    entry_id INTEGER,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_type ON objects (type);
+CREATE INDEX IF NOT EXISTS objects_title ON objects (title);
+CREATE INDEX IF NOT EXISTS category_entries_object
+    ON category_entries (object_id, category);
+CREATE INDEX IF NOT EXISTS category_entries_category ON category_entries (category);
+"""
+
+
+class Mirror:
+    """Mirror of the CMDB in a local SQLite database
+
+    The first sync() loads all objects including their category entries page by
+    page. Later calls compare the change timestamps ('updated') of all objects with
+    the mirrored ones and only fetch new and changed objects again; objects which
+    are gone are removed. Reads never touch the API."""
+
+    """Version of the database layout"""
+    VERSION = 1
+
+    def __init__(self, api, path, page_size=100):
+        """Constructor
+
+        :param api: API instance
+        :param path: File path of the database, ':memory:' for a temporary one
+        :param page_size: Number of objects fetched per request"""
+        if not isinstance(page_size, int) or page_size < 1:
+            raise Exception("Page size must be a positive integer")
+
+        self._api = api
+        self._page_size = page_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+        version = self._get_meta("version")
+
+        if version is None:
+            with self._lock, self._connection:
+                self._set_meta("version", self.VERSION)
+        elif int(version) != self.VERSION:
+            raise Exception(f"Unsupported mirror version {version} in {path}")
+
+    def close(self):
+        """Closes the database"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def sync(self):
+        """Brings the mirror up to date
+
+        :return: Numbers of 'created', 'updated' and 'deleted' objects"""
+        if self.last_sync() is None:
+            return self.full_load()
+
+        with bypass():
+            return self._sync()
+
+    def _sync(self):
+        mirrored = dict(self._fetch("SELECT id, updated FROM objects"))
+        changed_ids = []
+        live_ids = set()
+        created = 0
+
+        for object in CMDBObjects(self._api).iter_objects_by_id(
+            {}, self._page_size * 10, False
+        ):
+            object_id = int(object["id"])
+            live_ids.add(object_id)
+
+            if object_id not in mirrored:
+                created += 1
+                changed_ids.append(object_id)
+            elif mirrored[object_id] != object.get("updated"):
+                changed_ids.append(object_id)
+
+        deleted_ids = [
+            (object_id,) for object_id in mirrored if object_id not in live_ids
+        ]
+
+        started = time.time()
+
+        if len(changed_ids) > 0:
+            self._store(
+                CMDBObjects(self._api).iter_objects_by_id(
+                    {"ids": changed_ids}, self._page_size, True
+                )
+            )
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM category_entries WHERE object_id = ?", deleted_ids
+            )
+            self._connection.executemany(
+                "DELETE FROM objects WHERE id = ?", deleted_ids
+            )
+            self._set_meta("last_sync", started)
+
+        return {
+            "created": created,
+            "updated": len(changed_ids) - created,
+            "deleted": len(deleted_ids),
+        }
+
+    def full_load(self):
+        """Replaces the mirror with all objects and their category entries
+
+        The mirror counts as not synced until all pages are stored, so a load
+        which fails halfway is never used and the next sync() starts over.
+
+        :return: Numbers of 'created', 'updated' and 'deleted' objects"""
+        started = time.time()
+
+        with self._lock, self._connection:
+            self._delete_meta("last_sync")
+            self._connection.execute("DELETE FROM category_entries")
+            self._connection.execute("DELETE FROM objects")
+
+        with bypass():
+            created = self._store(
+                CMDBObjects(self._api).iter_objects_by_id({}, self._page_size, True)
+            )
+
+        with self._lock, self._connection:
+            self._set_meta("last_sync", started)
+
+        return {"created": created, "updated": 0, "deleted": 0}
+
+    def last_sync(self):
+        """Returns when the mirror was synced
+
+        :return: Unix timestamp of the start of the last sync or None"""
+        value = self._get_meta("last_sync")
+
+        if value is None:
+            return None
+
+        return float(value)
+
+    def count(self):
+        """Returns the number of mirrored objects
+
+        :return: int"""
+        return self._fetch("SELECT COUNT(*) FROM objects")[0][0]
+
+    def read(self, object_id):
+        """Reads common information about an object
+
+        :param object_id: Object identifier
+
+        :return: Object as returned by cmdb.objects.read or None"""
+        rows = self._fetch("SELECT data FROM objects WHERE id = ?", (int(object_id),))
+
+        if len(rows) == 0:
+            return None
+
+        return json.loads(rows[0][0])
+
+    def read_all(self, object_id):
+        """Reads an object including all its category entries
+
+        :param object_id: Object identifier
+
+        :return: Object with category constants as keys and entries as values in
+            'categories' or None"""
+        object = self.read(object_id)
+
+        if object is None:
+            return None
+
+        object["categories"] = {}
+
+        for category, data in self._fetch(
+            "SELECT category, data FROM category_entries "
+            "WHERE object_id = ? ORDER BY category, position",
+            (int(object_id),),
+        ):
+            object["categories"].setdefault(category, []).append(json.loads(data))
+
+        return object
+
+    def read_by_type(self, object_type):
+        """Reads all objects of an object type
+
+        :param object_type: Object type identifier
+
+        :return: List of objects ordered by their identifiers"""
+        return self._read_objects("type = ?", (int(object_type),))
+
+    def read_by_title(self, title):
+        """Reads all objects with a title
+
+        :param title: Object title
+
+        :return: List of objects ordered by their identifiers"""
+        return self._read_objects("title = ?", (title,))
+
+    def read_category(self, object_id, category_const):
+        """Reads the entries of a category
+
+        :param object_id: Object identifier
+        :param category_const: Category constant
+
+        :return: List of category entries"""
+        return [
+            json.loads(row[0])
+            for row in self._fetch(
+                "SELECT data FROM category_entries "
+                "WHERE object_id = ? AND category = ? ORDER BY position",
+                (int(object_id), category_const),
+            )
+        ]
+
+    def read_category_objects(self, category_const):
+        """Reads the identifiers of all objects with entries in a category
+
+        :param category_const: Category constant
+
+        :return: Sorted list of object identifiers"""
+        return [
+            row[0]
+            for row in self._fetch(
+                "SELECT DISTINCT object_id FROM category_entries "
+                "WHERE category = ? ORDER BY object_id",
+                (category_const,),
+            )
+        ]
+
+    def iter_objects(self):
+        """Iterates over all mirrored objects
+
+        :return: generator Objects ordered by their identifiers"""
+        last_id = 0
+
+        while True:
+            rows = self._fetch(
+                "SELECT id, data FROM objects WHERE id > ? ORDER BY id LIMIT 1000",
+                (last_id,),
+            )
+
+            for row in rows:
+                yield json.loads(row[1])
+
+            if len(rows) < 1000:
+                return
+
+            last_id = rows[-1][0]
+
+    def read_category_entries(self, category_const):
+        """Reads the entries of a category of all objects
+
+        :param category_const: Category constant
+
+        :return: List of tuples of object identifier and category entry"""
+        return [
+            (row[0], json.loads(row[1]))
+            for row in self._fetch(
+                "SELECT object_id, data FROM category_entries "
+                "WHERE category = ? ORDER BY object_id, position",
+                (category_const,),
+            )
+        ]
+
+    def _fetch(self, sql, parameters=()):
+        """Runs a query; the connection is shared by threads
+
+        :return: List of rows"""
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _read_objects(self, where, parameters):
+        return [
+            json.loads(row[0])
+            for row in self._fetch(
+                f"SELECT data FROM objects WHERE {where} ORDER BY id", parameters
+            )
+        ]
+
+    def _store(self, objects):
+        """Writes objects and their category entries, one transaction per page
+
+        :param objects: Iterable of objects as returned by cmdb.objects.read with
+            categories
+
+        :return: Number of written objects"""
+        count = 0
+        page = []
+
+        for object in objects:
+            page.append(object)
+
+            if len(page) >= self._page_size:
+                count += self._store_page(page)
+                page = []
+
+        if len(page) > 0:
+            count += self._store_page(page)
+
+        return count
+
+    def _store_page(self, objects):
+        object_rows = []
+        entry_rows = []
+
+        for object in objects:
+            object = dict(object)
+            object_id = int(object["id"])
+            categories = object.pop("categories", None) or {}
+
+            object_rows.append(
+                (
+                    object_id,
+                    _to_int(object.get("type")),
+                    object.get("type_title"),
+                    object.get("title"),
+                    object.get("sysid"),
+                    _to_int(object.get("status")),
+                    _to_int(object.get("cmdb_status")),
+                    object.get("created"),
+                    object.get("updated"),
+                    json.dumps(object),
+                )
+            )
+
+            for category, entries in categories.items():
+                for position, entry in enumerate(entries or []):
+                    entry_rows.append(
+                        (
+                            object_id,
+                            category,
+                            _to_int(entry.get("id")),
+                            position,
+                            json.dumps(entry),
+                        )
+                    )
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM category_entries WHERE object_id = ?",
+                [(row[0],) for row in object_rows],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                object_rows,
+            )
+            self._connection.executemany(
+                "INSERT INTO category_entries VALUES (?, ?, ?, ?, ?)", entry_rows
+            )
+
+        return len(object_rows)
+
+    def _get_meta(self, key):
+        rows = self._fetch("SELECT value FROM meta WHERE key = ?", (key,))
+
+        if len(rows) == 0:
+            return None
+
+        return rows[0][0]
+
+    def _set_meta(self, key, value):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value))
+        )
+
+    def _delete_meta(self, key):
+        self._connection.execute("DELETE FROM meta WHERE key = ?", (key,))
+
+
+def _to_int(value):
+    """Converts identifiers which i-doit returns as strings"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
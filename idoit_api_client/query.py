@@ -0,0 +1,354 @@
+"""Query engine answering cmdb.objects.read from a local mirror."""
+
+import contextlib
+import contextvars
+import threading
+
+from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+
+"""Category holding the location of an object"""
+LOCATION_CATEGORY = "C__CATG__LOCATION"
+
+"""Category holding first name, last name and email address of a person"""
+PERSON_CATEGORY = "C__CATS__PERSON"
+
+"""Fields to order by, keyed by the names cmdb.objects.read accepts"""
+ORDER_BY_FIELDS = {
+    "isys_obj_type__id": "type",
+    "isys_obj__isys_obj_type__id": "type",
+    "type": "type",
+    "isys_obj__title": "title",
+    "title": "title",
+    "isys_obj_type__title": "type_title",
+    "type_title": "type_title",
+    "isys_obj__sysid": "sysid",
+    "sysid": "sysid",
+    "isys_cats_person_list__first_name": "first_name",
+    "first_name": "first_name",
+    "isys_cats_person_list__last_name": "last_name",
+    "last_name": "last_name",
+    "isys_cats_person_list__mail_address": "email",
+    "email": "email",
+    "isys_obj__id": "ids",
+    "id": "ids",
+}
+
+"""Set while the current thread or task sends cmdb.objects.read to the API"""
+_bypass = contextvars.ContextVar("idoit_api_client_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass():
+    """Sends cmdb.objects.read to the API within a block even if a local mirror is
+    used
+
+    Only the current thread or task is affected; other threads keep using the
+    query engine."""
+    token = _bypass.set(True)
+
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class QueryEngine:
+    """Query engine
+
+    Loads the objects of a Mirror into memory and indexes them by every field the
+    filter of cmdb.objects.read knows: 'ids', 'type', 'type_group', 'status',
+    'title', 'type_title', 'location', 'sysid', 'first_name', 'last_name' and
+    'email'. Filters are combined like the API does; a list of values matches any
+    of them. Orders are computed once per field. The engine reloads itself after
+    the mirror has been synced. It cannot answer requests before the mirror has
+    been synced for the first time."""
+
+    """Filter fields in the order they are indexed"""
+    FILTERS = (
+        "ids",
+        "type",
+        "type_group",
+        "status",
+        "title",
+        "type_title",
+        "location",
+        "sysid",
+        "first_name",
+        "last_name",
+        "email",
+    )
+
+    def __init__(self, mirror, api=None):
+        """Constructor
+
+        :param mirror: Mirror instance
+        :param api: (Optional) API instance to resolve object type constants and
+            object type groups"""
+        self._mirror = mirror
+        self._api = api
+        self._lock = threading.Lock()
+        self._object_types = None
+        self.refresh()
+
+    def get_mirror(self):
+        """Returns the mirror
+
+        :return: Mirror"""
+        return self._mirror
+
+    def refresh(self):
+        """Reloads objects and indexes from the mirror"""
+        synced = self._mirror.last_sync()
+        objects = {}
+        fields = {field: {} for field in self.FILTERS}
+
+        for object in self._mirror.iter_objects():
+            object_id = int(object["id"])
+            objects[object_id] = object
+            fields["ids"][object_id] = str(object_id)
+
+            for field in ("type", "status", "title", "type_title", "sysid"):
+                if object.get(field) is not None:
+                    fields[field][object_id] = str(object[field])
+
+            if object.get("type_group_title") is not None:
+                fields["type_group"][object_id] = object["type_group_title"]
+
+        for object_id, entry in self._mirror.read_category_entries(LOCATION_CATEGORY):
+            parent = entry.get("parent")
+
+            if isinstance(parent, dict):
+                parent = parent.get("id")
+
+            if parent is not None:
+                fields["location"][object_id] = str(parent)
+
+        for object_id, entry in self._mirror.read_category_entries(PERSON_CATEGORY):
+            for field, attribute in (
+                ("first_name", "first_name"),
+                ("last_name", "last_name"),
+                ("email", "mail"),
+            ):
+                if entry.get(attribute) is not None:
+                    fields[field][object_id] = str(entry[attribute])
+
+        indexes = {}
+
+        for field, values in fields.items():
+            index = {}
+
+            for object_id, value in values.items():
+                index.setdefault(value, set()).add(object_id)
+
+            indexes[field] = index
+
+        with self._lock:
+            self._synced = synced
+            self._objects = objects
+            self._fields = fields
+            self._indexes = indexes
+            self._ranks = {}
+
+    def is_ready(self):
+        """Can the engine answer requests of the current thread or task?
+
+        Not before the mirror has been synced and not within bypass().
+
+        :return: bool"""
+        return not _bypass.get() and self._mirror.last_sync() is not None
+
+    def count(self):
+        """Returns the number of objects
+
+        :return: int"""
+        return len(self._objects)
+
+    def read(
+        self,
+        filter={},
+        limit=None,
+        offset=None,
+        order_by=None,
+        sort=None,
+        categories=None,
+    ):
+        """Fetch objects like CMDBObjects.read() does
+
+        :param dict filter (Optional) Filter, see CMDBObjects.read()
+        :param int limit (Optional) Limit result set
+        :param int offset Offset
+        :param str order_by Order result set, see CMDBObjects.read()
+        :param str sort Sort ascending ('asc') or descending ('desc')
+        :param bool|array categories Also fetch category entries
+
+        :return list Indexed array of associative arrays"""
+        synced = self._mirror.last_sync()
+
+        if synced is None:
+            raise Exception("Local mirror has not been synced yet")
+
+        if synced != self._synced:
+            self.refresh()
+
+        object_ids = self._match(filter)
+        object_ids = self._order(object_ids, order_by, sort)
+
+        if offset is not None:
+            object_ids = object_ids[offset:]
+
+        if limit is not None:
+            object_ids = object_ids[:limit]
+
+        return [self._to_result(object_id, categories) for object_id in object_ids]
+
+    def request(self, params):
+        """Answers a request for cmdb.objects.read
+
+        :param dict params Parameters as sent to the API
+
+        :return list Result as returned by the API"""
+        limit = params.get("limit")
+        offset = None
+
+        if isinstance(limit, str):
+            parts = [int(part) for part in limit.split(",")]
+
+            if len(parts) == 2:
+                offset, limit = parts
+            else:
+                limit = parts[0]
+
+        return self.read(
+            params.get("filter") or {},
+            limit,
+            offset,
+            params.get("order_by"),
+            params.get("sort"),
+            params.get("categories"),
+        )
+
+    def _match(self, filter):
+        """Intersects the index entries of all filters
+
+        :return: Set of object identifiers"""
+        unknown = set(filter) - set(self.FILTERS)
+
+        if len(unknown) > 0:
+            raise Exception(f"Unsupported filter: {', '.join(sorted(unknown))}")
+
+        selected = None
+
+        for field in sorted(filter, key=self.FILTERS.index):
+            values = filter[field]
+
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+
+            matched = set()
+
+            for value in values:
+                matched |= self._lookup(field, str(value))
+
+            selected = matched if selected is None else selected & matched
+
+            if len(selected) == 0:
+                return selected
+
+        if selected is None:
+            return set(self._objects)
+
+        return selected
+
+    def _lookup(self, field, key):
+        """Looks up a filter value in the index of a field
+
+        Object types and object type groups which are not found are resolved by
+        the object types of the API, so constants may be used as well.
+
+        :return: Set of object identifiers"""
+        matched = self._indexes[field].get(key, set())
+
+        if len(matched) > 0 or self._api is None or field not in ("type", "type_group"):
+            return matched
+
+        if self._object_types is None:
+            self._object_types = CMDBObjectTypes(self._api).read()
+
+        if field == "type":
+            type_ids = [
+                str(object_type["id"])
+                for object_type in self._object_types
+                if object_type.get("const") == key
+            ]
+        else:
+            type_ids = [
+                str(object_type["id"])
+                for object_type in self._object_types
+                if key
+                in (
+                    str(object_type.get("type_group")),
+                    str(object_type.get("type_group_title")),
+                    str(object_type.get("type_group_const")),
+                )
+            ]
+
+        matched = set()
+
+        for type_id in type_ids:
+            matched |= self._indexes["type"].get(type_id, set())
+
+        return matched
+
+    def _order(self, object_ids, order_by, sort):
+        """Sorts object identifiers by the precomputed order of a field
+
+        :return: List of object identifiers"""
+        field = ORDER_BY_FIELDS.get(order_by or "id")
+
+        if field is None:
+            raise Exception(f"Unsupported order: {order_by}")
+
+        descending = str(sort).lower() == "desc"
+        order, ranks = self._get_order(field)
+
+        if len(object_ids) == len(order):
+            # All objects match, the precomputed order is the result:
+            return order[::-1] if descending else list(order)
+
+        return sorted(object_ids, key=ranks.__getitem__, reverse=descending)
+
+    def _get_order(self, field):
+        """Computes the order of all objects by a field once
+
+        :return: Tuple of the ordered object identifiers and their ranks"""
+        if field not in self._ranks:
+            values = self._fields[field]
+            numeric = field in ("ids", "type")
+
+            def key(object_id):
+                value = values.get(object_id)
+
+                if numeric:
+                    return int(value or 0), object_id
+
+                return value or "", object_id
+
+            order = sorted(self._objects, key=key)
+            ranks = {object_id: rank for rank, object_id in enumerate(order)}
+            self._ranks[field] = (order, ranks)
+
+        return self._ranks[field]
+
+    def _to_result(self, object_id, categories):
+        """Copies an object and adds category entries if requested"""
+        object = dict(self._objects[object_id])
+
+        if categories is True:
+            object["categories"] = self._mirror.read_all(object_id)["categories"]
+        elif isinstance(categories, list):
+            object["categories"] = {
+                category: self._mirror.read_category(object_id, category)
+                for category in categories
+            }
+
+        return object
@@ -0,0 +1,180 @@
+"""Snapshot of the CMDB schema stored in a file."""
+
+import json
+import time
+
+
+class SchemaSnapshot:
+    """Schema snapshot
+
+    Holds object types, the categories assigned to each object type and
+    information about all non-virtual categories. A snapshot is exported
+    once and loaded by later processes with a single deserialization, so
+    they do not need to ask the API for the schema again. Object types are
+    found by identifier and by constant. A snapshot is only used by API
+    instances with the URL and language it was exported from."""
+
+    """Version of the file format"""
+    VERSION = 1
+
+    def __init__(self, content):
+        """Constructor
+
+        :param content: Content of a snapshot, see export()"""
+        if not isinstance(content, dict) or content.get("version") != self.VERSION:
+            raise Exception("Unsupported schema snapshot version")
+
+        self._content = content
+        self._object_type_categories = {}
+
+        for object_type in content["object_types"]:
+            categories = content["object_type_categories"][str(object_type["id"])]
+            self._object_type_categories[str(object_type["id"])] = categories
+            self._object_type_categories[object_type["const"]] = categories
+
+    @classmethod
+    def export(cls, api, path):
+        """Reads the schema from the API and writes it to a file
+
+        Notice: This method causes 3 api calls.
+
+        :param api: API instance
+        :param path: File path
+
+        :return: SchemaSnapshot"""
+        # Imported here because the package imports this module:
+        from idoit_api_client import Constants
+        from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+        from idoit_api_client.cmdbobjecttypecategories import (
+            CMDBObjectTypeCategories,
+        )
+        from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+
+        # Do not answer from a snapshot which is already in use:
+        previous_snapshot = api.get_schema_snapshot()
+        api.set_schema_snapshot(None)
+
+        try:
+            object_types = CMDBObjectTypes(api).read()
+            object_type_ids = [object_type["id"] for object_type in object_types]
+            object_type_categories = CMDBObjectTypeCategories(api).batch_read_by_id(
+                object_type_ids
+            )
+
+            cmdb_category_info = CMDBCategoryInfo(api)
+            category_constants = cmdb_category_info.get_category_constants(
+                object_type_categories
+            )
+            category_info = dict(
+                zip(
+                    category_constants,
+                    cmdb_category_info.batch_read(category_constants),
+                )
+            )
+        finally:
+            api.set_schema_snapshot(previous_snapshot)
+
+        content = {
+            "version": cls.VERSION,
+            "url": api._config[Constants.URL],
+            "language": api._config.get(Constants.LANGUAGE),
+            "created": int(time.time()),
+            "object_types": object_types,
+            "object_type_categories": dict(
+                zip([str(id) for id in object_type_ids], object_type_categories)
+            ),
+            "category_info": category_info,
+        }
+
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(content, handle, separators=(",", ":"))
+
+        return cls(content)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a snapshot from a file
+
+        :param path: File path
+
+        :return: SchemaSnapshot"""
+        with open(path, "rb") as handle:
+            return cls(json.loads(handle.read()))
+
+    def check_api(self, api):
+        """Checks whether the snapshot was exported from the same i-doit
+        instance and in the same language an API instance uses
+
+        :param api: API instance
+
+        :raises: Exception if URL or language differ"""
+        # Imported here because the package imports this module:
+        from idoit_api_client import Constants
+
+        for name, value in (
+            ("URL", api._config[Constants.URL]),
+            ("language", api._config.get(Constants.LANGUAGE)),
+        ):
+            expected = self._content.get(name.lower())
+
+            if expected != value:
+                raise Exception(
+                    f'Schema snapshot was exported with {name} "{expected}", '
+                    f'not "{value}"'
+                )
+
+    def created(self):
+        """Returns when the snapshot was exported
+
+        :return: Unix timestamp"""
+        return self._content["created"]
+
+    def object_types(self):
+        """Returns all object types
+
+        :return: List of object types as returned by cmdb.object_types.read"""
+        return self._content["object_types"]
+
+    def has_object_type(self, object_type):
+        """Does the snapshot know an object type?
+
+        :param object_type: Object type identifier or constant
+
+        :return: bool"""
+        return str(object_type) in self._object_type_categories
+
+    def object_type_categories(self, object_type):
+        """Returns the categories assigned to an object type
+
+        :param object_type: Object type identifier or constant
+
+        :return: Result as returned by cmdb.object_type_categories.read"""
+        if not self.has_object_type(object_type):
+            raise Exception(f'Object type "{object_type}" is not in snapshot')
+
+        return self._object_type_categories[str(object_type)]
+
+    def has_category_info(self, category_const):
+        """Does the snapshot know a category?
+
+        :param category_const: Category constant
+
+        :return: bool"""
+        return category_const in self._content["category_info"]
+
+    def category_info(self, category_const):
+        """Returns information about a category
+
+        :param category_const: Category constant
+
+        :return: Result as returned by cmdb.category_info"""
+        if not self.has_category_info(category_const):
+            raise Exception(f'Category "{category_const}" is not in snapshot')
+
+        return self._content["category_info"][category_const]
+
+    def category_info_all(self):
+        """Returns information about all categories
+
+        :return: Category constants as keys and information as values"""
+        return dict(self._content["category_info"])
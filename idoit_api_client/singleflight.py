@@ -0,0 +1,89 @@
+"""Shares one call between identical concurrent read requests."""
+
+import json
+import threading
+from concurrent.futures import Future
+
+"""Methods which only read data"""
+READ_ONLY_METHODS = ("cmdb.category_info", "cmdb.object_types")
+
+
+def is_read_only(method):
+    """Does a JSON-RPC method only read data?
+
+    :param method: JSON-RPC method
+
+    :return: True for "*.read", "cmdb.category_info" and "cmdb.object_types"
+    """
+    return method.endswith(".read") or method in READ_ONLY_METHODS
+
+
+def request_key(method, params):
+    """Builds a key which identifies a request by its method and parameters
+
+    :param method: JSON-RPC method
+    :param params: Parameters; the API key is ignored
+
+    :return: Key as string"""
+    params = {key: value for key, value in params.items() if key != "apikey"}
+
+    return method + json.dumps(
+        params, sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+class SingleFlight:
+    """Single-flight deduplication
+
+    While a call for a key is running, further calls for the same key wait
+    for it and receive the same result object instead of calling again.
+    Results are shared, so callers must not modify them."""
+
+    def __init__(self):
+        """Constructor"""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def key(self, method, params):
+        """Builds the key of a request
+
+        :param method: JSON-RPC method
+        :param params: Parameters; the API key is ignored
+
+        :return: Key as string, see request_key()"""
+        return request_key(method, params)
+
+    def do(self, key, function, *args):
+        """Calls function unless a call for the same key is running
+
+        :param key: Key, see key()
+        :param function: Callable
+        :param args: Arguments for the callable
+
+        :return: Return value of the (shared) call"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function(*args)
+        except Exception as error:
+            self._forget(key)
+            future.set_exception(error)
+            raise
+
+        self._forget(key)
+        future.set_result(result)
+
+        return result
+
+    def _forget(self, key):
+        with self._lock:
+            del self._calls[key]
@@ -0,0 +1,1029 @@
+"""Stand-in i-doit JSON-RPC server for benchmarks and tests."""
+
+import datetime
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from idoit_api_client.query import ORDER_BY_FIELDS
+
+"""Error code of requests which cannot be parsed"""
+PARSE_ERROR = -32700
+
+"""Error code of invalid requests, e.g. too large batches"""
+INVALID_REQUEST = -32600
+
+"""Error code of unknown methods"""
+METHOD_NOT_FOUND = -32601
+
+"""Error code of failed requests as used by i-doit"""
+SYSTEM_ERROR = -32099
+
+"""Status of normal objects and entries"""
+STATUS_NORMAL = 2
+
+"""Status of archived objects and entries"""
+STATUS_ARCHIVED = 3
+
+"""Status of deleted objects and entries"""
+STATUS_DELETED = 4
+
+"""Status of templates"""
+STATUS_TEMPLATE = 6
+
+"""Status of mass change templates"""
+STATUS_MASS_CHANGE_TEMPLATE = 7
+
+"""Parameters added by the client to every request"""
+CLIENT_PARAMS = ("apikey", "language")
+
+"""Point in time of the first change"""
+EPOCH = datetime.datetime(2026, 1, 1)
+
+
+class StandInDataset:
+    """In-memory CMDB of the stand-in server
+
+    Holds object types, categories with their attributes, objects and category
+    entries, and answers the API methods on them with results shaped like the
+    ones of i-doit. Every change advances a clock by one second, so 'created' and
+    'updated' do not depend on the time a test or benchmark runs."""
+
+    def __init__(self):
+        """Constructor"""
+        self._lock = threading.RLock()
+        self._object_types = {}
+        self._categories = {}
+        self._objects = {}
+        self._entries = {}
+        self._last_ids = {"object_type": 0, "category": 0, "object": 0, "entry": 0}
+        self._ticks = 0
+        self._sessions = 0
+        self._methods = {
+            "idoit.login": self._login,
+            "idoit.logout": self._logout,
+            "cmdb.object.create": self._create_object,
+            "cmdb.object.read": self._read_object,
+            "cmdb.object.update": self._update_object,
+            "cmdb.object.archive": self._set_object_status(STATUS_ARCHIVED),
+            "cmdb.object.delete": self._set_object_status(STATUS_DELETED),
+            "cmdb.object.recycle": self._set_object_status(STATUS_NORMAL),
+            "cmdb.object.markAsTemplate": self._set_object_status(STATUS_TEMPLATE),
+            "cmdb.object.markAsMassChangeTemplate": self._set_object_status(
+                STATUS_MASS_CHANGE_TEMPLATE
+            ),
+            "cmdb.object.purge": self._purge_object,
+            "cmdb.objects.read": self._read_objects,
+            "cmdb.category.create": self._create_entry,
+            "cmdb.category.read": self._read_entries,
+            "cmdb.category.save": self._save_entry,
+            "cmdb.category.update": self._update_entry,
+            "cmdb.category.archive": self._set_entry_status(STATUS_ARCHIVED),
+            "cmdb.category.delete": self._set_entry_status(STATUS_DELETED),
+            "cmdb.category.recycle": self._set_entry_status(STATUS_NORMAL),
+            "cmdb.category.purge": self._purge_entry,
+            "cmdb.category.quickpurge": self._purge_entry,
+            "cmdb.category_info": self._read_category_info,
+            "cmdb.category_info.read": self._read_category_info,
+            "cmdb.object_types": self._read_object_types,
+            "cmdb.object_types.read": self._read_object_types,
+            "cmdb.object_type_categories": self._read_object_type_categories,
+            "cmdb.object_type_categories.read": self._read_object_type_categories,
+        }
+
+    def add_category(self, const, attributes, multi_value=False):
+        """Adds a category
+
+        :param const: Category constant
+        :param attributes: List of attribute keys
+        :param multi_value: Whether objects may have more than one entry
+
+        :return: Category identifier"""
+        with self._lock:
+            if const in self._categories:
+                raise Exception(f"Category {const} already exists")
+
+            category_id = self._next_id("category")
+            self._categories[const] = {
+                "id": category_id,
+                "const": const,
+                "attributes": list(attributes),
+                "multi_value": multi_value,
+            }
+
+            return category_id
+
+    def add_object_type(self, const, title, categories=(), group="Infrastructure"):
+        """Adds an object type
+
+        :param const: Object type constant
+        :param title: Object type title
+        :param categories: Constants of the categories assigned to the type
+        :param group: Title of the object type group
+
+        :return: Object type identifier"""
+        with self._lock:
+            for category in categories:
+                if category not in self._categories:
+                    raise Exception(f"Category {category} not found")
+
+            object_type_id = self._next_id("object_type")
+            self._object_types[object_type_id] = {
+                "id": object_type_id,
+                "const": const,
+                "title": title,
+                "group": group,
+                "categories": list(categories),
+            }
+
+            return object_type_id
+
+    def add_object(self, object_type, title, status=STATUS_NORMAL):
+        """Adds an object
+
+        :param object_type: Object type identifier or constant
+        :param title: Object title
+        :param status: Object status
+
+        :return: Object identifier"""
+        with self._lock:
+            object_type = self._get_object_type(object_type)
+            object_id = self._next_id("object")
+            now = self._tick()
+            self._objects[object_id] = {
+                "id": object_id,
+                "title": title,
+                "sysid": f"SYSID_{1700000000 + object_id}",
+                "type": object_type["id"],
+                "status": status,
+                "cmdb_status": 6,
+                "created": now,
+                "updated": now,
+            }
+
+            return object_id
+
+    def add_entry(self, object_id, category_const, attributes):
+        """Adds a category entry to an object
+
+        :param object_id: Object identifier
+        :param category_const: Category constant
+        :param attributes: Attributes as key-value pairs
+
+        :return: Entry identifier"""
+        with self._lock:
+            object = self._get_object(object_id)
+            self._get_category(category_const)
+            entry_id = self._next_id("entry")
+            self._entries.setdefault((object["id"], category_const), []).append(
+                {"id": entry_id, "status": STATUS_NORMAL, "data": dict(attributes)}
+            )
+            self._touch(object)
+
+            return entry_id
+
+    def populate(self, objects=100, object_types=5, categories=10, entries=1, seed=0):
+        """Fills the dataset with generated objects
+
+        Every object type gets C__CATG__GLOBAL, C__CATG__RACK_VIEW (a virtual
+        category without entries) and all generated categories, so the number of
+        categories controls how wide the object types are. Every third generated
+        category is multi-valued.
+
+        :param objects: Number of objects, spread over the object types
+        :param object_types: Number of object types
+        :param categories: Number of generated categories per object type
+        :param entries: Number of entries per object and category
+        :param seed: Seed of the generated attribute values
+
+        :return: self"""
+        generator = random.Random(seed)
+
+        with self._lock:
+            if "C__CATG__GLOBAL" not in self._categories:
+                self.add_category(
+                    "C__CATG__GLOBAL", ["title", "sysid", "purpose", "description"]
+                )
+
+            if "C__CATG__RACK_VIEW" not in self._categories:
+                self.add_category("C__CATG__RACK_VIEW", [])
+
+            constants = [
+                f"C__CATG__STAND_IN_{index}" for index in range(1, categories + 1)
+            ]
+
+            for index, const in enumerate(constants):
+                self.add_category(
+                    const,
+                    ["title", "serial", "value", "description"],
+                    index % 3 == 2,
+                )
+
+            type_ids = [
+                self.add_object_type(
+                    f"C__OBJTYPE__STAND_IN_{index}",
+                    f"Stand-in type {index}",
+                    ["C__CATG__GLOBAL", "C__CATG__RACK_VIEW"] + constants,
+                )
+                for index in range(1, object_types + 1)
+            ]
+
+            for index in range(objects):
+                object_id = self.add_object(
+                    type_ids[index % len(type_ids)], f"Object {index + 1}"
+                )
+
+                for const in constants:
+                    for entry in range(entries):
+                        self.add_entry(
+                            object_id,
+                            const,
+                            {
+                                "title": f"{const} {entry + 1}",
+                                "serial": f"{generator.getrandbits(32):08x}",
+                                "value": generator.randint(0, 1000),
+                                "description": "",
+                            },
+                        )
+
+        return self
+
+    def count_objects(self):
+        """Returns the number of objects
+
+        :return: int"""
+        return len(self._objects)
+
+    def has_method(self, method):
+        """Is a method implemented?
+
+        :return: bool"""
+        return method in self._methods
+
+    def call(self, method, params):
+        """Answers a request
+
+        :param method: JSON-RPC method
+        :param params: Parameters as sent by the client
+
+        :return: Result"""
+        params = {
+            key: value for key, value in params.items() if key not in CLIENT_PARAMS
+        }
+
+        with self._lock:
+            return self._methods[method](params)
+
+    def _next_id(self, kind):
+        self._last_ids[kind] += 1
+
+        return self._last_ids[kind]
+
+    def _tick(self):
+        """Advances the clock
+
+        :return: Current point in time as formatted by i-doit"""
+        self._ticks += 1
+
+        return (EPOCH + datetime.timedelta(seconds=self._ticks)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+
+    def _touch(self, object):
+        object["updated"] = self._tick()
+
+    def _get_object_type(self, value):
+        """Finds an object type by its identifier or constant"""
+        if isinstance(value, str) and not value.isdigit():
+            for object_type in self._object_types.values():
+                if object_type["const"] == value:
+                    return object_type
+        elif value is not None and int(value) in self._object_types:
+            return self._object_types[int(value)]
+
+        raise Exception(f"Object type {value} not found")
+
+    def _get_object(self, object_id):
+        try:
+            return self._objects[int(object_id)]
+        except (KeyError, TypeError, ValueError):
+            raise Exception(f"Object {object_id} not found")
+
+    def _get_category(self, const):
+        if const not in self._categories:
+            raise Exception(f"Category {const} not found")
+
+        return self._categories[const]
+
+    def _get_entry(self, object_id, const, entry_id):
+        for entry in self._entries.get((object_id, const), []):
+            if entry["id"] == int(entry_id):
+                return entry
+
+        raise Exception(f"Entry {entry_id} of category {const} not found")
+
+    def _login(self, params):
+        self._sessions += 1
+
+        return {
+            "result": True,
+            "userid": "9",
+            "name": "Stand-in Admin",
+            "mail": "",
+            "username": "admin",
+            "session-id": f"stand-in-{self._sessions}",
+            "client-id": "1",
+            "client-name": "Stand-in",
+        }
+
+    def _logout(self, params):
+        return {"message": "Logout successful", "result": True}
+
+    def _create_object(self, params):
+        if params.get("title") in (None, ""):
+            raise Exception("Object title is missing")
+
+        object_id = self.add_object(params.get("type"), params["title"])
+        object = self._objects[object_id]
+
+        if "cmdb_status" in params:
+            object["cmdb_status"] = int(params["cmdb_status"])
+
+        for const, entries in params.get("categories", {}).items():
+            if isinstance(entries, dict):
+                entries = [entries]
+
+            for attributes in entries:
+                self._save(object, const, attributes)
+
+        return {
+            "id": object_id,
+            "message": "Object was successfully created",
+            "success": True,
+        }
+
+    def _read_object(self, params):
+        try:
+            object = self._get_object(params.get("id"))
+        except Exception:
+            return []
+
+        object_type = self._object_types[object["type"]]
+
+        return {
+            "id": object["id"],
+            "title": object["title"],
+            "sysid": object["sysid"],
+            "objecttype": object_type["id"],
+            "type_title": object_type["title"],
+            "type_icon": "",
+            "status": object["status"],
+            "cmdb_status": object["cmdb_status"],
+            "cmdb_status_title": "in operation",
+            "created": object["created"],
+            "updated": object["updated"],
+            "image": "",
+        }
+
+    def _update_object(self, params):
+        object = self._get_object(params.get("id"))
+
+        if params.get("title") not in (None, ""):
+            object["title"] = params["title"]
+
+        self._touch(object)
+
+        return {"success": True, "message": "Object title was successfully updated"}
+
+    def _set_object_status(self, status):
+        def set_status(params):
+            object = self._get_object(params.get("object", params.get("id")))
+            object["status"] = status
+            self._touch(object)
+
+            return {
+                "success": True,
+                "message": f"Object {object['id']} has been updated",
+            }
+
+        return set_status
+
+    def _purge_object(self, params):
+        object = self._get_object(params.get("object", params.get("id")))
+        del self._objects[object["id"]]
+
+        for key in [key for key in self._entries if key[0] == object["id"]]:
+            del self._entries[key]
+
+        return {"success": True, "message": f"Object {object['id']} has been purged"}
+
+    def _read_objects(self, params):
+        filter = dict(params.get("filter") or {})
+        objects = self._objects.values()
+
+        if "ids" in filter:
+            filter["ids"] = {int(object_id) for object_id in filter["ids"]}
+            objects = [
+                self._objects[object_id]
+                for object_id in sorted(filter["ids"])
+                if object_id in self._objects
+            ]
+
+        selected = [object for object in objects if self._matches(object, filter)]
+
+        order_by = params.get("order_by")
+
+        if order_by not in (None, ""):
+            field = ORDER_BY_FIELDS.get(order_by)
+
+            if field not in ("ids", "title", "type", "type_title", "sysid"):
+                raise Exception(f"Ordering by {order_by} is not supported")
+
+            selected.sort(key=lambda object: self._order_key(object, field))
+
+        if str(params.get("sort", "ASC")).upper() == "DESC":
+            selected.reverse()
+
+        limit = params.get("limit")
+
+        if limit not in (None, ""):
+            parts = [int(part) for part in str(limit).split(",")]
+            offset, limit = parts if len(parts) == 2 else (0, parts[0])
+            selected = selected[offset : offset + limit]
+
+        categories = params.get("categories")
+        results = []
+
+        for object in selected:
+            result = self._to_list_item(object)
+
+            if categories is True or isinstance(categories, list):
+                constants = categories
+
+                if categories is True:
+                    constants = self._object_types[object["type"]]["categories"]
+
+                result["categories"] = {
+                    const: self._render_entries(object["id"], const, STATUS_NORMAL)
+                    for const in constants
+                }
+
+            results.append(result)
+
+        return results
+
+    def _matches(self, object, filter):
+        """Does an object match a filter of cmdb.objects.read?"""
+        object_type = self._object_types[object["type"]]
+
+        for key, value in filter.items():
+            if key == "ids":
+                if object["id"] not in value:
+                    return False
+            elif key == "type":
+                if not any(
+                    str(item) in (str(object_type["id"]), object_type["const"])
+                    for item in (value if isinstance(value, list) else [value])
+                ):
+                    return False
+            elif key == "type_group":
+                if value != object_type["group"]:
+                    return False
+            elif key == "status":
+                if int(value) != object["status"]:
+                    return False
+            elif key in ("title", "sysid"):
+                if value != object[key]:
+                    return False
+            elif key == "type_title":
+                if value != object_type["title"]:
+                    return False
+            else:
+                raise Exception(f"Filter {key} is not supported")
+
+        return "status" in filter or object["status"] == STATUS_NORMAL
+
+    def _order_key(self, object, field):
+        if field == "ids":
+            return object["id"]
+
+        if field == "type_title":
+            return self._object_types[object["type"]]["title"]
+
+        return object[field]
+
+    def _to_list_item(self, object):
+        """Formats an object like cmdb.objects.read does"""
+        object_type = self._object_types[object["type"]]
+
+        return {
+            "id": str(object["id"]),
+            "title": object["title"],
+            "sysid": object["sysid"],
+            "type": str(object_type["id"]),
+            "created": object["created"],
+            "updated": object["updated"],
+            "type_title": object_type["title"],
+            "type_group_title": object_type["group"],
+            "status": str(object["status"]),
+            "cmdb_status": str(object["cmdb_status"]),
+            "cmdb_status_title": "in operation",
+            "image": "",
+        }
+
+    def _render_entries(self, object_id, const, status):
+        return [
+            {"id": str(entry["id"]), "objID": str(object_id), **entry["data"]}
+            for entry in self._entries.get((object_id, const), [])
+            if status == -1 or entry["status"] == int(status)
+        ]
+
+    def _read_entries(self, params):
+        object = self._get_object(params.get("objID"))
+        self._get_category(params.get("category"))
+
+        return self._render_entries(
+            object["id"], params["category"], params.get("status", STATUS_NORMAL)
+        )
+
+    def _save(self, object, const, attributes, entry_id=None):
+        """Updates an entry or creates a new one
+
+        :return: Entry identifier"""
+        category = self._get_category(const)
+        attributes = self._check_attributes(category, attributes)
+        entries = self._entries.get((object["id"], const), [])
+
+        if entry_id is None and not category["multi_value"] and len(entries) > 0:
+            entry_id = entries[0]["id"]
+
+        if entry_id is None:
+            return self.add_entry(object["id"], const, attributes)
+
+        entry = self._get_entry(object["id"], const, entry_id)
+        entry["data"].update(attributes)
+        self._touch(object)
+
+        return entry["id"]
+
+    def _check_attributes(self, category, attributes):
+        """Drops the entry identifier and refuses unknown attributes"""
+        attributes = {key: value for key, value in attributes.items() if key != "id"}
+        unknown = set(attributes) - set(category["attributes"])
+
+        if len(unknown) > 0:
+            raise Exception(
+                "Unknown attributes of {}: {}".format(
+                    category["const"], ", ".join(sorted(unknown))
+                )
+            )
+
+        return attributes
+
+    def _save_entry(self, params):
+        entry_id = self._save(
+            self._get_object(params.get("object")),
+            params.get("category"),
+            params.get("data", {}),
+            params.get("entry"),
+        )
+
+        return {
+            "success": True,
+            "message": "Category entry successfully saved",
+            "entry": entry_id,
+        }
+
+    def _create_entry(self, params):
+        object = self._get_object(params.get("objID"))
+        attributes = self._check_attributes(
+            self._get_category(params.get("category")), params.get("data", {})
+        )
+        entry_id = self.add_entry(object["id"], params["category"], attributes)
+
+        return {
+            "id": entry_id,
+            "message": "Category entry successfully created.",
+            "success": True,
+        }
+
+    def _update_entry(self, params):
+        attributes = params.get("data", {})
+        self._save(
+            self._get_object(params.get("objID")),
+            params.get("category"),
+            attributes,
+            attributes.get("id"),
+        )
+
+        return {"success": True, "message": "Category entry successfully saved"}
+
+    def _set_entry_status(self, status):
+        def set_status(params):
+            object = self._get_object(params.get("object"))
+            entry = self._get_entry(
+                object["id"], params.get("category"), params.get("entry")
+            )
+            entry["status"] = status
+            self._touch(object)
+
+            return {
+                "success": True,
+                "message": f"Entry {entry['id']} has been updated",
+            }
+
+        return set_status
+
+    def _purge_entry(self, params):
+        object = self._get_object(params.get("object"))
+        key = (object["id"], params.get("category"))
+        self._get_category(params.get("category"))
+
+        if params.get("entry") is None:
+            self._entries.pop(key, None)
+        else:
+            entry = self._get_entry(object["id"], key[1], params["entry"])
+            self._entries[key].remove(entry)
+
+        self._touch(object)
+
+        return {"success": True, "message": "Entry has been purged"}
+
+    def _read_category_info(self, params):
+        category = self._get_category(params.get("category"))
+
+        return {
+            attribute: {
+                "title": attribute,
+                "check": {"mandatory": False},
+                "info": {
+                    "primary_field": False,
+                    "type": "text",
+                    "backward": False,
+                    "title": attribute,
+                    "description": attribute,
+                },
+                "data": {
+                    "type": "text",
+                    "readonly": False,
+                    "index": False,
+                    "field": f"isys_catg_stand_in_list__{attribute}",
+                },
+                "ui": {"type": "text", "params": [], "default": None, "id": attribute},
+                "format": None,
+            }
+            for attribute in category["attributes"]
+        }
+
+    def _read_object_types(self, params):
+        filter = params.get("filter") or {}
+        object_types = list(self._object_types.values())
+
+        if "id" in filter:
+            object_types = [self._get_object_type(filter["id"])]
+
+        if "ids" in filter:
+            object_types = [
+                self._get_object_type(object_type) for object_type in filter["ids"]
+            ]
+
+        if "title" in filter:
+            object_types = [
+                object_type
+                for object_type in object_types
+                if object_type["title"] == filter["title"]
+            ]
+
+        results = []
+
+        for object_type in object_types:
+            result = {
+                "id": str(object_type["id"]),
+                "title": object_type["title"],
+                "container": "0",
+                "const": object_type["const"],
+                "color": "ffffff",
+                "image": "",
+                "icon": "",
+                "cats": "",
+                "tree_group": "1",
+                "status": str(STATUS_NORMAL),
+                "type_group": "1",
+                "type_group_title": object_type["group"],
+            }
+
+            if params.get("countobjects"):
+                result["objectcount"] = str(
+                    sum(
+                        1
+                        for object in self._objects.values()
+                        if object["type"] == object_type["id"]
+                    )
+                )
+
+            results.append(result)
+
+        return results
+
+    def _read_object_type_categories(self, params):
+        object_type = self._get_object_type(params.get("type"))
+        result = {"catg": [], "cats": []}
+
+        for const in object_type["categories"]:
+            category = self._categories[const]
+            result["cats" if const.startswith("C__CATS__") else "catg"].append(
+                {
+                    "id": str(category["id"]),
+                    "title": const,
+                    "const": const,
+                    "multi_value": "1" if category["multi_value"] else "0",
+                    "source_table": "isys_catg_stand_in",
+                }
+            )
+
+        return result
+
+
+class StandInServer:
+    """Stand-in i-doit JSON-RPC server
+
+    Answers requests and batch requests from a StandInDataset, either in-process
+    (see attach()) or over HTTP on localhost (see serve()). The server can mimic
+    a remote i-doit instance:
+
+    * latency and jitter (milliseconds) are added to every call, request_latency
+      to every request of a batch
+    * error_rate is the probability that a request fails with an injected error,
+      optionally only for the methods in error_methods
+    * batches with more than max_batch_size requests are refused
+    * shuffle_batches answers batches in random order, like servers which handle
+      the requests of a batch concurrently
+
+    All randomness comes from one seeded generator, so runs are repeatable."""
+
+    def __init__(
+        self,
+        dataset=None,
+        latency=0,
+        jitter=0,
+        request_latency=0,
+        error_rate=0,
+        error_methods=None,
+        max_batch_size=None,
+        shuffle_batches=False,
+        key=None,
+        seed=0,
+    ):
+        """Constructor
+
+        :param dataset: (Optional) StandInDataset; a populated dataset by default
+        :param latency: Milliseconds added to every call
+        :param jitter: Milliseconds by which the latency varies at most
+        :param request_latency: Milliseconds added per request of a batch
+        :param error_rate: Probability between 0 and 1 that a request fails
+        :param error_methods: (Optional) methods errors are injected into
+        :param max_batch_size: (Optional) maximum number of requests per batch
+        :param shuffle_batches: Answer batches in random order
+        :param key: (Optional) API key; any key is accepted by default
+        :param seed: Seed of latency, jitter, errors and order"""
+        if not 0 <= error_rate <= 1:
+            raise Exception("Error rate must be between 0 and 1")
+
+        self._dataset = dataset if dataset is not None else StandInDataset().populate()
+        self._latency = latency
+        self._jitter = jitter
+        self._request_latency = request_latency
+        self._error_rate = error_rate
+        self._error_methods = None if error_methods is None else set(error_methods)
+        self._max_batch_size = max_batch_size
+        self._shuffle_batches = shuffle_batches
+        self._key = key
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._http_server = None
+        self._thread = None
+        self.reset_stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._http_server is not None:
+            self.shutdown()
+
+    def get_dataset(self):
+        """Returns the dataset
+
+        :return: StandInDataset"""
+        return self._dataset
+
+    def get_stats(self):
+        """Returns the numbers of 'calls', 'requests' and failed requests ('errors')
+
+        :return: dict"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """Resets the numbers of calls, requests and errors"""
+        with self._stats_lock:
+            self._stats = {"calls": 0, "requests": 0, "errors": 0}
+
+    def handle(self, payload):
+        """Answers a request or a batch request
+
+        :param payload: Decoded JSON-RPC request or list of requests
+
+        :return: Response or list of responses"""
+        is_batch = isinstance(payload, list)
+        requests = payload if is_batch else [payload]
+
+        with self._stats_lock:
+            self._stats["calls"] += 1
+
+        self._wait(len(requests))
+
+        if is_batch and (
+            len(requests) == 0
+            or (
+                self._max_batch_size is not None
+                and len(requests) > self._max_batch_size
+            )
+        ):
+            return _error_response(None, INVALID_REQUEST, "Invalid batch size")
+
+        responses = [self._handle_request(request) for request in requests]
+
+        if not is_batch:
+            return responses[0]
+
+        if self._shuffle_batches:
+            with self._random_lock:
+                self._random.shuffle(responses)
+
+        return responses
+
+    def handle_body(self, body):
+        """Answers an encoded request
+
+        :param body: JSON-RPC request as string or bytes
+
+        :return: Encoded response as bytes"""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            response = _error_response(None, PARSE_ERROR, "Parse error")
+        else:
+            response = self.handle(payload)
+
+        return json.dumps(response).encode("utf-8")
+
+    def attach(self, api):
+        """Answers all requests of an API instance in-process
+
+        Requests and responses are still encoded as JSON, so the client does the
+        same work as with a remote server, only without the network. Metrics of
+        the API instance are recorded and traced like for HTTP calls.
+
+        :param api: API instance
+
+        :return: API instance"""
+
+        def execute(data={}):
+            return api._timed_call(data, self.handle_body)
+
+        api._execute = execute
+
+        return api
+
+    def serve(self, host="127.0.0.1", port=0):
+        """Starts an HTTP server in a background thread
+
+        :param host: Host to listen on
+        :param port: Port to listen on; a free port by default
+
+        :return: URL to use as Constants.URL"""
+        if self._http_server is not None:
+            raise Exception("Stand-in server is already running")
+
+        self._http_server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._http_server.daemon_threads = True
+        self._http_server.stand_in = self
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+        return self.get_url()
+
+    def get_url(self):
+        """Returns the URL of the running HTTP server
+
+        :return: str"""
+        if self._http_server is None:
+            raise Exception("Stand-in server is not running")
+
+        host, port = self._http_server.server_address[:2]
+
+        return f"http://{host}:{port}/src/jsonrpc.php"
+
+    def shutdown(self):
+        """Stops the HTTP server"""
+        if self._http_server is None:
+            raise Exception("Stand-in server is not running")
+
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._thread.join()
+        self._http_server = None
+        self._thread = None
+
+    def _wait(self, amount):
+        """Sleeps for the latency of a call with an amount of requests"""
+        delay = self._latency + self._request_latency * amount
+
+        if self._jitter > 0:
+            with self._random_lock:
+                delay += self._random.uniform(-self._jitter, self._jitter)
+
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _handle_request(self, request):
+        """Answers a single request of a call"""
+        with self._stats_lock:
+            self._stats["requests"] += 1
+
+        response = self._answer(request)
+
+        if "error" in response:
+            with self._stats_lock:
+                self._stats["errors"] += 1
+
+        return response
+
+    def _answer(self, request):
+        if not isinstance(request, dict) or "method" not in request:
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+
+        if self._key is not None and params.get("apikey") != self._key:
+            return _error_response(request_id, SYSTEM_ERROR, "Invalid API key")
+
+        if not self._dataset.has_method(method):
+            return _error_response(
+                request_id, METHOD_NOT_FOUND, f"Method {method} not found"
+            )
+
+        if self._error_rate > 0 and (
+            self._error_methods is None or method in self._error_methods
+        ):
+            with self._random_lock:
+                failed = self._random.random() < self._error_rate
+
+            if failed:
+                return _error_response(request_id, SYSTEM_ERROR, "Injected error")
+
+        try:
+            result = self._dataset.call(method, params)
+        except Exception as error:
+            return _error_response(request_id, SYSTEM_ERROR, str(error))
+
+        return {"jsonrpc": "2.0", "result": result, "id": request_id}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Passes HTTP requests to the stand-in server"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.server.stand_in.handle_body(self.rfile.read(length))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _error_response(request_id, code, message):
+    return {
+        "jsonrpc": "2.0",
+        "error": {"code": code, "message": message, "data": None},
+        "id": request_id,
+    }
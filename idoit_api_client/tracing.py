@@ -0,0 +1,430 @@
+"""Tracing of API calls with OpenTelemetry-compatible spans."""
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+
+"""Span kind of work inside the client"""
+SPAN_KIND_INTERNAL = 1
+
+"""Span kind of calls sent to the API"""
+SPAN_KIND_CLIENT = 3
+
+"""Status code of spans which did not fail"""
+STATUS_CODE_UNSET = 0
+
+"""Status code of failed spans"""
+STATUS_CODE_ERROR = 2
+
+"""Parameters holding object identifiers, see get_object_ids()"""
+OBJECT_ID_PARAMS = ("id", "objID", "object", "ids")
+
+"""Span of the current thread or task"""
+_current_span = contextvars.ContextVar("idoit_api_client_span", default=None)
+
+"""Random numbers for trace and span identifiers"""
+_random = random.Random()
+
+
+def get_current_span():
+    """Returns the span of the current thread or task
+
+    :return: Span or None"""
+    return _current_span.get()
+
+
+def get_object_ids(params):
+    """Collects the object identifiers of request parameters
+
+    :param params: Parameters of a JSON-RPC request
+
+    :return: List of object identifiers"""
+    if not isinstance(params, dict):
+        return []
+
+    ids = []
+
+    for source in (params, params.get("filter")):
+        if not isinstance(source, dict):
+            continue
+
+        for key in OBJECT_ID_PARAMS:
+            value = source.get(key)
+
+            if isinstance(value, list):
+                ids.extend(value)
+            elif value is not None:
+                ids.append(value)
+
+    return ids
+
+
+def get_request_attributes(method, params={}):
+    """Span attributes of a JSON-RPC request
+
+    :param method: JSON-RPC method
+    :param params: (Optional) parameters
+
+    :return: dict"""
+    attributes = {"rpc.method": method}
+    object_ids = get_object_ids(params)
+
+    if len(object_ids) > 0:
+        attributes["idoit.object.ids"] = object_ids
+
+    return attributes
+
+
+def traced(name, attributes=None, kind=SPAN_KIND_INTERNAL):
+    """Decorates a method of API or of a request class with a span
+
+    Nothing is recorded if the API has no tracer.
+
+    :param name: Span name
+    :param attributes: (Optional) callable which gets the arguments of the method
+        without self and returns the span attributes
+    :param kind: Span kind"""
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, "_api", self).get_tracer()
+
+            if tracer is None:
+                return function(self, *args, **kwargs)
+
+            with tracer.span(
+                name,
+                None if attributes is None else attributes(*args, **kwargs),
+                kind,
+            ):
+                return function(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class Span:
+    """Span
+
+    A timed operation with attributes. Spans started while another span is
+    current become its children and share its trace."""
+
+    def __init__(self, tracer, name, attributes=None, kind=SPAN_KIND_INTERNAL):
+        """Constructor, see Tracer.start_span()"""
+        parent = get_current_span()
+
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = (
+            parent.trace_id
+            if parent is not None
+            else f"{_random.getrandbits(128):032x}"
+        )
+        self.span_id = f"{_random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.status_code = STATUS_CODE_UNSET
+        self.status_message = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    def set_attribute(self, key, value):
+        """Sets an attribute"""
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        """Sets several attributes"""
+        self.attributes.update(attributes)
+
+    def set_status(self, code, message=None):
+        """Sets the status
+
+        :param code: STATUS_CODE_UNSET or STATUS_CODE_ERROR
+        :param message: (Optional) description of the error"""
+        self.status_code = code
+        self.status_message = message
+
+    def record_exception(self, error):
+        """Marks the span as failed
+
+        :param error: Exception"""
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = str(error)
+        self.attributes["exception.type"] = type(error).__name__
+        self.attributes["exception.message"] = str(error)
+
+    def end(self):
+        """Ends the span and passes it to the exporter"""
+        if self.end_time is not None:
+            return
+
+        self.end_time = time.time_ns()
+        self._tracer._export(self)
+
+    def get_duration(self):
+        """Returns the duration in seconds
+
+        :return: float or None if the span has not ended"""
+        if self.end_time is None:
+            return None
+
+        return (self.end_time - self.start_time) / 1e9
+
+    def to_dict(self):
+        """Exports the span
+
+        :return: dict"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.get_duration(),
+            "attributes": dict(self.attributes),
+            "error": (
+                self.status_message if self.status_code == STATUS_CODE_ERROR else None
+            ),
+        }
+
+    def to_otlp(self):
+        """Exports the span in the OTLP/JSON format of OpenTelemetry
+
+        :return: dict"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [
+                {"key": key, "value": _to_otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status_code},
+        }
+
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+
+        if self.status_message is not None:
+            span["status"]["message"] = self.status_message
+
+        return span
+
+
+class Tracer:
+    """Tracer
+
+    Creates spans and passes every ended span to an exporter. An exporter is any
+    object with a method export(spans), e.g. InMemoryExporter or FileExporter."""
+
+    def __init__(self, exporter=None):
+        """Constructor
+
+        :param exporter: (Optional) exporter of ended spans"""
+        self._exporter = exporter
+
+    def get_exporter(self):
+        return self._exporter
+
+    def start_span(self, name, attributes=None, kind=SPAN_KIND_INTERNAL):
+        """Starts a span without making it the current one
+
+        :param name: Span name
+        :param attributes: (Optional) attributes as key-value pairs
+        :param kind: Span kind
+
+        :return: Span; call end() when the operation is done"""
+        return Span(self, name, attributes, kind)
+
+    @contextlib.contextmanager
+    def span(self, name, attributes=None, kind=SPAN_KIND_INTERNAL):
+        """Runs a block in a span which is the current one meanwhile
+
+        Exceptions mark the span as failed and are raised again.
+
+        :param name: Span name
+        :param attributes: (Optional) attributes as key-value pairs
+        :param kind: Span kind"""
+        span = self.start_span(name, attributes, kind)
+        token = _current_span.set(span)
+
+        try:
+            yield span
+        except Exception as error:
+            span.record_exception(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def flush(self):
+        """Passes buffered spans on if the exporter buffers them"""
+        if hasattr(self._exporter, "flush"):
+            self._exporter.flush()
+
+    def shutdown(self):
+        """Passes buffered spans on and stops the exporter"""
+        if hasattr(self._exporter, "shutdown"):
+            self._exporter.shutdown()
+
+    def _export(self, span):
+        if self._exporter is not None:
+            self._exporter.export([span])
+
+
+class InMemoryExporter:
+    """Keeps ended spans in memory, e.g. for tests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def export(self, spans):
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_spans(self, name=None):
+        """Returns ended spans in the order they ended
+
+        :param name: (Optional) only return spans with this name
+
+        :return: List of spans"""
+        with self._lock:
+            return [span for span in self._spans if name is None or span.name == name]
+
+    def clear(self):
+        with self._lock:
+            self._spans = []
+
+
+class FileExporter:
+    """Appends ended spans to a file in the OTLP/JSON format
+
+    Every line holds one export request of OpenTelemetry, so the file can be read
+    by the OpenTelemetry Collector (otlpjsonfile receiver) and passed on to any
+    trace viewer.
+
+    Like the BatchSpanProcessor of OpenTelemetry, spans are buffered and written
+    together, so requests do not wait for the file: when the buffer holds
+    max_batch_size spans, interval milliseconds after the first buffered span, on
+    flush(), on shutdown() and when the interpreter exits."""
+
+    def __init__(
+        self, path, service_name="idoit_api_client", max_batch_size=512, interval=5000
+    ):
+        """Constructor
+
+        :param path: File path
+        :param service_name: Name of the traced service
+        :param max_batch_size: Write when the buffer holds this many spans
+        :param interval: Write this many milliseconds after the first buffered
+            span at the latest"""
+        for value, name in (
+            (max_batch_size, "Maximum batch size"),
+            (interval, "Interval"),
+        ):
+            if not isinstance(value, int) or value < 1:
+                raise Exception(f"{name} must be a positive integer")
+
+        self._path = path
+        self._service_name = service_name
+        self._max_batch_size = max_batch_size
+        self._interval = interval / 1000
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._spans = []
+        self._timer = None
+        self._shut_down = False
+        atexit.register(self.shutdown)
+
+    def export(self, spans):
+        with self._lock:
+            self._spans.extend(spans)
+            full = len(self._spans) >= self._max_batch_size
+
+            if not full and not self._shut_down and self._timer is None:
+                self._timer = threading.Timer(self._interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        # Spans ended after shutdown() are written at once:
+        if full or self._shut_down:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered spans now"""
+        with self._write_lock:
+            with self._lock:
+                spans = self._spans
+                self._spans = []
+
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            if len(spans) > 0:
+                self._write(spans)
+
+    def shutdown(self):
+        """Writes all buffered spans; later spans are written one by one"""
+        with self._lock:
+            self._shut_down = True
+
+        self.flush()
+        atexit.unregister(self.shutdown)
+
+    def _write(self, spans):
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": _to_otlp_value(self._service_name),
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": "idoit_api_client"},
+                                "spans": [span.to_otlp() for span in spans],
+                            }
+                        ],
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+
+        with open(self._path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+def _to_otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_to_otlp_value(item) for item in value]}}
+
+    return {"stringValue": str(value)}
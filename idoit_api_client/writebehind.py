@@ -0,0 +1,216 @@
+"""Write-behind queue which saves category entries in the background."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+"""Marks the queue to be sent at once"""
+_FLUSH = object()
+
+"""Marks the end of the queue"""
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Write-behind queue
+
+    Accepts write requests immediately and sends them from a background thread
+    as batch requests. A batch is sent when it holds the maximum number of
+    requests or when the interval has passed since its first request, whichever
+    comes first. If the queue is full, callers wait until there is room again.
+    Every request gets its own future; failed requests are also passed to an
+    optional error callback."""
+
+    def __init__(
+        self, api, max_requests=100, interval=1000, max_queue=10000, on_error=None
+    ):
+        """Constructor
+
+        :param api: API instance which sends the batch requests
+        :param max_requests: Send a batch when it holds this many requests
+        :param interval: Send a batch this many milliseconds after its first
+            request at the latest
+        :param max_queue: Number of queued requests before callers have to wait
+        :param on_error: (Optional) callable which gets the request and the
+            exception of every failed request"""
+        for value, name in (
+            (max_requests, "Maximum number of requests"),
+            (interval, "Interval"),
+            (max_queue, "Maximum queue size"),
+        ):
+            if not isinstance(value, int) or value < 1:
+                raise Exception(f"{name} must be a positive integer")
+
+        self._api = api
+        self._max_requests = max_requests
+        self._interval = interval / 1000
+        self._on_error = on_error
+        self._queue = queue.Queue(max_queue)
+        # Nothing may be queued after _STOP, it would never be taken:
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, method, params={}, timeout=None):
+        """Queues a request
+
+        :param method: JSON-RPC method
+        :param params: Optional parameters
+        :param timeout: (Optional) seconds to wait for room in a full queue;
+            waits as long as needed by default
+
+        :return: Future which resolves to the result of the request"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise Exception("Write-behind queue is full")
+
+        try:
+            if self._closed:
+                raise Exception("Write-behind queue is closed")
+
+            future = Future()
+            self._queue.put(
+                ({"method": method, "params": params}, future),
+                timeout=(
+                    None if deadline is None else max(deadline - time.monotonic(), 0)
+                ),
+            )
+        except queue.Full:
+            raise Exception("Write-behind queue is full")
+        finally:
+            self._lock.release()
+
+        return future
+
+    def save(self, object_id, category_const, attributes, entry_id=None):
+        """Queues cmdb.category.save, see CMDBCategory.save()
+
+        :param object_id: Object identifier
+        :param category_const: Category constant
+        :param attributes: Attributes as key-value pairs
+        :param entry_id: Entry identifier (only needed for multi-valued categories)
+
+        :return: Future which resolves to the result of the request"""
+        params = {"object": object_id, "data": attributes, "category": category_const}
+
+        if entry_id is not None:
+            params["entry"] = entry_id
+
+        return self.submit("cmdb.category.save", params)
+
+    def create(self, object_id, category_const, attributes):
+        """Queues cmdb.category.create, see CMDBCategory.create()
+
+        :param object_id: Object identifier
+        :param category_const: Category constant
+        :param attributes: Attributes as key-value pairs
+
+        :return: Future which resolves to the result of the request"""
+        return self.submit(
+            "cmdb.category.create",
+            {"objID": object_id, "data": attributes, "category": category_const},
+        )
+
+    def pending(self):
+        """Returns the number of queued requests which have not been sent yet
+
+        :return: int"""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Sends all queued requests now and waits until they are answered"""
+        with self._lock:
+            if not self._closed:
+                self._queue.put(_FLUSH)
+
+        self._queue.join()
+
+    def close(self):
+        """Sends all queued requests and stops the background thread
+
+        Further requests are refused."""
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._queue.put(_STOP)
+
+        self._thread.join()
+
+    def _run(self):
+        """Collects requests into batches until the queue is closed"""
+        stopped = False
+
+        while not stopped:
+            item = self._queue.get()
+            taken = 1
+            batch = []
+            stopped = item is _STOP
+
+            if item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                deadline = time.monotonic() + self._interval
+
+                while len(batch) < self._max_requests:
+                    try:
+                        item = self._queue.get(
+                            timeout=max(deadline - time.monotonic(), 0)
+                        )
+                    except queue.Empty:
+                        break
+
+                    taken += 1
+
+                    if item is _FLUSH or item is _STOP:
+                        stopped = item is _STOP
+                        break
+
+                    batch.append(item)
+
+            if len(batch) > 0:
+                self._send(batch)
+
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _send(self, batch):
+        """Sends requests as one batch and resolves their futures"""
+        try:
+            items = self._api.batch_request(
+                [request for request, future in batch], partial=True
+            )
+            errors = [
+                (
+                    None
+                    if item["error"] is None
+                    else Exception("Server error: {}".format(item["error"]))
+                )
+                for item in items
+            ]
+        except Exception as error:
+            items = [None] * len(batch)
+            errors = [error] * len(batch)
+
+        for (request, future), item, error in zip(batch, items, errors):
+            if error is None:
+                future.set_result(item["result"])
+                continue
+
+            future.set_exception(error)
+
+            if self._on_error is not None:
+                try:
+                    self._on_error(request, error)
+                except Exception:
+                    # A failing callback must not stop the background thread:
+                    pass
@@ -39,6 +39,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={"parquet": ["pyarrow"]},
     license="GNU General Public License v3",
     long_description="",
     include_package_data=True,
@@ -0,0 +1,61 @@
+"""Shared fixtures for the tests of idoit_api_client."""
+
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.standin import StandInDataset, StandInServer
+
+"""Configuration of API instances answered by the stand-in server"""
+CONFIG = {
+    Constants.URL: "https://demo.i-doit.com/src/jsonrpc.php",
+    Constants.KEY: "c1ia5q",
+    Constants.USERNAME: "admin",
+    Constants.PASSWORD: "admin",
+}
+
+
+class StandIn:
+    """API instance answered in-process by a stand-in server
+
+    Every call the server gets is kept in 'calls' as it was decoded, a dict for
+    requests and a list for batch requests."""
+
+    def __init__(self, config=None, dataset=None, before_call=None, **options):
+        """Constructor
+
+        :param config: (Optional) settings added to CONFIG
+        :param dataset: (Optional) StandInDataset; an empty one by default
+        :param before_call: (Optional) callable which gets every call before the
+            server answers it, e.g. to block or to fail it
+        :param options: Options of StandInServer"""
+        self.server = StandInServer(
+            dataset if dataset is not None else StandInDataset(), **options
+        )
+        self.dataset = self.server.get_dataset()
+        self.calls = []
+        handle = self.server.handle
+
+        def recording_handle(payload):
+            self.calls.append(payload)
+
+            if before_call is not None:
+                before_call(payload)
+
+            return handle(payload)
+
+        self.server.handle = recording_handle
+        self.api = self.attach(API({**CONFIG, **(config or {})}))
+
+    def attach(self, api):
+        """Lets the server answer another API instance as well
+
+        :param api: API instance
+
+        :return: API instance"""
+        return self.server.attach(api)
+
+
+@pytest.fixture
+def stand_in():
+    """Factory of API instances answered by a stand-in server, see StandIn"""
+    return StandIn
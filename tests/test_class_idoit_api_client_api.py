@@ -1,3 +1,4 @@
+import json
 import pytest
 from click.testing import CliRunner
 
@@ -90,3 +91,188 @@ class TestClassIdoitAPIClientAPI:
             assert len(result) != 0
 
     """TODO: Implement remaining tests from https://github.com/i-doit/api-client-php/blob/main/tests/Idoit/APIClient/APITest.php"""
+
+    def test_connection_pool_defaults(self):
+        """Test default connection pool settings."""
+        api = API(dict(self.config))
+        assert api._config[Constants.POOL_SIZE] == Constants.POOL_SIZE_DEFAULT
+        assert api._config[Constants.KEEP_ALIVE] is True
+        assert api._config[Constants.MAX_RETRIES] == Constants.MAX_RETRIES_DEFAULT
+
+    def test_connection_pool_is_configured(self):
+        """Test connect mounts a configured connection pool."""
+        config = dict(self.config)
+        config[Constants.POOL_SIZE] = 4
+        config[Constants.MAX_RETRIES] = 2
+        api = API(config)
+        api.connect()
+        adapter = api._resource.get_adapter(config[Constants.URL])
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+        api.disconnect()
+
+    def test_connection_pool_invalid_settings(self):
+        """Test invalid connection pool settings."""
+        for key, value in [
+            (Constants.POOL_SIZE, 0),
+            (Constants.KEEP_ALIVE, "yes"),
+            (Constants.MAX_RETRIES, -1),
+        ]:
+            config = dict(self.config)
+            config[key] = value
+            with pytest.raises(Exception):
+                API(config)
+
+    def _use_local_api(self, stand_in, config=None, **options):
+        """API answered by a stand-in server with 50 objects"""
+        local = stand_in(config, **options)
+        local.dataset.populate(50, 1, 1)
+        return local
+
+    def _generate_requests(self, amount):
+        return [
+            {"method": "cmdb.object.read", "params": {"id": object_id}}
+            for object_id in range(1, amount + 1)
+        ]
+
+    def test_batch_request_chunks_by_count(self, stand_in):
+        """Test batch_request splits by number of sub-requests."""
+        local = self._use_local_api(stand_in, {Constants.BATCH_MAX_REQUESTS: 10})
+        results = local.api.batch_request(self._generate_requests(25))
+        assert [len(batch) for batch in local.calls] == [10, 10, 5]
+        assert [result["id"] for result in results] == list(range(1, 26))
+
+    def test_batch_request_chunks_by_size(self, stand_in):
+        """Test batch_request splits by encoded size."""
+        local = self._use_local_api(stand_in, {Constants.BATCH_MAX_BYTES: 1024})
+        results = local.api.batch_request(self._generate_requests(50))
+        assert len(local.calls) > 1
+        for batch in local.calls:
+            assert len(json.dumps(batch)) <= 1024
+        assert [result["id"] for result in results] == list(range(1, 51))
+
+    def test_batch_request_chunks_in_parallel(self, stand_in):
+        """Test parallel chunks are stitched in original order."""
+        local = self._use_local_api(
+            stand_in,
+            {Constants.BATCH_MAX_REQUESTS: 3, Constants.BATCH_WORKERS: 4},
+        )
+        results = local.api.batch_request(self._generate_requests(40))
+        assert len(local.calls) == 14
+        assert [result["id"] for result in results] == list(range(1, 41))
+
+    def test_batch_request_correlates_by_id(self, stand_in):
+        """Test out-of-order batch responses are paired by identifier."""
+        local = self._use_local_api(stand_in, shuffle_batches=True)
+        results = local.api.batch_request(self._generate_requests(10))
+        assert [result["id"] for result in results] == list(range(1, 11))
+
+    def test_batch_request_reports_missing_and_duplicate_ids(self, stand_in):
+        """Test missing and duplicate responses are reported per sub-request."""
+        local = self._use_local_api(stand_in)
+
+        def drop_and_repeat(data, call_next):
+            responses = call_next(data)
+            # Drop the response for the first sub-request, repeat the last one:
+            return responses[1:] + responses[-1:]
+
+        local.api.add_middleware(drop_and_repeat)
+        with pytest.raises(Exception) as error:
+            local.api.batch_request(self._generate_requests(3))
+        assert "No response for sub-request" in str(error.value)
+        assert "Duplicate responses for sub-request" in str(error.value)
+
+    def test_batch_request_partial(self, stand_in):
+        """Test partial batch requests return one item per sub-request."""
+        local = self._use_local_api(stand_in)
+        requests = [
+            {
+                "method": "cmdb.category.read",
+                "params": {
+                    "objID": object_id if object_id % 2 else 1000,
+                    "category": "C__CATG__GLOBAL",
+                },
+            }
+            for object_id in range(1, 7)
+        ]
+        items = local.api.batch_request(requests, partial=True)
+        assert [item["code"] for item in items] == [None, -32099] * 3
+        assert items[0]["result"] == []
+        assert items[1]["method"] == "cmdb.category.read"
+        assert items[1]["params"] is requests[1]["params"]
+
+        failed = local.api.failed_requests(items)
+        assert [request["params"]["objID"] for request in failed] == [1000] * 3
+
+    def test_batch_request_partial_keeps_other_chunks(self, stand_in):
+        """Test a failed chunk does not discard results of other chunks."""
+
+        def reset_second_chunk(data):
+            if data[0]["params"]["id"] == 3:
+                raise Exception("Connection reset")
+
+        local = self._use_local_api(
+            stand_in,
+            {Constants.BATCH_MAX_REQUESTS: 2},
+            before_call=reset_second_chunk,
+        )
+        items = local.api.batch_request(self._generate_requests(6), partial=True)
+        assert [item["result"] is not None for item in items] == [
+            True,
+            True,
+            False,
+            False,
+            True,
+            True,
+        ]
+        assert items[2]["code"] == Constants.ERROR_FAILED_CHUNK
+
+    def test_middlewares_run_in_order(self, stand_in):
+        """Test middlewares wrap every call in the order they were added."""
+        api = self._use_local_api(stand_in).api
+        calls = []
+
+        def outer(data, call_next):
+            calls.append("outer")
+            response = call_next(data)
+            calls.append("outer done")
+            return response
+
+        def inner(data, call_next):
+            calls.append("inner")
+            data["params"]["id"] += 1
+            return call_next(data)
+
+        api.add_middleware(inner)
+        api.add_middleware(outer, 0)
+        assert api.get_middlewares() == [outer, inner]
+        assert api.request("cmdb.object.read", {"id": 1})["id"] == 2
+        assert calls == ["outer", "inner", "outer done"]
+
+        api.remove_middleware(outer)
+        api.remove_middleware(inner)
+        assert api.request("cmdb.object.read", {"id": 1})["id"] == 1
+        with pytest.raises(Exception):
+            api.remove_middleware(inner)
+
+    def test_middleware_short_circuits_batches(self, stand_in):
+        """Test a middleware sees batch envelopes and may answer them itself."""
+        local = self._use_local_api(stand_in, {Constants.BATCH_MAX_REQUESTS: 4})
+        api = local.api
+        seen = []
+
+        def cache(data, call_next):
+            seen.append(len(data))
+            if data[0]["params"]["id"] == 1:
+                return [
+                    {"result": {"cached": True}, "id": request["id"]}
+                    for request in data
+                ]
+            return call_next(data)
+
+        api.add_middleware(cache)
+        results = api.batch_request(self._generate_requests(6))
+        assert seen == [4, 2]
+        assert len(local.calls) == 1
+        assert results[0] == {"cached": True}
+        assert results[5]["id"] == 6
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+from idoit_api_client import Constants
+from idoit_api_client.asyncapi import AsyncAPI, AsyncCMDBCategory, AsyncCMDBObject
+from tests.conftest import CONFIG
+
+
+class TestClassIdoitAPIClientAsyncAPI:
+    """Test class idoit_api_client.asyncapi.AsyncAPI"""
+
+    config = {Constants.MAX_IN_FLIGHT: 4}
+
+    def _use_api(self, stand_in):
+        """AsyncAPI answered by a stand-in server which tracks concurrency"""
+        lock = threading.Lock()
+        state = {"current": 0, "max": 0}
+
+        def track(data):
+            with lock:
+                state["current"] += 1
+                state["max"] = max(state["max"], state["current"])
+            time.sleep(0.001)
+            with lock:
+                state["current"] -= 1
+
+        local = stand_in(before_call=track)
+        local.dataset.populate(500, 1, 1)
+        api = AsyncAPI({**CONFIG, **self.config})
+        local.attach(api.api)
+        return api, state
+
+    def test_constructor(self):
+        """Test constructor."""
+        api = AsyncAPI({**CONFIG, **self.config})
+        assert isinstance(api, AsyncAPI)
+
+    def test_gather_requests_is_bounded(self, stand_in):
+        """Test many gathered requests respect the in-flight limit."""
+        api, state = self._use_api(stand_in)
+
+        async def scenario():
+            category = AsyncCMDBCategory(api)
+            return await asyncio.gather(
+                *[
+                    category.read(object_id, "C__CATG__STAND_IN_1")
+                    for object_id in range(1, 501)
+                ]
+            )
+
+        results = asyncio.run(scenario())
+        assert len(results) == 500
+        assert [int(result[0]["objID"]) for result in results] == list(range(1, 501))
+        assert state["max"] <= 4
+
+    def test_batch_request(self, stand_in):
+        """Test batch_request."""
+        api, state = self._use_api(stand_in)
+
+        async def scenario():
+            return await api.batch_request(
+                [{"method": "cmdb.object.read", "params": {"id": 1}}]
+            )
+
+        results = asyncio.run(scenario())
+        assert results[0]["id"] == 1
+
+    def test_request_class_wrapper(self, stand_in):
+        """Test wrapped request classes expose coroutine functions."""
+        api, state = self._use_api(stand_in)
+        cmdb_object = AsyncCMDBObject(api)
+        assert asyncio.iscoroutinefunction(cmdb_object.read)
@@ -421,3 +421,123 @@ class TestClassIdoitAPIClientCMDBCategory(BaseTest):
         )
 
         assert isinstance(itself, CMDBCategory)
+
+    def _use_local_api(self, stand_in):
+        """API answered by a stand-in server with model and IP entries."""
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_category(
+            "C__CATG__MODEL", ["manufacturer", "title", "serial", "cpu_count"]
+        )
+        dataset.add_category("C__CATG__IP", ["hostname", "assigned_port"], True)
+        dataset.add_object_type(
+            "C__OBJTYPE__SERVER", "Server", ["C__CATG__MODEL", "C__CATG__IP"]
+        )
+        dataset.add_object("C__OBJTYPE__SERVER", "Host A")
+        dataset.add_object("C__OBJTYPE__SERVER", "Host B")
+        dataset.add_entry(
+            1,
+            "C__CATG__MODEL",
+            {
+                "manufacturer": {"id": "3", "title": "ACME", "const": None},
+                "title": {"id": "7", "title": "Box"},
+                "serial": "A1",
+                "cpu_count": "2",
+            },
+        )
+        dataset.add_entry(1, "C__CATG__IP", {"hostname": "a", "assigned_port": []})
+        dataset.add_entry(1, "C__CATG__IP", {"hostname": "b", "assigned_port": []})
+        return local.api, local.calls
+
+    def test_batch_apply(self, stand_in):
+        """Test only changed attributes of changed entries are saved."""
+        api, calls = self._use_local_api(stand_in)
+        summary = CMDBCategory(api).batch_apply(
+            [
+                {
+                    "object": 1,
+                    "category": "C__CATG__MODEL",
+                    "data": {
+                        "manufacturer": "ACME",
+                        "title": 7,
+                        "serial": "A2",
+                        "cpu_count": 2,
+                    },
+                },
+                {"object": 2, "category": "C__CATG__MODEL", "data": {"serial": "B1"}},
+                {
+                    "object": 1,
+                    "category": "C__CATG__IP",
+                    "entry": 3,
+                    "data": {"hostname": "b", "assigned_port": None},
+                },
+                {
+                    "object": 2,
+                    "category": "C__CATG__MODEL",
+                    "data": {"serial": "B2", "colour": "red"},
+                },
+                {"object": 1, "category": "C__CATG__IP", "data": {"hostname": "a"}},
+                {
+                    "object": 1,
+                    "category": "C__CATG__IP",
+                    "entry": 23,
+                    "data": {"hostname": "c"},
+                },
+            ]
+        )
+
+        assert [entry["data"] for entry in summary["changed"]] == [
+            {"serial": "A2"},
+            {"serial": "B1"},
+            {"hostname": "a"},
+        ]
+        assert [entry["category"] for entry in summary["unchanged"]] == ["C__CATG__IP"]
+        assert [entry["error"] for entry in summary["failed"]] == [
+            'No entry with identifier "23" found',
+            "Unknown attributes of C__CATG__MODEL: colour",
+        ]
+        assert calls[2]["params"]["filter"]["ids"] == [1, 2]
+        saves = [request["params"] for request in calls[-1]]
+        assert len(saves) == 4
+        assert saves[0]["entry"] == 1
+        assert "entry" not in saves[1]
+        assert saves[3] == {
+            "object": 1,
+            "category": "C__CATG__IP",
+            "data": {"hostname": "a"},
+            "apikey": "c1ia5q",
+        }
+        entries = CMDBCategory(api).batch_read(
+            [1, 2], ["C__CATG__IP", "C__CATG__MODEL"]
+        )
+        assert [entry["hostname"] for entry in entries[0]] == ["a", "b", "a"]
+        assert [entry["serial"] for entry in entries[1]] == ["A2"]
+        assert [entry["serial"] for entry in entries[3]] == ["B1"]
+
+    def test_diff(self):
+        """Test values are compared like i-doit returns them."""
+        cmdb_category = CMDBCategory(API(dict(self.config)))
+        entry = {
+            "type": {"id": "1", "title": "Server", "const": "C__TYPE"},
+            "ports": [{"id": "4", "title": "eth0"}, {"id": "5", "title": "eth1"}],
+            "amount": "1.50",
+            "description": "",
+        }
+        assert (
+            cmdb_category.diff(
+                entry,
+                {
+                    "type": "C__TYPE",
+                    "ports": [5, 4],
+                    "amount": 1.5,
+                    "description": None,
+                },
+            )
+            == {}
+        )
+        assert cmdb_category.diff(entry, {"ports": [4, 4]}) == {"ports": [4, 4]}
+        assert cmdb_category.diff(entry, {"ports": [4], "type": 2}) == {
+            "ports": [4],
+            "type": 2,
+        }
+        assert cmdb_category.diff(None, {"title": "New"}) == {"title": "New"}
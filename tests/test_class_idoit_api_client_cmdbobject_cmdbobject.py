@@ -297,3 +297,97 @@ class TestClassIdoitAPIClientCMDBObjectCMDBObject(BaseTest):
 
         assert isinstance(result, int)
         assert result > 0
+
+    def _use_local_api(self, stand_in):
+        """API answered by a stand-in server with a small CMDB."""
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_category("C__CATG__GLOBAL", ["title"])
+        dataset.add_category("C__CATG__RACK_VIEW", [])
+        dataset.add_category("C__CATG__CPU", ["title"], True)
+        dataset.add_category("C__CATS__SERVICE", ["title"])
+        dataset.add_object_type(
+            "C__OBJTYPE__SERVER",
+            "Server",
+            [
+                "C__CATG__GLOBAL",
+                "C__CATG__RACK_VIEW",
+                "C__CATG__CPU",
+                "C__CATS__SERVICE",
+            ],
+        )
+        dataset.add_object_type("C__OBJTYPE__CLIENT", "Client", ["C__CATG__GLOBAL"])
+        for type, title in (
+            ("C__OBJTYPE__SERVER", "Host A"),
+            ("C__OBJTYPE__SERVER", "Host B"),
+            ("C__OBJTYPE__SERVER", "Host B"),
+            ("C__OBJTYPE__CLIENT", "Host A"),
+        ):
+            object_id = dataset.add_object(type, title)
+            for const in ("C__CATG__GLOBAL", "C__CATG__CPU", "C__CATS__SERVICE"):
+                if type == "C__OBJTYPE__SERVER" or const == "C__CATG__GLOBAL":
+                    dataset.add_entry(object_id, const, {"title": const})
+        return local.api, local.calls
+
+    def test_load_many(self, stand_in):
+        """Test load_many loads several objects with three batch requests."""
+        api, calls = self._use_local_api(stand_in)
+        cmdb_object = CMDBObject(api)
+        loaded = cmdb_object.load_many([1, 2, 4])
+
+        assert len(calls) == 3
+        assert sorted(loaded) == [1, 2, 4]
+        server = loaded[1]
+        assert server["title"] == "Host A"
+        assert "entries" not in server["catg"][1]
+        for category in server["catg"][0:1] + server["catg"][2:] + server["cats"]:
+            assert category["entries"][0]["title"] == category["const"]
+            assert category["entries"][0]["objID"] == "1"
+        assert loaded[2]["catg"][0]["entries"][0]["objID"] == "2"
+        assert loaded[4]["catg"][0]["entries"][0]["objID"] == "4"
+        assert len(loaded[4]["catg"]) == 1
+
+    def test_load_skips_virtual_categories(self, stand_in):
+        """Test load matches entries to categories after a virtual category."""
+        api, calls = self._use_local_api(stand_in)
+        loaded = CMDBObject(api).load(1)
+
+        assert len(calls) == 3
+        assert len(calls[2]) == 3
+        assert "entries" not in loaded["catg"][1]
+        for category in loaded["catg"][0:1] + loaded["catg"][2:] + loaded["cats"]:
+            assert category["entries"][0]["title"] == category["const"]
+        assert loaded == CMDBObject(api).load_many([1])[1]
+
+    def test_upsert_many(self, stand_in):
+        """Test upsert_many resolves and creates objects with two batch requests."""
+        api, calls = self._use_local_api(stand_in)
+        result = CMDBObject(api).upsert_many(
+            [
+                ("C__OBJTYPE__SERVER", "Host C", {"purpose": "Test"}),
+                ("C__OBJTYPE__SERVER", "Host A"),
+                ("C__OBJTYPE__NOPE", "Host D"),
+                ("C__OBJTYPE__CLIENT", "Host A"),
+                ("C__OBJTYPE__SERVER", "Host B"),
+                ("C__OBJTYPE__CLIENT", "Host C"),
+                ("C__OBJTYPE__SERVER", "Host C"),
+            ]
+        )
+
+        assert result["ids"] == [5, 1, None, 4, None, 6, 5]
+        assert result["ambiguous"] == [
+            {"type": "C__OBJTYPE__SERVER", "title": "Host B", "ids": [2, 3]}
+        ]
+        assert [
+            (failed["type"], failed["title"], failed["error"]["message"])
+            for failed in result["failed"]
+        ] == [("C__OBJTYPE__NOPE", "Host D", "Object type C__OBJTYPE__NOPE not found")]
+        assert len(calls) == 2
+        assert len(calls[0]) == 6
+        assert calls[1][0]["params"]["purpose"] == "Test"
+        assert CMDBObjects(api).read({"title": "Host C"})[1]["type"] == "2"
+        assert CMDBObject(api).upsert_many([]) == {
+            "ids": [],
+            "ambiguous": [],
+            "failed": [],
+        }
@@ -59,3 +59,74 @@ class TestClassIdoitAPIClientCMDBObjectsCMDBObjects(BaseTest):
 
         for object in objects:
             self._is_object(object)
+
+    def _use_local_api(self, stand_in, object_ids):
+        """API answered by a stand-in server which has the given objects."""
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_object_type("C__OBJTYPE__SERVER", "Server")
+        for object_id in range(1, max(object_ids) + 1):
+            dataset.add_object("C__OBJTYPE__SERVER", f"Server {object_id}")
+        for object_id in set(range(1, max(object_ids) + 1)) - set(object_ids):
+            dataset.call("cmdb.object.purge", {"object": object_id})
+        return local.api, local.calls, dataset
+
+    def test_iter_objects(self, stand_in):
+        """Test iter_objects pages through all objects."""
+        api, calls, dataset = self._use_local_api(stand_in, range(1, 26))
+        cmdb_objects = CMDBObjects(api)
+        objects = list(cmdb_objects.iter_objects(page_size=10))
+        assert [object["id"] for object in objects] == [str(i) for i in range(1, 26)]
+        assert [call["params"]["limit"] for call in calls] == ["0,10", "10,10", "20,10"]
+        assert calls[0]["params"]["order_by"] == "isys_obj__id"
+
+    def test_iter_objects_stops_early(self, stand_in):
+        """Test iter_objects only fetches what is consumed plus one page."""
+        api, calls, dataset = self._use_local_api(stand_in, range(1, 101))
+        cmdb_objects = CMDBObjects(api)
+        iterator = cmdb_objects.iter_objects(page_size=10)
+        first = [next(iterator) for _ in range(5)]
+        iterator.close()
+        assert first[0]["id"] == "1"
+        assert len(calls) <= 2
+
+    def test_iter_objects_by_id(self, stand_in):
+        """Test keyset pagination over sparse identifiers."""
+        object_ids = list(range(1, 40)) + list(range(1000, 1100, 7)) + [50000]
+        api, calls, dataset = self._use_local_api(stand_in, object_ids)
+        cmdb_objects = CMDBObjects(api)
+        result = [
+            int(object["id"])
+            for object in cmdb_objects.iter_objects_by_id(page_size=10)
+        ]
+        assert result == object_ids
+        calls.clear()
+        result = [
+            int(object["id"])
+            for object in cmdb_objects.iter_objects_by_id(page_size=10000)
+        ]
+        assert result == object_ids
+        for call in calls:
+            assert (
+                len(call["params"].get("filter", {}).get("ids", []))
+                <= CMDBObjects.MAX_ID_WINDOW
+            )
+
+    def test_iter_objects_by_id_resumes_and_sees_new_objects(self, stand_in):
+        """Test keyset pagination resumes after an id and picks up new objects."""
+        api, calls, dataset = self._use_local_api(stand_in, range(1, 31))
+        cmdb_objects = CMDBObjects(api)
+        seen = []
+        for object in cmdb_objects.iter_objects_by_id(page_size=10, after_id=12):
+            seen.append(int(object["id"]))
+            if object["id"] == "20":
+                dataset.add_object("C__OBJTYPE__SERVER", "New")
+        assert seen == list(range(13, 32))
+
+    def test_iter_objects_by_id_with_ids_filter(self, stand_in):
+        """Test keyset pagination over given identifiers."""
+        api, calls, dataset = self._use_local_api(stand_in, range(1, 31))
+        cmdb_objects = CMDBObjects(api)
+        result = cmdb_objects.iter_objects_by_id({"ids": [30, 3, 17, 5]}, page_size=2)
+        assert [int(object["id"]) for object in result] == [3, 5, 17, 30]
+        assert len(calls) == 2
@@ -0,0 +1,90 @@
+import inspect
+import threading
+
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategory import CMDBCategory
+
+
+class TestClassIdoitAPIClientCoalescer:
+    """Test class idoit_api_client.coalescer.Coalescer"""
+
+    def _use_api(self, stand_in, window, max_requests, config=None):
+        local = stand_in(
+            {
+                Constants.COALESCE_WINDOW: window,
+                Constants.COALESCE_MAX_REQUESTS: max_requests,
+                **(config or {}),
+            }
+        )
+        local.dataset.populate(8, 1, 1)
+        return local.api, local.calls
+
+    def _object_ids(self, entries):
+        return [int(entry["objID"]) for entry in entries]
+
+    def test_concurrent_requests_are_merged(self, stand_in):
+        """Test requests from several threads share one batch."""
+        api, batches = self._use_api(stand_in, window=1000, max_requests=8)
+        cmdb_category = CMDBCategory(api)
+        results = {}
+
+        def read(object_id):
+            results[object_id] = self._object_ids(
+                cmdb_category.read(object_id, "C__CATG__STAND_IN_1")
+            )
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(batches) == 1
+        assert results == {i: [i] for i in range(1, 9)}
+
+    def test_window_flushes_queue(self, stand_in):
+        """Test the window sends a queue which is not full."""
+        api, batches = self._use_api(stand_in, window=200, max_requests=100)
+        futures = [
+            api.submit(
+                "cmdb.category.read", {"objID": i, "category": "C__CATG__STAND_IN_1"}
+            )
+            for i in range(1, 4)
+        ]
+        assert [self._object_ids(future.result(timeout=5)) for future in futures] == [
+            [1],
+            [2],
+            [3],
+        ]
+        assert len(batches) == 1
+
+    def test_errors_are_per_request(self, stand_in):
+        """Test a failed request only fails its own future."""
+        api, batches = self._use_api(stand_in, window=1000, max_requests=2)
+        bad = api.submit(
+            "cmdb.category.read", {"objID": 0, "category": "C__CATG__STAND_IN_1"}
+        )
+        good = api.submit(
+            "cmdb.category.read", {"objID": 1, "category": "C__CATG__STAND_IN_1"}
+        )
+        assert self._object_ids(good.result(timeout=5)) == [1]
+        with pytest.raises(Exception):
+            bad.result(timeout=5)
+
+    def test_params_are_copied_and_defaulted(self, stand_in):
+        """Test coalesced requests leave params alone and keep their language."""
+        default = inspect.unwrap(API.request).__defaults__
+        api, batches = self._use_api(
+            stand_in, window=1, max_requests=1, config={Constants.LANGUAGE: "en"}
+        )
+        params = {"category": "C__CATG__STAND_IN_1", "language": "de"}
+
+        api.request("cmdb.category_info", params)
+        api.request("cmdb.object_types.read")
+
+        assert params == {"category": "C__CATG__STAND_IN_1", "language": "de"}
+        assert inspect.unwrap(API.request).__defaults__ == default == ({},)
+        assert [batch[0]["params"]["language"] for batch in batches] == ["de", "en"]
+        assert [batch[0]["params"]["apikey"] for batch in batches] == ["c1ia5q"] * 2
@@ -0,0 +1,117 @@
+import csv
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from idoit_api_client import API, Constants
+from idoit_api_client import cli
+from idoit_api_client.exporter import Exporter
+from tests.conftest import CONFIG
+
+
+class TestClassIdoitAPIClientExporter:
+    """Test class idoit_api_client.exporter.Exporter"""
+
+    def _use_api(self, stand_in, amount):
+        """API answered by a stand-in server; odd objects are clients."""
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_category("C__CATG__GLOBAL", ["title"])
+        dataset.add_category("C__CATG__RACK_VIEW", [])
+        dataset.add_category("C__CATS__SERVICE", ["title"])
+        dataset.add_object_type("C__OBJTYPE__CLIENT", "Client", ["C__CATG__GLOBAL"])
+        dataset.add_object_type(
+            "C__OBJTYPE__SERVER",
+            "Server",
+            ["C__CATG__GLOBAL", "C__CATG__RACK_VIEW", "C__CATS__SERVICE"],
+        )
+        for object_id in range(1, amount + 1):
+            object_type = "C__OBJTYPE__" + ("CLIENT" if object_id % 2 else "SERVER")
+            dataset.add_object(object_type, f"Object {object_id}")
+            dataset.add_entry(object_id, "C__CATG__GLOBAL", {"title": "Global"})
+        return local
+
+    def test_export_jsonl(self, stand_in, tmp_path):
+        """Test objects are written page by page with their entries."""
+        local = self._use_api(stand_in, 25)
+        api, calls = local.api, local.calls
+        path = str(tmp_path / "objects.jsonl")
+        counts = []
+
+        count = Exporter(api, {}, ["C__CATG__GLOBAL"], 10).export(
+            path, None, counts.append
+        )
+
+        assert count == 25
+        assert counts == [10, 20, 25]
+        with open(path) as handle:
+            objects = [json.loads(line) for line in handle]
+        assert [int(object["id"]) for object in objects] == list(range(1, 26))
+        assert objects[3]["categories"] == {
+            "C__CATG__GLOBAL": [{"id": "4", "objID": "4", "title": "Global"}]
+        }
+        batches = [call for call in calls if isinstance(call, list)]
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+
+    def test_export_csv_with_all_categories(self, stand_in, tmp_path):
+        """Test all assigned categories except virtual ones are exported."""
+        local = self._use_api(stand_in, 4)
+        api, calls = local.api, local.calls
+        path = str(tmp_path / "objects.csv")
+
+        assert Exporter(api, {}, True).export(path) == 4
+
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        assert rows[0]["title"] == "Object 1"
+        assert sorted(json.loads(rows[0]["categories"])) == ["C__CATG__GLOBAL"]
+        assert sorted(json.loads(rows[1]["categories"])) == [
+            "C__CATG__GLOBAL",
+            "C__CATS__SERVICE",
+        ]
+        methods = [call["method"] for call in calls if not isinstance(call, list)]
+        assert methods.count("cmdb.object_type_categories.read") == 2
+
+    def test_export_parquet(self, stand_in, tmp_path):
+        """Test Parquet files are written if pyarrow is installed."""
+        api = self._use_api(stand_in, 3).api
+        path = str(tmp_path / "objects.parquet")
+
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            with pytest.raises(Exception, match="pyarrow"):
+                Exporter(api).export(path)
+            return
+
+        assert Exporter(api, {}, ["C__CATG__GLOBAL"]).export(path) == 3
+        table = pyarrow.parquet.read_table(path)
+        assert table.column("title").to_pylist() == [
+            "Object 1",
+            "Object 2",
+            "Object 3",
+        ]
+
+    def test_command(self, stand_in, tmp_path, monkeypatch):
+        """Test the export command of the console script."""
+        local = self._use_api(stand_in, 3)
+        monkeypatch.setattr(cli, "API", lambda config: local.attach(API(config)))
+        path = str(tmp_path / "objects.jsonl")
+
+        result = CliRunner().invoke(
+            cli.main,
+            [
+                "export",
+                "--url",
+                CONFIG[Constants.URL],
+                "--key",
+                CONFIG[Constants.KEY],
+                "--category",
+                "C__CATG__GLOBAL",
+                path,
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.output.splitlines()[-1]) == {"objects": 3}
@@ -0,0 +1,148 @@
+import json
+
+from click.testing import CliRunner
+
+from idoit_api_client import API, Constants
+from idoit_api_client import cli
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.importer import Importer, read_rows
+from tests.conftest import CONFIG
+
+
+class TestClassIdoitAPIClientImporter:
+    """Test class idoit_api_client.importer.Importer"""
+
+    mapping = {
+        "type": "C__OBJTYPE__SERVER",
+        "type_column": "type",
+        "title": "hostname",
+        "attributes": {"purpose": "purpose"},
+        "categories": {
+            "C__CATG__IP": {"hostname": "hostname", "ipv4_address": "ip"},
+            "C__CATG__MODEL": {"serial": "serial"},
+        },
+    }
+
+    def _use_api(self, stand_in):
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_category("C__CATG__IP", ["hostname", "ipv4_address"], True)
+        dataset.add_category("C__CATG__MODEL", ["serial"])
+        for const, title in (
+            ("C__OBJTYPE__SERVER", "Server"),
+            ("C__OBJTYPE__CLIENT", "Client"),
+        ):
+            dataset.add_object_type(const, title, ["C__CATG__IP", "C__CATG__MODEL"])
+        return local
+
+    def _write_rows(self, path, rows):
+        with open(path, "w") as handle:
+            for row in rows:
+                handle.write(json.dumps(row) + "\n")
+
+    def test_read_rows(self, tmp_path):
+        """Test rows are streamed from CSV and JSONL files."""
+        csv_path = tmp_path / "hosts.csv"
+        csv_path.write_text("hostname,ip\nhost1,10.0.0.1\nhost2,\n")
+        assert list(read_rows(str(csv_path))) == [
+            {"hostname": "host1", "ip": "10.0.0.1"},
+            {"hostname": "host2", "ip": ""},
+        ]
+
+        jsonl_path = tmp_path / "hosts.jsonl"
+        self._write_rows(jsonl_path, [{"hostname": "host1"}, {"hostname": "host2"}])
+        assert [row["hostname"] for row in read_rows(str(jsonl_path))] == [
+            "host1",
+            "host2",
+        ]
+
+    def test_run(self, stand_in):
+        """Test objects and entries are sent in chunks."""
+        local = self._use_api(stand_in)
+        rows = [
+            {"hostname": f"host{index}", "ip": f"10.0.0.{index}", "serial": ""}
+            for index in range(1, 9)
+        ]
+        rows[2]["type"] = "C__OBJTYPE__CLIENT"
+        rows[3]["type"] = "C__OBJTYPE__ROUTER"
+        rows[4]["hostname"] = ""
+        rows[5]["serial"] = "broken"
+        rows[6]["purpose"] = "Test"
+        rows[7]["hostname"] = "noid"
+        summaries = []
+        errors = []
+
+        def misbehave(data, call_next):
+            """Fails broken serials and drops the identifier of created noids"""
+            responses = call_next(data)
+            for request, response in zip(data, responses):
+                params = request["params"]
+                if params.get("title") == "noid":
+                    response["result"] = {"success": True}
+                elif params.get("data", {}).get("serial") == "broken":
+                    del response["result"]
+                    response["error"] = {"code": -32099, "message": "Bad serial"}
+            return responses
+
+        local.api.add_middleware(misbehave)
+        summary = Importer(local.api, self.mapping, chunk_size=3, workers=2).run(
+            iter(rows), summaries.append, lambda *error: errors.append(error)
+        )
+
+        assert summary == {"rows": 8, "objects": 5, "entries": 5, "failed": 4}
+        assert [summary["rows"] for summary in summaries] == [3, 6, 8]
+        assert [(number, error) for number, row, error in errors] == [
+            (4, "Object type C__OBJTYPE__ROUTER not found"),
+            (5, "Title is missing"),
+            (6, "Bad serial"),
+            (8, "Bad result: {'success': True}"),
+        ]
+        creates = [
+            request["params"]
+            for call in local.calls
+            for request in call
+            if request["method"] == "cmdb.object.create"
+        ]
+        assert [params["purpose"] for params in creates if "purpose" in params] == [
+            "Test"
+        ]
+        assert max(len(call) for call in local.calls) <= 3
+
+        local.api.remove_middleware(misbehave)
+        objects = {
+            object["title"]: object["type_title"]
+            for object in CMDBObjects(local.api).read()
+        }
+        assert objects["host2"] == "Server"
+        assert objects["host3"] == "Client"
+
+    def test_command(self, stand_in, tmp_path, monkeypatch):
+        """Test the import command of the console script."""
+        local = self._use_api(stand_in)
+        monkeypatch.setattr(cli, "API", lambda config: local.attach(API(config)))
+        mapping_path = tmp_path / "mapping.json"
+        mapping_path.write_text(json.dumps(self.mapping))
+        rows_path = tmp_path / "hosts.jsonl"
+        self._write_rows(rows_path, [{"hostname": "host1", "ip": "10.0.0.1"}])
+
+        result = CliRunner().invoke(
+            cli.main,
+            [
+                "import",
+                "--url",
+                CONFIG[Constants.URL],
+                "--key",
+                CONFIG[Constants.KEY],
+                "--mapping",
+                str(mapping_path),
+                str(rows_path),
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(result.output.splitlines()[-1]) == {
+            "rows": 1,
+            "objects": 1,
+            "entries": 1,
+            "failed": 0,
+        }
@@ -0,0 +1,102 @@
+import copy
+import time
+
+from idoit_api_client import Constants
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
+from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+from idoit_api_client.metadatacache import MetadataCache
+
+
+class TestClassIdoitAPIClientMetadataCache:
+    """Test class idoit_api_client.metadatacache.MetadataCache"""
+
+    def _use_api(self, stand_in, **settings):
+        local = stand_in(
+            {
+                Constants.METADATA_CACHE: {
+                    Constants.METADATA_CACHE_ACTIVE: True,
+                    **settings,
+                }
+            }
+        )
+        local.dataset.populate(1, 5, 1)
+        return local.api, local.calls
+
+    def test_request_is_cached(self, stand_in):
+        """Test metadata requests are sent once."""
+        api, calls = self._use_api(stand_in)
+        cmdb_object_types = CMDBObjectTypes(api)
+        first = cmdb_object_types.read()
+        second = cmdb_object_types.read()
+        assert first == second
+        assert len(calls) == 1
+
+    def test_other_requests_are_not_cached(self, stand_in):
+        """Test requests for data are always sent."""
+        api, calls = self._use_api(stand_in)
+        api.request("cmdb.category.read", {"objID": 1, "category": "C__CATG__GLOBAL"})
+        api.request("cmdb.category.read", {"objID": 1, "category": "C__CATG__GLOBAL"})
+        assert len(calls) == 2
+
+    def test_batch_request_sends_misses_only(self, stand_in):
+        """Test cached sub-requests are left out of batch requests."""
+        api, calls = self._use_api(stand_in)
+        cmdb_category_info = CMDBCategoryInfo(api)
+        cmdb_category_info.read("C__CATG__GLOBAL")
+        categories = ["C__CATG__GLOBAL", "C__CATG__STAND_IN_1"]
+        results = cmdb_category_info.batch_read(categories)
+        assert len(calls) == 2
+        assert len(calls[1]) == 1
+        assert [sorted(result) for result in results] == [
+            ["description", "purpose", "sysid", "title"],
+            ["description", "serial", "title", "value"],
+        ]
+        cmdb_category_info.batch_read(categories)
+        assert len(calls) == 2
+
+    def test_ttl_and_invalidation(self, stand_in):
+        """Test entries expire and may be invalidated."""
+        api, calls = self._use_api(stand_in, **{Constants.METADATA_CACHE_TTL: 0.05})
+        cmdb_object_type_categories = CMDBObjectTypeCategories(api)
+        cmdb_object_type_categories.read_by_id(5)
+        time.sleep(0.1)
+        cmdb_object_type_categories.read_by_id(5)
+        assert len(calls) == 2
+        api.get_metadata_cache().invalidate()
+        cmdb_object_type_categories.read_by_id(5)
+        assert len(calls) == 3
+
+    def test_persistence(self, stand_in, tmp_path):
+        """Test the cache survives a new API instance."""
+        settings = {Constants.METADATA_CACHE_PATH: str(tmp_path)}
+        api, calls = self._use_api(stand_in, **settings)
+        CMDBObjectTypes(api).read()
+        assert len(list(tmp_path.iterdir())) == 0
+        api.flush()
+        assert len(list(tmp_path.iterdir())) == 1
+
+        api, calls = self._use_api(stand_in, **settings)
+        CMDBObjectTypes(api).read()
+        assert len(calls) == 0
+
+    def test_language_and_copies(self, stand_in):
+        """Test languages are cached apart and results cannot be changed."""
+        api, calls = self._use_api(stand_in)
+        first = api.request("cmdb.category_info", {"category": "C__CATG__GLOBAL"})
+        expected = copy.deepcopy(first)
+        first.clear()
+        api.request(
+            "cmdb.category_info", {"category": "C__CATG__GLOBAL", "language": "de"}
+        )
+        second = api.request("cmdb.category_info", {"category": "C__CATG__GLOBAL"})
+        assert len(calls) == 2
+        assert calls[1]["params"]["language"] == "de"
+        assert second == expected
+
+    def test_file_depends_on_url_and_language(self, tmp_path):
+        """Test instances do not share files."""
+        MetadataCache("https://a/", "en", path=str(tmp_path)).save()
+        MetadataCache("https://a/", "de", path=str(tmp_path)).save()
+        MetadataCache("https://b/", "en", path=str(tmp_path)).save()
+        assert len(list(tmp_path.iterdir())) == 3
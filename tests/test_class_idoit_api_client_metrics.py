@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.metrics import Histogram, MetricsRegistry
+from idoit_api_client.standin import StandInDataset, StandInServer
+
+"""Error page of a proxy in front of i-doit"""
+BAD_GATEWAY = b"<html><body><h1>502 Bad Gateway</h1></body></html>"
+
+
+class _Response:
+    def __init__(self, body):
+        self.content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _Session:
+    """Session answering cmdb.object.read, failing for other methods and with an
+    error page for cmdb.object.delete"""
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        payload = json.loads(data)
+        if isinstance(payload, list):
+            return _Response(
+                [
+                    (
+                        {"jsonrpc": "2.0", "result": {}, "id": request["id"]}
+                        if request["params"]["id"] > 0
+                        else {
+                            "jsonrpc": "2.0",
+                            "error": {"code": -32099, "message": "Bad"},
+                            "id": request["id"],
+                        }
+                    )
+                    for request in payload
+                ]
+            )
+        if payload["method"] == "cmdb.object.delete":
+            return _Response(BAD_GATEWAY)
+        if payload["method"] != "cmdb.object.read":
+            raise ConnectionError("Connection refused")
+        return _Response({"jsonrpc": "2.0", "result": {}, "id": payload["id"]})
+
+
+class TestClassIdoitAPIClientMetrics:
+    """Test class idoit_api_client.metrics.MetricsRegistry"""
+
+    config = {
+        Constants.URL: "https://demo.i-doit.com/src/jsonrpc.php",
+        Constants.KEY: "c1ia5q",
+        Constants.METRICS: True,
+    }
+
+    def _use_api(self):
+        api = API(dict(self.config))
+        api._resource = _Session()
+        return api
+
+    def test_records_calls(self):
+        """Test single requests, batches and failed calls are recorded."""
+        api = self._use_api()
+        api.request("cmdb.object.read", {"id": 1})
+        api.request("cmdb.object.read", {"id": 2})
+        with pytest.raises(ConnectionError):
+            api.request("cmdb.category.read", {"objID": 1})
+        api.batch_request(
+            [
+                {"method": "cmdb.object.read", "params": {"id": object_id}}
+                for object_id in range(3)
+            ],
+            partial=True,
+        )
+
+        metrics = api.get_metrics().to_dict()
+        read = metrics["methods"]["cmdb.object.read"]
+        assert read["count"] == 5
+        assert read["errors"] == 1
+        assert read["latency"]["count"] == 2
+        assert read["request_bytes"] > 0
+        assert read["response_bytes"] == 2 * len(
+            json.dumps({"jsonrpc": "2.0", "result": {}, "id": 1})
+        )
+        assert read["latency"]["p50"] <= read["latency"]["p99"]
+        assert metrics["methods"]["cmdb.category.read"]["errors"] == 1
+        with pytest.raises(ValueError):
+            api.request("cmdb.object.delete", {"id": 1})
+        delete = api.get_metrics().to_dict()["methods"]["cmdb.object.delete"]
+        assert delete["errors"] == 1
+        assert delete["latency"]["count"] == 1
+        assert delete["response_bytes"] == len(BAD_GATEWAY)
+        assert metrics["batches"]["count"] == 1
+        assert metrics["batches"]["errors"] == 1
+        assert metrics["batches"]["size"]["p50"] == 3
+
+        api.get_metrics().reset()
+        assert api.get_metrics().to_dict()["methods"] == {}
+
+    def test_prometheus(self):
+        """Test the Prometheus text format."""
+        server = StandInServer(StandInDataset().populate(3, 1, 1))
+        api = server.attach(API(dict(self.config)))
+        api.request("cmdb.object.read", {"id": 1})
+        api.batch_request(
+            [{"method": "cmdb.category.read", "params": {"objID": 1}}] * 2,
+            partial=True,
+        )
+
+        text = api.get_metrics().to_prometheus()
+        lines = text.splitlines()
+        assert 'idoit_api_client_requests_total{method="cmdb.object.read"} 1' in lines
+        assert (
+            'idoit_api_client_request_errors_total{method="cmdb.category.read"} 2'
+            in lines
+        )
+        assert "idoit_api_client_batches_total 1" in lines
+        assert (
+            'idoit_api_client_request_duration_seconds_count{method="cmdb.object.read"}'
+            " 1" in lines
+        )
+        assert 'method="cmdb.category.read",le=' not in text
+        assert 'idoit_api_client_batch_size_bucket{le="5"} 1' in lines
+        assert "# TYPE idoit_api_client_batch_duration_seconds histogram" in lines
+
+    def test_histogram(self):
+        """Test quantiles are interpolated within buckets."""
+        histogram = Histogram((1, 10, 100))
+        assert histogram.quantile(0.5) is None
+        for value in (2, 3, 4, 5, 50, 200):
+            histogram.observe(value)
+        assert histogram.quantile(0.5) == pytest.approx(7.75)
+        assert histogram.quantile(0.99) == 200
+        assert histogram.get_buckets() == [(1, 0), (10, 4), (100, 5), ("+Inf", 6)]
+
+    def test_settings(self):
+        """Test metrics are off by default and may be shared."""
+        config = dict(self.config)
+        del config[Constants.METRICS]
+        api = API(config)
+        assert api.get_metrics() is None
+        registry = MetricsRegistry()
+        api.set_metrics(registry)
+        assert api.get_metrics() is registry
+        with pytest.raises(Exception):
+            API({**self.config, Constants.METRICS: "yes"})
@@ -0,0 +1,118 @@
+import pytest
+
+from idoit_api_client.mirror import Mirror
+from idoit_api_client.query import QueryEngine
+
+
+class TestClassIdoitAPIClientMirror:
+    """Test class idoit_api_client.mirror.Mirror"""
+
+    def _use_local_api(self, stand_in, amount):
+        """API answered by a stand-in server; even objects are clients."""
+        local = stand_in()
+        dataset = local.dataset
+        dataset.add_category("C__CATG__GLOBAL", ["title"])
+        dataset.add_category("C__CATG__IP", ["hostname"], True)
+        for const, title in (
+            ("C__OBJTYPE__SERVER", "Server"),
+            ("C__OBJTYPE__CLIENT", "Client"),
+        ):
+            dataset.add_object_type(const, title, ["C__CATG__GLOBAL", "C__CATG__IP"])
+        for number in range(1, amount + 1):
+            self._add_object(dataset, number)
+        return local
+
+    def _add_object(self, dataset, number):
+        object_type = "C__OBJTYPE__" + ("SERVER" if number % 2 else "CLIENT")
+        object_id = dataset.add_object(object_type, f"Server {number}")
+        dataset.add_entry(object_id, "C__CATG__GLOBAL", {"title": "Global"})
+        dataset.add_entry(object_id, "C__CATG__IP", {"hostname": "a"})
+        dataset.add_entry(object_id, "C__CATG__IP", {"hostname": "b"})
+        return object_id
+
+    def _read(self, api, object_id):
+        """Object with its category entries as the server lists it"""
+        return api.request(
+            "cmdb.objects.read", {"filter": {"ids": [object_id]}, "categories": True}
+        )[0]
+
+    def test_full_load(self, stand_in):
+        """Test the first sync loads objects and category entries."""
+        api = self._use_local_api(stand_in, 25).api
+        mirror = Mirror(api, ":memory:", page_size=10)
+        assert mirror.last_sync() is None
+        assert mirror.sync() == {"created": 25, "updated": 0, "deleted": 0}
+        assert mirror.count() == 25
+        assert mirror.last_sync() is not None
+
+        object = self._read(api, 7)
+        categories = object.pop("categories")
+        assert mirror.read(7) == object
+        assert mirror.read(99) is None
+        assert [object["id"] for object in mirror.read_by_type(2)][:2] == ["2", "4"]
+        assert mirror.read_by_title("Server 7") == [object]
+        entries = mirror.read_category(7, "C__CATG__IP")
+        assert [entry["hostname"] for entry in entries] == ["a", "b"]
+        assert mirror.read_category_objects("C__CATG__IP") == list(range(1, 26))
+        assert mirror.read_all(7) == {**object, "categories": categories}
+
+    def test_incremental_sync(self, stand_in):
+        """Test later syncs only fetch changed objects."""
+        local = self._use_local_api(stand_in, 25)
+        api, calls, dataset = local.api, local.calls, local.dataset
+        mirror = Mirror(api, ":memory:", page_size=10)
+        mirror.sync()
+
+        dataset.call("cmdb.object.update", {"id": 4, "title": "Renamed"})
+        dataset.call("cmdb.object.purge", {"object": 9})
+        object_id = self._add_object(dataset, 26)
+        calls.clear()
+
+        assert mirror.sync() == {"created": 1, "updated": 1, "deleted": 1}
+        assert mirror.count() == 25
+        assert mirror.read(4)["title"] == "Renamed"
+        assert mirror.read(9) is None
+        assert mirror.read_category(9, "C__CATG__IP") == []
+        assert len(mirror.read_category(object_id, "C__CATG__IP")) == 2
+
+        fetched = [call for call in calls if call["params"].get("categories")]
+        assert len(fetched) == 1
+        assert sorted(fetched[0]["params"]["filter"]["ids"]) == [4, object_id]
+
+    def test_persistence(self, stand_in, tmp_path):
+        """Test a mirror file is reused by later instances."""
+        path = str(tmp_path / "mirror.sqlite")
+        api = self._use_local_api(stand_in, 5).api
+        with Mirror(api, path) as mirror:
+            mirror.sync()
+
+        with Mirror(api, path) as mirror:
+            assert mirror.count() == 5
+            assert mirror.sync() == {"created": 0, "updated": 0, "deleted": 0}
+
+    def test_failed_full_load(self, stand_in):
+        """Test a reload which fails halfway leaves the mirror unsynced."""
+        api = self._use_local_api(stand_in, 50).api
+        mirror = Mirror(api, ":memory:", page_size=10)
+        mirror.sync()
+        engine = QueryEngine(mirror, api)
+        pages = []
+
+        def fail_second_page(data, call_next):
+            if data["params"].get("categories"):
+                pages.append(data)
+                if len(pages) > 1:
+                    raise Exception("Connection reset")
+            return call_next(data)
+
+        api.add_middleware(fail_second_page)
+        with pytest.raises(Exception, match="Connection reset"):
+            mirror.full_load()
+        assert mirror.count() == 10
+        assert mirror.last_sync() is None
+        assert not engine.is_ready()
+
+        api.remove_middleware(fail_second_page)
+        assert mirror.sync() == {"created": 50, "updated": 0, "deleted": 0}
+        assert mirror.count() == 50
+        assert engine.is_ready()
@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from idoit_api_client import Constants
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.mirror import Mirror
+from idoit_api_client.query import QueryEngine, bypass
+
+
+class TestClassIdoitAPIClientQuery:
+    """Test class idoit_api_client.query.QueryEngine"""
+
+    def _use_local_api(self, stand_in, config=None, dataset=None):
+        """API answered by a stand-in server with a small CMDB."""
+        local = stand_in(config, dataset)
+        if dataset is not None:
+            return local
+        dataset = local.dataset
+        dataset.add_category("C__CATG__LOCATION", ["parent"])
+        dataset.add_category("C__CATS__PERSON", ["first_name", "last_name", "mail"])
+        dataset.add_object_type("C__OBJTYPE__SERVER", "Server", ["C__CATG__LOCATION"])
+        dataset.add_object_type(
+            "C__OBJTYPE__PERSON", "Persons", ["C__CATS__PERSON"], "Contact"
+        )
+        for object_id in range(1, 11):
+            dataset.add_object("C__OBJTYPE__SERVER", f"Server {object_id % 4}")
+            dataset.add_entry(
+                object_id,
+                "C__CATG__LOCATION",
+                {"parent": {"id": "100" if object_id < 4 else "200"}},
+            )
+        for first_name, last_name in (("Anne", "Admin"), ("Bert", "Admin")):
+            object_id = dataset.add_object(
+                "C__OBJTYPE__PERSON", f"{first_name} {last_name}"
+            )
+            dataset.add_entry(
+                object_id,
+                "C__CATS__PERSON",
+                {
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "mail": f"{first_name.lower()}@example.com",
+                },
+            )
+        return local
+
+    def _use_query_engine(self, stand_in):
+        local = self._use_local_api(stand_in)
+        mirror = Mirror(local.api, ":memory:")
+        mirror.sync()
+        return QueryEngine(mirror, local.api), local.calls
+
+    def _ids(self, objects):
+        return [int(object["id"]) for object in objects]
+
+    def test_filters(self, stand_in):
+        """Test the filter vocabulary of cmdb.objects.read."""
+        engine, calls = self._use_query_engine(stand_in)
+
+        assert self._ids(engine.read({"ids": [3, 1, 99]})) == [1, 3]
+        assert self._ids(engine.read({"type": 2})) == [11, 12]
+        assert self._ids(engine.read({"type": "C__OBJTYPE__PERSON"})) == [11, 12]
+        assert self._ids(engine.read({"type_group": "Contact"})) == [11, 12]
+        assert len(engine.read({"type_group": 1})) == 12
+        assert len(engine.read({"status": 2})) == 12
+        assert engine.read({"status": 3}) == []
+        assert self._ids(engine.read({"title": "Server 1"})) == [1, 5, 9]
+        assert self._ids(engine.read({"type_title": "Persons"})) == [11, 12]
+        assert self._ids(engine.read({"location": 100})) == [1, 2, 3]
+        assert self._ids(engine.read({"sysid": "SYSID_1700000004"})) == [4]
+        assert self._ids(engine.read({"first_name": "Bert"})) == [12]
+        assert self._ids(engine.read({"last_name": "Admin"})) == [11, 12]
+        assert self._ids(engine.read({"email": "anne@example.com"})) == [11]
+        assert self._ids(engine.read({"title": "Server 1", "location": 200})) == [5, 9]
+        assert engine.read({"title": "Missing"}) == []
+
+    def test_order_and_limit(self, stand_in):
+        """Test ordering, sorting and limits."""
+        engine, calls = self._use_query_engine(stand_in)
+
+        assert self._ids(engine.read({}, 3)) == [1, 2, 3]
+        assert self._ids(engine.read({}, 3, 2)) == [3, 4, 5]
+        assert self._ids(engine.read({}, 2, None, "id", "desc")) == [12, 11]
+        assert self._ids(engine.read({"type": 1}, 3, None, "title", "asc")) == [4, 8, 1]
+        assert self._ids(engine.request({"limit": "1,2", "sort": "DESC"})) == [11, 10]
+        categories = engine.read({"ids": [11]}, None, None, None, None, True)
+        assert categories[0]["categories"]["C__CATS__PERSON"][0]["first_name"] == "Anne"
+
+    def test_refresh_after_sync(self, stand_in):
+        """Test the engine follows the mirror."""
+        engine, calls = self._use_query_engine(stand_in)
+        mirror = engine.get_mirror()
+        assert engine.count() == 12
+        with mirror._connection:
+            mirror._connection.execute("DELETE FROM objects WHERE id = 1")
+        engine.refresh()
+        assert engine.read({"ids": [1]}) == []
+        assert mirror.sync()["created"] == 1
+        assert self._ids(engine.read({"ids": [1]})) == [1]
+        assert engine.count() == 12
+
+    def test_backend_by_config(self, stand_in, tmp_path):
+        """Test cmdb.objects.read is answered locally when configured."""
+        path = str(tmp_path / "mirror.sqlite")
+        local = self._use_local_api(stand_in)
+        Mirror(local.api, path).sync()
+
+        config = {Constants.LOCAL_MIRROR: path}
+        local = self._use_local_api(stand_in, config, local.dataset)
+        api, calls = local.api, local.calls
+
+        assert int(CMDBObjects(api).get_id("Anne Admin")) == 11
+        assert self._ids(CMDBObjects(api).read_by_type(2)) == [11, 12]
+        assert CMDBObject(api).read_all(7)["categories"]["C__CATG__LOCATION"]
+        assert len(calls) == 0
+
+        api.get_query_engine().get_mirror().sync()
+        assert len(calls) > 0
+
+    def test_unsynced_mirror_and_bypass(self, stand_in, tmp_path):
+        """Test requests go to the API before the first sync and within bypass()."""
+        config = {Constants.LOCAL_MIRROR: str(tmp_path / "mirror.sqlite")}
+        local = self._use_local_api(stand_in, config)
+        api, calls = local.api, local.calls
+        engine = api.get_query_engine()
+
+        assert len(CMDBObjects(api).read()) == 12
+        assert len(calls) == 1
+        with pytest.raises(Exception, match="not been synced"):
+            engine.read()
+
+        engine.get_mirror().sync()
+        calls.clear()
+        answered_locally = []
+
+        with bypass():
+            thread = threading.Thread(
+                target=lambda: answered_locally.append(CMDBObjects(api).read())
+            )
+            thread.start()
+            thread.join()
+            assert len(calls) == 0
+            CMDBObjects(api).read()
+            assert len(calls) == 1
+
+        assert self._ids(answered_locally[0]) == self._ids(engine.read())
@@ -0,0 +1,81 @@
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobjecttypecategories import CMDBObjectTypeCategories
+from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+from idoit_api_client.schemasnapshot import SchemaSnapshot
+from tests.conftest import CONFIG
+
+
+class TestClassIdoitAPIClientSchemaSnapshot:
+    """Test class idoit_api_client.schemasnapshot.SchemaSnapshot"""
+
+    def _use_api(self, stand_in, config=None):
+        local = stand_in(config)
+        dataset = local.dataset
+        dataset.add_category("C__CATG__GLOBAL", ["title", "description"])
+        dataset.add_category("C__CATG__CPU", ["title", "frequency"], True)
+        dataset.add_category("C__CATG__RACK_VIEW", [])
+        dataset.add_object_type(
+            "C__OBJTYPE__SERVER", "Server", ["C__CATG__GLOBAL", "C__CATG__CPU"]
+        )
+        dataset.add_object_type(
+            "C__OBJTYPE__CLIENT", "Client", ["C__CATG__GLOBAL", "C__CATG__RACK_VIEW"]
+        )
+        return local.api, local.calls
+
+    def test_export_and_load(self, stand_in, tmp_path):
+        """Test a snapshot answers schema requests without API calls."""
+        path = str(tmp_path / "schema.json")
+        api, calls = self._use_api(stand_in)
+        exported = SchemaSnapshot.export(api, path)
+        assert len(calls) == 3
+        assert exported.category_info_all() == CMDBCategoryInfo(api).read_all()
+        object_types = CMDBObjectTypes(api).read()
+        object_type_categories = CMDBObjectTypeCategories(api).batch_read_by_id([1, 2])
+        cpu = CMDBCategoryInfo(api).read("C__CATG__CPU")
+
+        api, calls = self._use_api(stand_in, {Constants.SCHEMA_SNAPSHOT: path})
+
+        all_categories = CMDBCategoryInfo(api).read_all()
+        assert sorted(all_categories) == ["C__CATG__CPU", "C__CATG__GLOBAL"]
+        assert CMDBObjectTypes(api).read() == object_types
+        assert (
+            CMDBObjectTypeCategories(api).read_by_const("C__OBJTYPE__CLIENT")
+            == object_type_categories[1]
+        )
+        assert (
+            CMDBObjectTypeCategories(api).batch_read_by_id([1, 2])
+            == object_type_categories
+        )
+        assert CMDBCategoryInfo(api).read("C__CATG__CPU") == cpu
+        assert len(calls) == 0
+
+    def test_unknown_entries_are_requested(self, stand_in, tmp_path):
+        """Test requests the snapshot cannot answer go to the API."""
+        path = str(tmp_path / "schema.json")
+        api, calls = self._use_api(stand_in)
+        SchemaSnapshot.export(api, path)
+        api.set_schema_snapshot(SchemaSnapshot.load(path))
+        calls.clear()
+        CMDBCategoryInfo(api).read("C__CATG__RACK_VIEW")
+        assert len(calls) == 1
+
+    def test_other_instance_is_refused(self, stand_in, tmp_path):
+        """Test snapshots of another URL or language are refused."""
+        path = str(tmp_path / "schema.json")
+        api, calls = self._use_api(stand_in)
+        SchemaSnapshot.export(api, path)
+
+        for key, value in (
+            (Constants.URL, "https://other.example.com/src/jsonrpc.php"),
+            (Constants.LANGUAGE, "de"),
+        ):
+            with pytest.raises(Exception, match="Schema snapshot"):
+                API({**CONFIG, key: value, Constants.SCHEMA_SNAPSHOT: path})
+
+    def test_unsupported_version(self):
+        """Test snapshots of other versions are refused."""
+        with pytest.raises(Exception):
+            SchemaSnapshot({"version": 0})
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from idoit_api_client import Constants
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.metadatacache import MetadataCache
+from idoit_api_client.singleflight import SingleFlight, is_read_only, request_key
+
+
+class TestClassIdoitAPIClientSingleFlight:
+    """Test class idoit_api_client.singleflight.SingleFlight"""
+
+    def _use_api(self, stand_in):
+        """API whose stand-in server takes 50 ms per call"""
+        local = stand_in(
+            {Constants.SINGLE_FLIGHT: True}, before_call=lambda data: time.sleep(0.05)
+        )
+        local.dataset.populate(1, 1, 1)
+        return local.api, local.calls
+
+    def _run_concurrently(self, function, amount=8):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(function()))
+            for _ in range(amount)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_is_read_only(self):
+        """Test detection of read-only methods."""
+        assert is_read_only("cmdb.category.read")
+        assert is_read_only("cmdb.category_info")
+        assert is_read_only("cmdb.object_types")
+        assert not is_read_only("cmdb.category.save")
+        assert not is_read_only("cmdb.object.create")
+
+    def test_key_ignores_order_and_api_key(self):
+        """Test keys are canonical."""
+        single_flight = SingleFlight()
+        assert single_flight.key("m", {"a": 1, "b": 2}) == single_flight.key(
+            "m", {"b": 2, "a": 1, "apikey": "x"}
+        )
+        params = {"category": "C__CATG__GLOBAL", "language": "de", "apikey": "x"}
+        key = request_key("cmdb.category_info", params)
+        assert single_flight.key("cmdb.category_info", params) == key
+        cache = MetadataCache("https://demo.i-doit.com/src/jsonrpc.php")
+        assert cache.key("cmdb.category_info", params) == key
+        assert key != request_key("cmdb.category_info", {"category": "C__CATG__GLOBAL"})
+
+    def test_identical_reads_share_one_call(self, stand_in):
+        """Test concurrent identical reads are sent once."""
+        api, calls = self._use_api(stand_in)
+        cmdb_category_info = CMDBCategoryInfo(api)
+        results = self._run_concurrently(
+            lambda: cmdb_category_info.read("C__CATG__GLOBAL")
+        )
+        assert len(calls) == 1
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
+
+    def test_writes_bypass_single_flight(self, stand_in):
+        """Test write methods are always sent."""
+        api, calls = self._use_api(stand_in)
+        self._run_concurrently(
+            lambda: api.request(
+                "cmdb.category.save", {"object": 1, "category": "C__CATG__GLOBAL"}
+            ),
+            amount=4,
+        )
+        assert len(calls) == 4
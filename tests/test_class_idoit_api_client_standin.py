@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategory import CMDBCategory
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.cmdbobjects import CMDBObjects
+from idoit_api_client.cmdbobjecttypes import CMDBObjectTypes
+from idoit_api_client.standin import (
+    METHOD_NOT_FOUND,
+    StandInDataset,
+    StandInServer,
+)
+
+
+class TestClassIdoitAPIClientStandIn:
+    """Test class idoit_api_client.standin.StandInServer"""
+
+    config = {
+        Constants.URL: "http://127.0.0.1/src/jsonrpc.php",
+        Constants.KEY: "c1ia5q",
+        Constants.USERNAME: "admin",
+        Constants.PASSWORD: "admin",
+    }
+
+    def _use_api(self, **options):
+        dataset = StandInDataset().populate(20, 2, 3)
+        server = StandInServer(dataset, **options)
+        return server.attach(API(dict(self.config))), server
+
+    def test_objects_and_categories(self):
+        """Test the client works against the in-process stand-in."""
+        api, server = self._use_api()
+        api.login()
+        assert api.is_logged_in()
+
+        object_id = CMDBObject(api).create("C__OBJTYPE__STAND_IN_1", "Server 1")
+        category = CMDBCategory(api)
+        entry_id = category.save(object_id, "C__CATG__STAND_IN_1", {"serial": "A"})
+        assert category.save(object_id, "C__CATG__STAND_IN_1", {"serial": "B"}) == (
+            entry_id
+        )
+        category.create(object_id, "C__CATG__STAND_IN_3", {"title": "One"})
+        category.create(object_id, "C__CATG__STAND_IN_3", {"title": "Two"})
+
+        object = CMDBObject(api).load(object_id)
+        entries = {
+            category["const"]: category.get("entries") for category in object["catg"]
+        }
+        assert object["title"] == "Server 1"
+        assert entries["C__CATG__STAND_IN_1"] == [
+            {"id": str(entry_id), "objID": str(object_id), "serial": "B"}
+        ]
+        assert [entry["title"] for entry in entries["C__CATG__STAND_IN_3"]] == [
+            "One",
+            "Two",
+        ]
+        assert "C__CATG__RACK_VIEW" not in CMDBCategoryInfo(api).read_all()
+        assert (
+            CMDBObjectTypes(api).read_one("C__OBJTYPE__STAND_IN_2")["objectcount"]
+            == "10"
+        )
+
+        CMDBObject(api).archive(object_id)
+        assert CMDBObjects(api).read({"title": "Server 1"}) == []
+        api.logout()
+
+    def test_read_objects(self):
+        """Test filters, order, limits and categories of cmdb.objects.read."""
+        api, server = self._use_api()
+        objects = CMDBObjects(api)
+
+        result = objects.read({"type": "C__OBJTYPE__STAND_IN_2"}, 3, 2, "title", "DESC")
+        assert [object["title"] for object in result] == [
+            "Object 4",
+            "Object 20",
+            "Object 2",
+        ]
+        assert [
+            int(object["id"])
+            for object in objects.iter_objects_by_id({}, 7, ["C__CATG__STAND_IN_2"])
+        ] == list(range(1, 21))
+        object = objects.read_by_ids([5], True)[0]
+        assert len(object["categories"]["C__CATG__STAND_IN_2"]) == 1
+        assert object["categories"]["C__CATG__RACK_VIEW"] == []
+
+    def test_errors_and_batches(self):
+        """Test injected errors, unknown methods and refused batches."""
+        api, server = self._use_api(
+            error_rate=1, error_methods=["cmdb.category.save"], max_batch_size=3
+        )
+        items = api.batch_request(
+            [
+                {"method": "cmdb.category.save", "params": {"object": 1}},
+                {"method": "cmdb.unknown", "params": {}},
+                {"method": "cmdb.object.read", "params": {"id": 1}},
+            ],
+            partial=True,
+        )
+        assert items[0]["error"]["message"] == "Injected error"
+        assert items[1]["error"]["code"] == METHOD_NOT_FOUND
+        assert items[2]["result"]["title"] == "Object 1"
+        assert server.get_stats() == {"calls": 1, "requests": 3, "errors": 2}
+
+        with pytest.raises(Exception):
+            api.batch_request([{"method": "cmdb.object.read", "params": {"id": 1}}] * 4)
+
+    def test_http(self):
+        """Test the stand-in over HTTP with latency and shuffled batches."""
+        with StandInServer(
+            StandInDataset().populate(5, 1, 1), latency=20, shuffle_batches=True
+        ) as server:
+            api = API({**self.config, Constants.URL: server.serve()})
+            api.connect()
+            start = time.perf_counter()
+            result = api.batch_request(
+                [
+                    {"method": "cmdb.object.read", "params": {"id": object_id}}
+                    for object_id in range(1, 6)
+                ]
+            )
+            assert time.perf_counter() - start >= 0.02
+            assert [object["id"] for object in result] == [1, 2, 3, 4, 5]
+            api.disconnect()
+
+        with pytest.raises(Exception):
+            server.get_url()
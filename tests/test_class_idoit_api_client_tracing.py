@@ -0,0 +1,151 @@
+import json
+import os
+
+import pytest
+
+from idoit_api_client import API, Constants
+from idoit_api_client.cmdbcategoryinfo import CMDBCategoryInfo
+from idoit_api_client.cmdbobject import CMDBObject
+from idoit_api_client.standin import StandInDataset, StandInServer
+from idoit_api_client.tracing import (
+    STATUS_CODE_ERROR,
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+)
+
+
+class TestClassIdoitAPIClientTracing:
+    """Test class idoit_api_client.tracing.Tracer"""
+
+    config = {
+        Constants.URL: "http://127.0.0.1/src/jsonrpc.php",
+        Constants.KEY: "c1ia5q",
+    }
+
+    def _use_api(self, config=None):
+        server = StandInServer(StandInDataset().populate(5, 1, 4))
+        api = server.attach(API(dict(config or self.config)))
+        exporter = InMemoryExporter()
+        api.set_tracer(Tracer(exporter))
+        return api, exporter
+
+    def _children(self, exporter, span):
+        return [
+            child for child in exporter.get_spans() if child.parent_id == span.span_id
+        ]
+
+    def test_load_is_nested(self):
+        """Test load() shows every round trip as a nested span."""
+        api, exporter = self._use_api()
+        CMDBObject(api).load(2)
+
+        [load] = exporter.get_spans("CMDBObject.load")
+        assert load.parent_id is None
+        assert load.attributes == {"idoit.object.id": 2}
+        assert [span.name for span in self._children(exporter, load)] == [
+            "API.request",
+            "API.request",
+            "API.batch_request",
+        ]
+        calls = exporter.get_spans("jsonrpc.call")
+        assert len(calls) == 3
+        assert all(call.trace_id == load.trace_id for call in calls)
+        assert calls[0].attributes["rpc.method"] == "cmdb.object.read"
+        assert calls[0].attributes["idoit.object.ids"] == [2]
+        assert calls[0].attributes["http.request.body.size"] > 0
+        assert calls[2].attributes["rpc.batch_size"] == 5
+        assert calls[2].attributes["rpc.errors"] == 0
+        [batch] = exporter.get_spans("API.batch_request")
+        assert batch.attributes["rpc.methods"] == ["cmdb.category.read"]
+
+    def test_parallel_chunks_keep_their_parent(self):
+        """Test spans of chunks sent by parallel workers stay nested."""
+        config = dict(self.config)
+        config[Constants.BATCH_MAX_REQUESTS] = 2
+        config[Constants.BATCH_WORKERS] = 3
+        api, exporter = self._use_api(config)
+        api.batch_request(
+            [
+                {"method": "cmdb.object.read", "params": {"id": object_id}}
+                for object_id in range(1, 6)
+            ]
+        )
+
+        [batch] = exporter.get_spans("API.batch_request")
+        calls = self._children(exporter, batch)
+        assert sorted(call.attributes["rpc.batch_size"] for call in calls) == [1, 2, 2]
+
+    def test_errors_and_file_export(self, tmp_path):
+        """Test failed requests mark their spans and spans are written as OTLP."""
+        path = str(tmp_path / "trace.jsonl")
+        server = StandInServer(StandInDataset().populate(2, 1, 1))
+        api = server.attach(API({**self.config, Constants.TRACE_FILE: path}))
+
+        api.login()
+        with pytest.raises(Exception):
+            api.request("cmdb.category.read", {"objID": 99, "category": "X"})
+
+        assert not os.path.exists(path)
+        api.flush()
+
+        with open(path) as handle:
+            spans = [
+                span
+                for line in handle
+                for resource in json.loads(line)["resourceSpans"]
+                for scope in resource["scopeSpans"]
+                for span in scope["spans"]
+            ]
+        assert [span["name"] for span in spans] == [
+            "jsonrpc.call",
+            "API.request",
+            "API.login",
+            "jsonrpc.call",
+            "API.request",
+        ]
+        assert spans[1]["parentSpanId"] == spans[2]["spanId"]
+        assert spans[3]["status"]["code"] == STATUS_CODE_ERROR
+        assert spans[4]["status"]["code"] == STATUS_CODE_ERROR
+        assert {
+            "key": "idoit.object.ids",
+            "value": {"arrayValue": {"values": [{"intValue": "99"}]}},
+        } in spans[3]["attributes"]
+
+    def test_composite_operations(self):
+        """Test upsert() and read_all() are traced and nothing without a tracer."""
+        api, exporter = self._use_api()
+        object_id = CMDBObject(api).upsert("C__OBJTYPE__STAND_IN_1", "New")
+        CMDBCategoryInfo(api).read_all()
+
+        [upsert] = exporter.get_spans("CMDBObject.upsert")
+        assert upsert.attributes == {
+            "idoit.object.type": "C__OBJTYPE__STAND_IN_1",
+            "idoit.object.title": "New",
+        }
+        assert len(self._children(exporter, upsert)) == 2
+        [read_all] = exporter.get_spans("CMDBCategoryInfo.read_all")
+        assert read_all.get_duration() >= 0
+
+        exporter.clear()
+        api.set_tracer(None)
+        CMDBObject(api).load(object_id)
+        assert exporter.get_spans() == []
+
+    def test_file_export_in_batches(self, tmp_path):
+        """Test spans are written in batches and on shutdown."""
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(FileExporter(str(path), max_batch_size=3, interval=60000))
+
+        for index in range(7):
+            with tracer.span(f"span {index}"):
+                pass
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        tracer.shutdown()
+        lines = path.read_text().splitlines()
+        assert [
+            len(json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"])
+            for line in lines
+        ] == [3, 3, 1]
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from idoit_api_client.writebehind import WriteBehindQueue
+
+
+class TestClassIdoitAPIClientWriteBehind:
+    """Test class idoit_api_client.writebehind.WriteBehindQueue"""
+
+    def _use_api(self, stand_in, blocked=None):
+        local = stand_in(
+            before_call=None if blocked is None else lambda payload: blocked.wait()
+        )
+        dataset = local.dataset
+        dataset.add_category("C__CATG__MODEL", ["serial"])
+        dataset.add_category("C__CATG__IP", ["hostname"], True)
+        dataset.add_object_type(
+            "C__OBJTYPE__SERVER", "Server", ["C__CATG__MODEL", "C__CATG__IP"]
+        )
+        for object_id in range(1, 200):
+            dataset.add_object("C__OBJTYPE__SERVER", f"Server {object_id}")
+        return local.api, local.calls
+
+    def test_batches_by_size(self, stand_in):
+        """Test full batches are sent without waiting for the interval."""
+        api, batches = self._use_api(stand_in)
+        with WriteBehindQueue(api, max_requests=5, interval=60000) as writer:
+            futures = [
+                writer.save(object_id, "C__CATG__MODEL", {"serial": str(object_id)})
+                for object_id in range(1, 11)
+            ]
+            assert [future.result(timeout=5)["entry"] for future in futures] == list(
+                range(1, 11)
+            )
+        assert [len(batch) for batch in batches] == [5, 5]
+
+    def test_batches_by_time(self, stand_in):
+        """Test a batch is sent when the interval has passed."""
+        api, batches = self._use_api(stand_in)
+        writer = WriteBehindQueue(api, max_requests=100, interval=50)
+        future = writer.create(1, "C__CATG__IP", {"hostname": "a"})
+        assert future.result(timeout=5)["id"] == 1
+        assert batches[0][0]["method"] == "cmdb.category.create"
+        writer.close()
+
+    def test_flush_close_and_errors(self, stand_in):
+        """Test flush, close and error reporting."""
+        api, batches = self._use_api(stand_in)
+        errors = []
+        writer = WriteBehindQueue(
+            api,
+            interval=60000,
+            on_error=lambda request, error: errors.append(request),
+        )
+        good = writer.save(1, "C__CATG__MODEL", {"serial": "1"})
+        bad = writer.save(0, "C__CATG__MODEL", {"serial": "0"})
+        writer.flush()
+        assert good.done() and bad.done()
+        assert len(batches) == 1
+        with pytest.raises(Exception):
+            bad.result()
+        assert errors[0]["params"]["object"] == 0
+
+        last = writer.save(2, "C__CATG__MODEL", {"serial": "2"})
+        writer.close()
+        assert last.result()["entry"] == 2
+        with pytest.raises(Exception):
+            writer.save(3, "C__CATG__MODEL", {})
+
+    def test_backpressure(self, stand_in):
+        """Test callers wait while the queue is full."""
+        blocked = threading.Event()
+        api, batches = self._use_api(stand_in, blocked)
+        writer = WriteBehindQueue(api, max_requests=1, interval=1, max_queue=2)
+        writer.save(1, "C__CATG__MODEL", {})
+        time.sleep(0.1)
+        writer.save(2, "C__CATG__MODEL", {})
+        writer.save(3, "C__CATG__MODEL", {})
+        with pytest.raises(Exception, match="full"):
+            writer.submit("cmdb.category.save", {"object": 4}, timeout=0.05)
+        blocked.set()
+        writer.close()
+        assert len(batches) == 3
+
+    def test_submit_while_closing(self, stand_in):
+        """Test every accepted request is sent even if close() runs meanwhile."""
+        api, batches = self._use_api(stand_in)
+        writer = WriteBehindQueue(api, max_requests=10, interval=1)
+        futures = []
+
+        def submit():
+            for object_id in range(1, 200):
+                try:
+                    futures.append(writer.save(object_id, "C__CATG__MODEL", {}))
+                except Exception:
+                    return
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        writer.close()
+        for thread in threads:
+            thread.join()
+
+        assert all(future.result(timeout=5)["success"] for future in futures)
+        writer.flush()